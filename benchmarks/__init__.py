@@ -0,0 +1,4 @@
+"""Benchmarks for the addon.
+
+They aren't run by ``pytest``, run them manually, e.g. ``python -m benchmarks.compiler``.
+"""
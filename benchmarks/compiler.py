@@ -0,0 +1,100 @@
+"""Benchmark for :class:`czech_plus.logic.compiler.Compiler` on a synthetic collection.
+
+Compares old per-note path (:meth:`~czech_plus.logic.compiler.Compiler.compile_note` for every note)
+with the batched one (:meth:`~czech_plus.logic.compiler.Compiler.compile_all_notes`)
+and the batched one with processing in all CPU cores. The last two runs show, how much
+the persistent processed cache saves, when the same notes are compiled in another profile.
+
+Usage: ``python -m benchmarks.compiler --notes 2000``.
+"""
+import argparse
+import contextlib
+import dataclasses
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from benchmarks.synthetic import create_collection
+from czech_plus import config, utils
+from czech_plus.logic.compiler import Compiler
+
+
+def per_note(compiler: Compiler) -> None:
+    """Compile every note separately."""
+    with _compiler_settings(cache=False):
+        for note_type, notes in compiler._get_chunks(compiler._get_note_types()):
+            for note in notes:
+                compiler.compile_note(note.id, note_type)
+
+
+def batched(compiler: Compiler) -> None:
+    """Compile notes in chunks."""
+    with _compiler_settings(processes=1, cache=False):
+        compiler.compile_all_notes()
+
+
+def parallel(compiler: Compiler) -> None:
+    """Compile notes in chunks, processing them in all CPU cores."""
+    with _compiler_settings(processes=0, cache=False):
+        compiler.compile_all_notes()
+
+
+def cold_cache(compiler: Compiler) -> None:
+    """Compile notes in chunks, filling empty processed cache."""
+    with _compiler_settings(processes=1, cache=True):
+        compiler.compile_all_notes()
+
+
+def warm_cache(compiler: Compiler) -> None:
+    """Compile notes in chunks, when all of them are already in processed cache (like in another profile)."""
+    with _compiler_settings(processes=1, cache=True):
+        compiler.compile_all_notes()
+
+
+@contextlib.contextmanager
+def _compiler_settings(**changes: t.Any) -> t.Iterator[None]:  # type: ignore[misc] # Explicit "Any"
+    """Temporarily change compiler settings. Fingerprints are always disabled, so every note is compiled."""
+    settings = config.Config().compiler
+    object.__setattr__(
+        config.Config(),
+        "compiler",
+        dataclasses.replace(settings, incremental=False, parallel_threshold=0, **changes),
+    )
+    try:
+        yield
+    finally:
+        object.__setattr__(config.Config(), "compiler", settings)
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=2000, help="How many notes of every note type to generate.")
+    args = parser.parse_args()
+    utils.setup_logging()
+
+    strategies: dict[str, t.Callable[[Compiler], None]] = {
+        "per-note": per_note,
+        "batched": batched,
+        "parallel": parallel,
+        "cold cache": cold_cache,
+        "warm cache": warm_cache,
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.USER_FILES_DIR = Path(tmp_dir) / "user_files"
+        for name, strategy in strategies.items():
+            collection = create_collection(Path(tmp_dir) / f"{name}.anki2", args.notes)
+            compiler = Compiler(lambda: collection)  # noqa: B023 # collection is used right away
+
+            start = time.perf_counter()
+            strategy(compiler)
+            elapsed = time.perf_counter() - start
+
+            collection.close()
+            total = args.notes * 3
+            print(f"{name:>10}: {elapsed:.3f}s for {total} notes ({total / elapsed:.0f} notes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark for creating the config, which happens on every addon start.
+
+Compares creating :class:`~czech_plus.config.Config`, when ``config.json`` is already up to date
+(it isn't written at all), when it is outdated (it is written to a temporary file and replaced), and
+with the old behaviour, when it was truncated and written on every start. Config is written to a
+temporary folder, so the real ``config.json`` isn't touched.
+
+Usage: ``python -m benchmarks.config_init --repeat 500``.
+"""
+import argparse
+import json
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+from unittest import mock
+
+from czech_plus import config
+
+
+def _legacy_write_config(self: config.Config) -> None:
+    """Old :meth:`czech_plus.config.Config._write_config`, which always wrote the file."""
+    with config._CONFIG_PATH.open("w", encoding="utf8") as config_file:
+        config_file.write(json.dumps(self.as_dict(), indent=4, ensure_ascii=False))
+
+
+def _measure(repeat: int, before_each: t.Callable[[], None]) -> float:
+    """Create config ``repeat`` times and return elapsed time, without time spent in ``before_each``."""
+    elapsed = 0.0
+    for _ in range(repeat):
+        config.Config._instances.pop(config.Config, None)
+        before_each()
+        start = time.perf_counter()
+        config.Config()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500, help="How many times to create the config.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = Path(temp_dir) / "config.json"
+        with mock.patch.object(config, "_CONFIG_PATH", config_path):
+            config.Config._instances.pop(config.Config, None)
+            config.Config()  # write up to date file
+
+            results = {
+                "up to date": _measure(args.repeat, lambda: None),
+                "outdated": _measure(args.repeat, lambda: config_path.write_text("{}", encoding="utf8")),
+            }
+            with mock.patch.object(config.Config, "_write_config", _legacy_write_config):
+                results["always write (old)"] = _measure(args.repeat, lambda: None)
+
+    for name, elapsed in results.items():
+        print(f"{name:>18}: {elapsed / args.repeat * 1e6:.0f}us per start")
+    print(f"{'speedup':>18}: {results['always write (old)'] / results['up to date']:.1f}x, if config wasn't changed")
+
+
+if __name__ == "__main__":
+    main()
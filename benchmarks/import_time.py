@@ -0,0 +1,87 @@
+"""Benchmark for importing the addon, which happens on every Anki start and in every worker process.
+
+Every module is imported in a fresh interpreter with ``python -X importtime``, so nothing is cached
+between runs. The median of wall time is reported, together with the modules, that took the most
+time to import (by their own time, without time of their imports).
+
+Inside Anki, ``aqt`` and ``anki`` are already imported, when the addon is loaded. Pass them to
+``--preload`` to measure only the cost of the addon itself.
+
+Usage: ``python -m benchmarks.import_time --repeat 20 --preload aqt``.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import typing as t
+
+MODULES = ("czech_plus", "czech_plus.config", "czech_plus.logic.processor")
+"""Modules, that are measured by default."""
+_MARKER = "--- czech_plus import_time marker ---"
+"""Printed to stderr after preloading, everything after it is the cost of the measured module."""
+_SCRIPT = """
+import sys, time
+{preload}
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+class _Run(t.NamedTuple):
+    """Result of importing the module once."""
+
+    wall: float
+    """Seconds spent on the import."""
+    self_times: dict[str, int]
+    """Own import time of every newly imported module in microseconds."""
+
+
+def _import_once(module: str, preload: t.Sequence[str]) -> _Run:
+    """Import the module in a fresh interpreter and parse ``-X importtime`` output."""
+    script = _SCRIPT.format(preload="\n".join(f"import {name}" for name in preload), marker=_MARKER, module=module)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True, check=True
+    )
+
+    self_times: dict[str, int] = {}
+    _, _, report = process.stderr.partition(_MARKER)
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        if self_time.strip().isdigit():  # skip the header
+            # a module can be listed twice, e.g. ``czech_plus.config`` inside ``czech_plus`` and after it
+            self_times[name.strip()] = self_times.get(name.strip(), 0) + int(self_time)
+    return _Run(float(process.stdout.strip().splitlines()[-1]), self_times)
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to import.")
+    parser.add_argument("--repeat", type=int, default=20, help="How many times to import every module.")
+    parser.add_argument("--top", type=int, default=5, help="How many heaviest imports to show.")
+    parser.add_argument(
+        "--preload", action="append", default=[], help="Module, that is imported before measuring, can be repeated."
+    )
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [_import_once(module, args.preload) for _ in range(args.repeat)]
+        median_wall = statistics.median(run.wall for run in runs)
+        print(f"{module}: {median_wall * 1e3:.1f}ms, {len(runs[0].self_times)} modules imported")
+
+        self_times: dict[str, list[int]] = {}
+        for run in runs:
+            for name, self_time in run.self_times.items():
+                self_times.setdefault(name, []).append(self_time)
+        heaviest = sorted(self_times.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+        for name, times in heaviest[: args.top]:
+            print(f"    {statistics.median(times) / 1e3:>6.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark for the lexer engines.
+
+Compares the old per-symbol engine (:meth:`~czech_plus.logic.lexer.BaseLexer.lex`) with the
+regex-based one (:meth:`~czech_plus.logic.lexer.BaseLexer.lex_fast`) on the example fields and on
+long synthetic verbs, separately for every lexer. Both engines must produce the same tokens, this is
+checked before measuring. Logging is set to ``WARNING`` (the default), so the old engine isn't slowed
+down by its debug messages, and the best of ``--rounds`` is reported.
+
+The speedup grows with length of the fields: example nouns and adjectives are only a few symbols
+long, so the cost of calling the lexer is a noticeable part of the time.
+
+Usage: ``python -m benchmarks.lexer --repeat 200``.
+"""
+import argparse
+import time
+import typing as t
+
+from czech_plus._vendor.loguru import logger
+
+from benchmarks.synthetic import ADJECTIVES, NOUNS, VERBS, long_verb
+from czech_plus import config, utils
+from czech_plus.logic import lexer
+
+
+def _fields() -> dict[type[lexer.BaseLexer], list[str]]:
+    """Get all fields to lex, grouped by lexer for them."""
+    return {
+        lexer.NounLexer: [field for example in NOUNS for field in example],
+        lexer.VerbLexer: [field for example in VERBS + [long_verb(50)] for field in example],
+        lexer.AdjectiveLexer: [field for example in ADJECTIVES for field in example],
+    }
+
+
+def _measure(lexer_instance: lexer.BaseLexer, fields: list[str], repeat: int, engine: str) -> float:
+    """Lex all fields ``repeat`` times with the engine (name of the method) and return elapsed time."""
+    lex = t.cast(t.Callable[[str], t.Iterator[t.Any]], getattr(lexer_instance, engine))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for field in fields:
+            for _ in lex(field):
+                pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="How many times to lex every field.")
+    parser.add_argument("--rounds", type=int, default=5, help="How many times to measure, the best is reported.")
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(lambda _: None, level=config.LogLevel.WARNING)
+    utils.hot_logger.set_level(config.LogLevel.WARNING)
+
+    for lexer_class, fields in _fields().items():
+        lexer_instance = lexer_class()
+        for field in fields:
+            assert list(lexer_instance.lex(field)) == list(lexer_instance.lex_fast(field)), field
+
+        results = {
+            engine: min(_measure(lexer_instance, fields, args.repeat, engine) for _ in range(args.rounds))
+            for engine in ("lex", "lex_fast", "lex_spans")
+        }
+        total = len(fields) * args.repeat
+        for engine, elapsed in results.items():
+            print(
+                f"{lexer_class.__name__:>14} {engine:>9}: {elapsed:.3f}s for {total} fields"
+                f" ({total / elapsed:.0f} fields/s)"
+            )
+        print(f"{lexer_class.__name__:>14}   speedup: {results['lex'] / results['lex_fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark for lexing with different log levels.
+
+Lexers and processors log on every symbol. With :data:`czech_plus.utils.hot_logger`, disabled levels
+cost almost nothing, so the usual ``WARNING`` level is much faster than ``TRACE``. Messages are written
+to a sink, that drops them, so only formatting is measured.
+
+Usage: ``python -m benchmarks.log_levels --repeat 100``.
+"""
+import argparse
+import time
+
+from czech_plus._vendor.loguru import logger
+
+from benchmarks.synthetic import ADJECTIVES, NOUNS, VERBS, long_verb
+from czech_plus import config, utils
+from czech_plus.logic import lexer
+
+
+def _measure(fields: list[tuple[lexer.BaseLexer, str]], repeat: int, engine: str) -> float:
+    """Lex all fields ``repeat`` times with the engine (name of the method) and return elapsed time."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for lexer_instance, field in fields:
+            for _ in getattr(lexer_instance, engine)(field):
+                pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=100, help="How many times to lex every field.")
+    args = parser.parse_args()
+
+    fields: list[tuple[lexer.BaseLexer, str]] = [
+        *((lexer.NounLexer(), field) for example in NOUNS for field in example),
+        *((lexer.VerbLexer(), field) for example in VERBS + [long_verb(10)] for field in example),
+        *((lexer.AdjectiveLexer(), field) for example in ADJECTIVES for field in example),
+    ]
+    total = len(fields) * args.repeat
+    for level in (config.LogLevel.WARNING, config.LogLevel.TRACE):
+        logger.remove()
+        logger.add(lambda _: None, level=level)
+        utils.hot_logger.set_level(level)
+
+        for engine in ("lex", "lex_fast"):
+            elapsed = _measure(fields, args.repeat, engine)
+            print(f"{level.name:>7} {engine:>8}: {elapsed:.3f}s for {total} fields ({total / elapsed:.0f} fields/s)")
+
+
+if __name__ == "__main__":
+    main()
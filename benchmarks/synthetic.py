@@ -0,0 +1,95 @@
+"""Helpers to generate synthetic data for the benchmarks."""
+import itertools
+import typing as t
+from pathlib import Path
+
+from anki.collection import AddNoteRequest
+from anki.collection import Collection as AnkiCollection
+from anki.decks import DeckId
+
+from czech_plus.config import Config
+
+import anki.notes  # isort:skip # Circular import before importing anki.collection
+
+NOUNS: list[tuple[str, str]] = [
+    ("blůza, halenka", "F, F"),
+    ("stůl", "M"),
+    ("město, vesnice", "N, F"),
+    ("recepční", "A"),
+    ("kalhoty", "mF"),
+]
+"""Examples of valid ``(Czech, Gender)`` pairs."""
+VERBS: list[tuple[str, str]] = [
+    ("koukat (se), dívat se", "na 4, !kam?, po 7. na 4, z 2"),
+    ("ušklíbat se [ušklíbnout se]", "na 4 [na 4]"),
+    ("dělat [udělat], hrát si [zahrát si]", "4 [4]. s 7 [s 7]"),
+    ("mluvit", "o 6, s 7"),
+]
+"""Examples of valid ``(Czech, Prepositions and Cases)`` pairs."""
+ADJECTIVES: list[tuple[str, str]] = [
+    ("hezký", "čí"),
+    ("hezký, dobrý", "čí, _"),
+    ("velký", "větší"),
+]
+"""Examples of valid ``(Czech, Completion of Comparison Degrees)`` pairs."""
+
+
+def long_verb(words: int) -> tuple[str, str]:
+    """Generate a long verb with many words.
+
+    Args:
+        words: How many words to generate.
+
+    Returns:
+        Tuple with ``Czech`` and ``Prepositions and Cases`` fields.
+    """
+    czech = ", ".join(f"slovo{i} [budoucí{i}]" for i in range(words))
+    pac = ". ".join(f"na 4, !kam?, po {i % 7 + 1} [s 7]" for i in range(words))
+    return czech, pac
+
+
+def create_collection(path: Path, notes_per_type: int) -> AnkiCollection:
+    """Create a collection with our note types and ``notes_per_type`` notes for each of them.
+
+    Args:
+        path: Path to the new collection file.
+        notes_per_type: How many notes to add for every note type.
+
+    Returns:
+        Opened collection.
+    """
+    collection = AnkiCollection(str(path))
+    cards = Config().cards
+
+    for settings, examples in (
+        (cards.nouns, NOUNS),
+        (cards.verbs, VERBS),
+        (cards.adjectives, ADJECTIVES),
+    ):
+        fields: list[str] = [getattr(settings.fields, field) for field in settings.fields.__dataclass_fields__]
+        note_type = _add_note_type(collection, settings.note_type_name, fields)
+
+        requests: list[AddNoteRequest] = []
+        for i, (czech, second) in zip(range(notes_per_type), itertools.cycle(examples)):
+            note = anki.notes.Note(collection, note_type)
+            note[fields[0]] = f"{i}{czech}"  # make every note unique
+            note[fields[2]] = second
+            requests.append(AddNoteRequest(note, DeckId(1)))
+        collection.add_notes(requests)
+
+    return collection
+
+
+def _add_note_type(collection: AnkiCollection, name: str, fields: list[str]) -> t.Any:  # type: ignore[misc]
+    """Add a simple note type with the given fields."""
+    models = collection.models
+    note_type = models.new(name)
+    for field in fields:
+        models.add_field(note_type, models.new_field(field))
+
+    template = models.new_template("Card 1")
+    template["qfmt"] = "{{" + fields[0] + "}}"
+    template["afmt"] = "{{" + fields[1] + "}}"
+    models.add_template(note_type, template)
+    models.add(note_type)
+    return models.by_name(name)
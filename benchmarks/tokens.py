@@ -0,0 +1,58 @@
+"""Benchmark for tokens: time and memory of lexing (and keeping) 10k fields.
+
+Usage: ``python -m benchmarks.tokens --fields 10000``.
+"""
+import argparse
+import itertools
+import time
+import tracemalloc
+import typing as t
+
+from benchmarks.synthetic import ADJECTIVES, NOUNS, VERBS
+from czech_plus import utils
+from czech_plus.logic import lexer
+from czech_plus.logic.lexer import tokens
+
+
+def _fields(count: int) -> list[tuple[lexer.BaseLexer, str]]:
+    """Get ``count`` fields to lex, with lexers for them."""
+    examples = itertools.chain(
+        ((lexer.NounLexer(), field) for example in NOUNS for field in example),
+        ((lexer.VerbLexer(), field) for example in VERBS for field in example),
+        ((lexer.AdjectiveLexer(), field) for example in ADJECTIVES for field in example),
+    )
+    return list(itertools.islice(itertools.cycle(list(examples)), count))
+
+
+def _lex(fields: list[tuple[lexer.BaseLexer, str]]) -> list[list[t.Union[tokens.BaseToken, str]]]:
+    """Lex all fields and keep the results."""
+    return [list(lexer_instance.lex_fast(field)) for lexer_instance, field in fields]
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fields", type=int, default=10_000, help="How many fields to lex.")
+    args = parser.parse_args()
+    utils.setup_logging()
+
+    fields = _fields(args.fields)
+    start = time.perf_counter()
+    _lex(fields)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    lexed = _lex(fields)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    size, blocks = sum(stat.size_diff for stat in stats), sum(stat.count_diff for stat in stats)
+    count = sum(len(field) for field in lexed)
+    print(f"  time: {elapsed:.3f}s for {args.fields} fields")
+    print(f"memory: {size / 1024:.0f} KiB in {blocks} blocks for {count} tokens and strings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Benchmark for the verb processor.
+
+Compares the old two-pass engine (:class:`TwoPassVerbProcessor`, kept only here) with the single-pass one
+(:meth:`~czech_plus.logic.processor.implementations.verb.VerbProcessor.process`) on the example verbs and on long
+verbs with many words. Both engines must give the same result, this is checked before measuring.
+
+Usage: ``python -m benchmarks.verb --repeat 200``.
+"""
+import argparse
+import time
+import typing as t
+
+from benchmarks.synthetic import VERBS, long_verb
+from czech_plus import utils
+from czech_plus.config import Config
+from czech_plus.logic import diagnostics
+from czech_plus.logic.lexer import VerbLexer, tokens
+from czech_plus.logic.processor.implementations.verb import (
+    _FUTURE_FORM_KINDS,
+    VerbProcessor,
+)
+from czech_plus.utils import assert_that, hot_logger
+
+
+class TwoPassVerbProcessor(VerbProcessor):
+    """Verb processor with the old two-pass engine (:meth:`_pre_process` and :meth:`_process`).
+
+    Both engines give the same result, but only the single-pass one reports a future form
+    without pair in :mod:`~czech_plus.logic.diagnostics`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._czech_field_name = self._config.cards.verbs.fields.czech
+        self._pac_field_name = self._config.cards.verbs.fields.prepositions_and_cases
+        self._lexer = VerbLexer()
+
+    def process(self, content: dict[str, str], /) -> str:
+        """Process the content with the two-pass engine."""
+        pre_processed = self._pre_process(content)
+        if not content[self._pac_field_name]:
+            diagnostics.report(f"empty {self._pac_field_name} field")
+            return content[self._czech_field_name]
+        return self._process(pre_processed)
+
+    def _pre_process(
+        self, content: dict[str, str]
+    ) -> t.Iterator[
+        tuple[
+            t.Union[str, tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd], list[t.Union[tokens.BaseToken, str]]
+        ]
+    ]:
+        hot_logger.debug(
+            "Pre-processing verb card\n{} (Czech field): {}\n{} (Prepositions and Cases field): {}",
+            self._czech_field_name,
+            content[self._czech_field_name],
+            self._pac_field_name,
+            content[self._pac_field_name],
+        )
+
+        lexed_czech = self._navigate_over(self._lexer.lex_fast(content[self._czech_field_name]))
+        lexed_prepositions_and_cases = self._navigate_over(
+            self._lexer.lex_fast(content[self._pac_field_name]), dont_skip_escaped=True
+        )
+
+        future_form_was = False
+        for czech in lexed_czech:
+            hot_logger.debug("Pre-processing czech {!r}.", czech)
+            kind = tokens.kind_of(czech)
+            if kind is tokens.TokenKind.ADDITIONAL_SEPARATOR:
+                hot_logger.debug("Skipping additional separator token.")
+                continue
+            elif kind is tokens.TokenKind.TEXT:
+                prepositions_and_cases = list(self._pre_process_czech_token(czech, lexed_prepositions_and_cases))
+                hot_logger.debug("Pre-processed prepositions and cases here: {!r}.", prepositions_and_cases)
+                if len(prepositions_and_cases) > 0 and tokens.kind_of(prepositions_and_cases[-1]) in _FUTURE_FORM_KINDS:
+                    hot_logger.debug("Future form was found.")
+                    future_form_was = True
+                    prepositions_and_cases.pop()
+                yield t.cast(str, czech), prepositions_and_cases
+            elif kind in _FUTURE_FORM_KINDS:
+                hot_logger.debug("Processing future form.")
+                if not future_form_was and kind is tokens.TokenKind.FUTURE_FORM_START:
+                    assert_that(list(self._pre_process_czech_token(czech, lexed_prepositions_and_cases)) == [czech])
+                future_form_was = False
+                yield t.cast(t.Union[tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd], czech), [czech]
+            else:  # pragma: no cover
+                raise NotImplementedError(f"Unexpected czech token type: {czech} ({type(czech)})")
+
+    def _pre_process_czech_token(
+        self,
+        czech: t.Union[tokens.BaseToken, str],
+        lexed_prepositions_and_cases: t.Iterator[t.Union[tokens.BaseToken, str]],
+    ) -> t.Iterator[t.Union[tokens.BaseToken, str]]:
+        hot_logger.debug("Pre-processing czech token {!r}.", czech)
+        kind = tokens.kind_of(czech)
+        if kind is tokens.TokenKind.FUTURE_FORM_START:
+            assert_that(next(lexed_prepositions_and_cases) is tokens.FutureFormTokenStart())
+            yield tokens.FutureFormTokenStart()
+        elif kind is tokens.TokenKind.TEXT:
+            for i, preposition_and_case in enumerate(lexed_prepositions_and_cases):
+                hot_logger.debug(
+                    "Pre-processing preposition and case {!r} in czech token {!r}.", preposition_and_case, czech
+                )
+                if preposition_and_case is tokens.SeparatorToken():
+                    hot_logger.debug("Skipping separator token (index={}).", i)
+                    assert i != 0
+                    break
+
+                yield preposition_and_case
+
+                if preposition_and_case is tokens.FutureFormTokenStart():
+                    hot_logger.trace("'tokens.FutureFormTokenStart' was found.")
+                    break
+        else:  # pragma: no cover
+            raise NotImplementedError(f"Unexpected czech token type: {czech} ({type(czech)})")
+
+    def _process(
+        self,
+        pre_processed: t.Iterator[
+            tuple[
+                t.Union[str, tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd],
+                list[t.Union[tokens.BaseToken, str]],
+            ]
+        ],
+    ) -> str:
+        result: str = ""
+        for czech, prepositions_and_cases in pre_processed:
+            hot_logger.debug(
+                "Processing czech={!r} prepositions_and_cases={!r} in pre-processed.", czech, prepositions_and_cases
+            )
+
+            skip = False
+            processed_prepositions_and_cases = ""
+            for i, preposition_and_case in enumerate(prepositions_and_cases):
+                hot_logger.debug(
+                    "Processing preposition_and_case={!r} (index={}) in prepositions and cases. "
+                    "Already processed: {!r}",
+                    preposition_and_case,
+                    i,
+                    processed_prepositions_and_cases,
+                )
+                if skip:
+                    hot_logger.debug(
+                        "Skipping preposition_and_case={!r} (index={}), skip was True.", preposition_and_case, i
+                    )
+                    skip = False
+                    continue
+
+                if preposition_and_case is tokens.SkipToken():
+                    hot_logger.debug("Found skip token.")
+                    if i == len(prepositions_and_cases) - 1 and processed_prepositions_and_cases.endswith(", "):
+                        hot_logger.trace("Removing trailing comma on the end.")
+                        processed_prepositions_and_cases = processed_prepositions_and_cases[:-2]
+                        break
+                    skip = True
+                    continue
+
+                processed_prepositions_and_cases += (
+                    added_part := self._process_preposition_and_case(preposition_and_case)
+                )
+                hot_logger.trace("Added {!r} to processed prepositions and cases.", added_part)
+
+            if not isinstance(czech, str):
+                hot_logger.debug(
+                    "'czech' is future form. (czech={!r} processed_prepositions_and_cases={!r})",
+                    czech,
+                    processed_prepositions_and_cases,
+                )
+                to_add = ((" " if result else "") + "[") if czech is tokens.FutureFormTokenStart() else "]"
+                hot_logger.trace("Adding {!r} to the result.", to_add)
+                result += to_add
+            else:
+                hot_logger.trace(
+                    "'czech' is not a future form. (czech={!r} processed_prepositions_and_cases={!r})",
+                    czech,
+                    processed_prepositions_and_cases,
+                )
+                result += ", " if result and not result.endswith("[") else ""
+                result += czech
+                if processed_prepositions_and_cases != "":
+                    result += " (" + processed_prepositions_and_cases + ")"
+        hot_logger.debug("Processed result: {!r}.", result)
+        return result
+
+
+def _measure(processor: VerbProcessor, contents: list[dict[str, str]], repeat: int) -> float:
+    """Process all contents ``repeat`` times and return elapsed time."""
+    process = processor.process
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in contents:
+            process(content)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """The entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="How many times to process every verb.")
+    args = parser.parse_args()
+    utils.setup_logging()
+
+    fields = Config().cards.verbs.fields
+    processors = {"two-pass": TwoPassVerbProcessor(), "single-pass": VerbProcessor()}
+    for name, verbs, repeat in (
+        ("examples", VERBS, args.repeat),
+        ("10 words", [long_verb(10)], args.repeat),
+        ("100 words", [long_verb(100)], max(args.repeat // 10, 1)),
+    ):
+        contents = [{fields.czech: czech, fields.prepositions_and_cases: pac} for czech, pac in verbs]
+        for content in contents:
+            assert processors["single-pass"].process(content) == processors["two-pass"].process(content), content
+
+        results = {engine: _measure(processor, contents, repeat) for engine, processor in processors.items()}
+        total = len(contents) * repeat
+        for engine, elapsed in results.items():
+            print(f"{name:>9} {engine:>16}: {elapsed:.3f}s for {total} verbs ({total / elapsed:.0f} verbs/s)")
+        print(f"{name:>9}          speedup: {results['two-pass'] / results['single-pass']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
-"""Main package for ``czech-plus`` addon."""
+"""Main package for ``czech-plus`` addon.
+
+Every submodule (even in worker processes, see :mod:`czech_plus.logic.parallel`) imports this
+package first, so only :mod:`czech_plus.config` is imported here. Anki hooks are imported in :func:`main`.
+"""
 
 from czech_plus._vendor.loguru import logger
 
-from czech_plus import config, utils
+from czech_plus import config  # isort:skip # must be imported before czech_plus.utils, they import each other
 
 __all__ = ["main"]
 
 
 def main() -> None:
     """Main function to initialize and run entire addon."""
+    from czech_plus import hooks, utils
+
     utils.setup_logging()
-    utils.compile_all_notes()
+    config.Config.on_reload(lambda *_: utils.setup_logging())
+    config.Config.on_reload(utils.recompile_changed_note_types)
+    hooks.register()
+    if config.Config().compiler.lazy:
+        logger.debug("Lazy compilation is enabled, notes will be compiled on review.")
+    else:
+        utils.compile_all_notes()
@@ -1,13 +1,15 @@
 """Module for config management."""
 import dataclasses
+import enum
+import itertools
 import json
+import os
 import threading
 import time
 import typing as t
 from enum import IntEnum
 from pathlib import Path
 
-import aqt
 from czech_plus._vendor.loguru import logger
 
 from czech_plus.utils import Singleton
@@ -18,11 +20,66 @@ if t.TYPE_CHECKING:
 BASE_DIR = Path(__file__).parent.parent
 _CONFIG_PATH = BASE_DIR / "config.json"
 _ADDON_META_PATH = BASE_DIR / "meta.json"
+USER_FILES_DIR = BASE_DIR / "user_files"
+"""Folder, that Anki preserves between addon updates. Use it for any persistent data."""
 _CONFIG_AS_DICT: "te.TypeAlias" = "dict[str, t.Union[str, _CONFIG_AS_DICT]]"
+_reload_callbacks: list[t.Callable[["Config", "Config"], None]] = []
+_reload_lock = threading.Lock()
+_next_version = itertools.count(1).__next__
+
+
+def _from_dict(cls: t.Any, value: t.Any, /) -> t.Any:  # type: ignore[misc] # Explicit "Any" is not allowed
+    """Recursively convert dict ``value`` to dataclass ``cls``."""
+    if dataclasses.is_dataclass(cls):
+        return cls(
+            **{
+                field.name: _from_dict(field.type, value[field.name])
+                for field in dataclasses.fields(cls)
+                if field.name in value
+            }
+        )
+    if isinstance(cls, type) and issubclass(cls, enum.Enum) and isinstance(value, str):
+        return cls[value]
+    return value
+
+
+def _merge_dicts(base: _CONFIG_AS_DICT, update: _CONFIG_AS_DICT, /) -> _CONFIG_AS_DICT:
+    """Recursively merge ``update`` into a copy of ``base``. Keys, missing in ``update``, keep values from ``base``."""
+    merged = dict(base)
+    for key, value in update.items():
+        base_value = base.get(key)
+        if isinstance(value, dict) and isinstance(base_value, dict):
+            merged[key] = _merge_dicts(base_value, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _share_unchanged(old: t.Any, new: t.Any, /) -> None:  # type: ignore[misc] # Explicit "Any" is not allowed
+    """Replace parts of the ``new`` config, which are equal to parts of the ``old`` one, with the old objects.
+
+    It must be called only before ``new`` is used anywhere.
+    """
+    for field in dataclasses.fields(new):
+        old_value, new_value = getattr(old, field.name), getattr(new, field.name)
+        if old_value == new_value:
+            object.__setattr__(new, field.name, old_value)
+        elif dataclasses.is_dataclass(new_value) and dataclasses.is_dataclass(old_value):
+            _share_unchanged(old_value, new_value)
+
+
+def _get_modification_time(path: Path, /) -> t.Optional[float]:
+    """Get modification time of the file or None, if it doesn't exist."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
 
 
 def _get_anki_config() -> _CONFIG_AS_DICT:
     """Get the config from Anki."""
+    import aqt  # not needed in worker processes, which don't read config from Anki
+
     if aqt.mw is None:
         return {}
     return t.cast(_CONFIG_AS_DICT, aqt.mw.addonManager.getConfig(BASE_DIR.stem))
@@ -49,6 +106,8 @@ class LogSettings:
     """Log level for the app."""
     json: bool = False
     """Upload logs into JSON."""
+    strict_checks: bool = False
+    """Log every failed internal check with a full traceback, instead of counting them in the compile summary."""
 
 
 @dataclasses.dataclass(frozen=True)
@@ -91,7 +150,7 @@ class NounCardsSettings:
 
     note_type_name: str = "Noun"
     """Name of the Note Type for nouns."""
-    fields: NounCardFields = NounCardFields()
+    fields: NounCardFields = dataclasses.field(default_factory=NounCardFields)
     """Settings for fields in noun cards."""
 
 
@@ -101,7 +160,7 @@ class VerbCardsSettings:
 
     note_type_name: str = "Verb"
     """Name of the Note Type for verbs."""
-    fields: VerbCardFields = VerbCardFields()
+    fields: VerbCardFields = dataclasses.field(default_factory=VerbCardFields)
     """Settings for fields in verb cards."""
 
 
@@ -111,94 +170,254 @@ class AdjectivesCardsSettings:
 
     note_type_name: str = "Adjective"
     """Name of the Note Type for adjectives."""
-    fields: AdjectiveCardFields = AdjectiveCardFields()
+    fields: AdjectiveCardFields = dataclasses.field(default_factory=AdjectiveCardFields)
     """Settings for fields in adjective cards."""
 
 
+_NOTE_TYPE_SETTINGS: "te.TypeAlias" = t.Union[NounCardsSettings, VerbCardsSettings, AdjectivesCardsSettings]
+"""Settings of any note type."""
+
+
 @dataclasses.dataclass(frozen=True)
 class CardsSettings:
     """Settings for cards."""
 
-    nouns: NounCardsSettings = NounCardsSettings()
+    nouns: NounCardsSettings = dataclasses.field(default_factory=NounCardsSettings)
     """Settings for noun cards."""
-    verbs: VerbCardsSettings = VerbCardsSettings()
+    verbs: VerbCardsSettings = dataclasses.field(default_factory=VerbCardsSettings)
     """Settings for verb cards."""
-    adjectives: AdjectivesCardsSettings = AdjectivesCardsSettings()
+    adjectives: AdjectivesCardsSettings = dataclasses.field(default_factory=AdjectivesCardsSettings)
     """Settings for adjective cards."""
 
+    def changed_note_types(self, previous: "CardsSettings", /) -> list[str]:
+        """Get note types, whose settings (name or fields) differ from the ``previous`` ones.
+
+        Args:
+            previous: Cards settings from the previous config snapshot.
+
+        Returns:
+            New names of the changed note types.
+        """
+        if self is previous:
+            return []
+        pairs: tuple[tuple[_NOTE_TYPE_SETTINGS, _NOTE_TYPE_SETTINGS], ...] = (
+            (self.nouns, previous.nouns),
+            (self.verbs, previous.verbs),
+            (self.adjectives, previous.adjectives),
+        )
+        return [
+            settings.note_type_name
+            for settings, previous_settings in pairs
+            if settings is not previous_settings and settings != previous_settings
+        ]
+
+
+@dataclasses.dataclass(frozen=True)
+class CompilerSettings:
+    """Settings for the notes compiler."""
+
+    incremental: bool = True
+    """Skip notes, whose source fields and processed field weren't changed since the last compilation."""
+    chunk_size: int = 500
+    """How many notes to read, process and write at once."""
+    processes: int = 1
+    """How many processes to use for processing notes. ``1`` disables parallel processing, ``0`` means CPU count."""
+    parallel_threshold: int = 5000
+    """Minimal count of notes to process them in parallel. Starting processes isn't free."""
+    lazy: bool = False
+    """Don't compile all notes on start, compile only notes, that are shown in reviewer or previewer."""
+    write_metrics: bool = False
+    """Write timings of every compilation to ``compile_metrics.json`` near ``config.json``."""
+    cache: bool = False
+    """Cache processed fields on the disk, so the same fields are never processed twice, even in other profiles."""
+    cache_max_entries: int = 100_000
+    """Maximum count of entries in the cache, the least recently used are removed first."""
+    cache_max_age_days: int = 90
+    """Remove entries from the cache, that weren't used for this count of days."""
+
 
 @dataclasses.dataclass(frozen=True)
 class Config(metaclass=Singleton):
-    """Config for the addon."""
+    """Config for the addon.
 
-    logging: LogSettings = LogSettings()
+    Config is never changed after it was created. On reload, a new snapshot with bigger
+    :attr:`version` replaces the singleton, so code, that keeps a reference to the old one,
+    still sees consistent values. Parts of the snapshot, which weren't changed, are the same
+    objects as in the previous snapshot, so ``old.cards is new.cards`` is a cheap check, whether
+    anything in cards settings was changed.
+    """
+
+    logging: LogSettings = dataclasses.field(default_factory=LogSettings)
     """Settings for logs."""
-    cards: CardsSettings = CardsSettings()
+    cards: CardsSettings = dataclasses.field(default_factory=CardsSettings)
     """Settings for cards."""
+    compiler: CompilerSettings = dataclasses.field(default_factory=CompilerSettings)
+    """Settings for the notes compiler."""
+
+    _watching: t.ClassVar[bool] = False
+    """Whether config is already watched for changes, see :meth:`_start_watching_for_changes`."""
 
     def __post_init__(self) -> None:
         """Post init hook."""
+        object.__setattr__(self, "_version", _next_version())
         self._setup()
         self._start_watching_for_changes()
 
+    @property
+    def version(self) -> int:
+        """Version of the snapshot. Every new snapshot (e.g. after reload) has bigger version."""
+        return t.cast(int, self.__dict__["_version"])
+
+    @classmethod
+    def on_reload(cls, callback: t.Callable[["Config", "Config"], None], /) -> None:
+        """Call ``callback`` with the previous and the new config, every time it is reloaded after a change.
+
+        Args:
+            callback: Function to call. Exceptions in it are logged and don't stop other callbacks.
+        """
+        _reload_callbacks.append(callback)
+
     def _setup(self) -> None:
         """Perform setup of the config."""
         self._write_config()
-        config = _get_anki_config()
-
-        self._set_values(self, config)
-
-        # special handling for enums
-        if isinstance(self.logging.level, str):  # type: ignore[unreachable]
-            object.__setattr__(self.logging, "level", LogLevel[self.logging.level])  # type: ignore[unreachable]
+        self._fill(_merge_dicts(self.as_dict(), _get_anki_config()))
 
     def _write_config(self) -> None:
-        """Write config to the file."""
+        """Write config to the file, if it differs from the file's content.
+
+        The content is written to a temporary file first, which then replaces the config,
+        so a crash never leaves a half-written file.
+        """
+        content = json.dumps(self.as_dict(), indent=4, ensure_ascii=False)
+        try:
+            if _CONFIG_PATH.read_text(encoding="utf8") == content:
+                logger.trace("Config file is up to date, not writing it.")
+                return
+        except FileNotFoundError:
+            pass
+
+        temp_path = _CONFIG_PATH.with_name(f"{_CONFIG_PATH.name}.{os.getpid()}.tmp")
+        try:
+            temp_path.write_text(content, encoding="utf8")
+            os.replace(temp_path, _CONFIG_PATH)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def as_dict(self) -> _CONFIG_AS_DICT:
+        """Convert config to dict, that can be serialized to JSON.
+
+        Returns:
+            Config in the same format, as Anki stores it.
+        """
         config = t.cast(_CONFIG_AS_DICT, dataclasses.asdict(self))
         config["logging"]["level"] = config["logging"]["level"].name  # type: ignore[index,union-attr]
+        return config
 
-        with _CONFIG_PATH.open("w", encoding="utf8") as config_file:
-            config_file.write(json.dumps(config, indent=4, ensure_ascii=False))
+    @classmethod
+    def from_dict(cls, config: _CONFIG_AS_DICT, /) -> "Config":
+        """Create config from dict (see :meth:`as_dict`).
 
-    def _set_values(self, object_to_set: t.Any, config: _CONFIG_AS_DICT, /) -> None:  # type: ignore[misc] # Explicit "Any" is not allowed
-        """Set values from dict config to object.
+        Unlike the usual constructor, it doesn't read config from Anki, doesn't write
+        ``config.json`` and doesn't start watching for changes. The created object also
+        doesn't replace the singleton instance.
 
-        We use this method of setting attributes because we use frozen
-        dataclass. This was found on https://github.com/python/cpython/issues/82625.
+        Args:
+            config: Dict config. Missing keys are filled with default values.
+
+        Returns:
+            New config object.
+        """
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "_version", _next_version())
+        instance._fill(config)
+        return instance
+
+    def _fill(self, config: _CONFIG_AS_DICT, /) -> None:
+        """Set every field of ``self`` to a new object, created from dict config.
+
+        Nested settings are never changed in place, so values from Anki can't leak into default
+        values or into other snapshots. It must be called only before ``self`` is used anywhere.
 
         Args:
-            object_to_set: Object to set values to. To support recursion.
-            config: Dict config to set values from.
+            config: Dict config (see :meth:`as_dict`). Missing keys are filled with default values.
         """
-        for key, value in config.items():
-            if isinstance(value, dict):
-                self._set_values(getattr(object_to_set, key), value)
-                continue
-            object.__setattr__(object_to_set, key, value)
+        for field in dataclasses.fields(self):
+            if field.name in config:
+                value = _from_dict(field.type, config[field.name])
+            else:
+                value = field.default_factory()  # type: ignore[misc] # all fields have a default factory
+            object.__setattr__(self, field.name, value)
 
     @classmethod
     def _start_watching_for_changes(cls) -> None:
         """Start watching for changes in config.
 
-        This ensures that we will never start two config watchers in one time.
+        Anki calls the action, registered with ``setConfigUpdatedAction``, right after the user
+        saved config of the addon, so nothing runs while the config isn't changed. Only on Anki
+        versions without this action, a thread polls ``meta.json`` every second.
+
+        This ensures that we will never start watching twice.
         """
-        if not hasattr(cls, "_watcher"):
-            logger.trace("Watcher wasn't started yet, starting it now.")
-            cls._watcher: threading.Thread = threading.Thread(target=lambda: cls._watch_for_changes(cls()), daemon=True)  # type: ignore[misc,attr-defined]
-            cls._watcher.start()  # type: ignore[attr-defined]
-        else:
-            logger.trace("Watcher was started before.")
+        if cls._watching:
+            logger.trace("Config is already watched for changes.")
+            return
+
+        import aqt  # not needed in worker processes, which don't watch config
+
+        if aqt.mw is None:
+            logger.trace("Anki main window is not initialized, config changes won't be watched.")
+            return
+        cls._watching = True
+
+        addon_manager = aqt.mw.addonManager
+        if hasattr(addon_manager, "setConfigUpdatedAction"):
+            addon_manager.setConfigUpdatedAction(BASE_DIR.stem, lambda new_config: cls()._reload(new_config))
+            return
+
+        logger.trace("Anki doesn't support config updated action, polling for changes.")
+        threading.Thread(target=lambda: cls._watch_for_changes(cls()), daemon=True).start()
 
     def _watch_for_changes(self) -> None:
-        """Watch for changes in config file and update ``self`` based on changes."""
+        """Poll ``meta.json`` (Anki writes config there) and reload ``self`` when it changes."""
         logger.debug("Start watching for changes in config file.")
-        stamp = _ADDON_META_PATH.stat().st_mtime
+        stamp = _get_modification_time(_ADDON_META_PATH)
 
         while True:
-            new_stamp = _ADDON_META_PATH.stat().st_mtime
+            time.sleep(1)
+            new_stamp = _get_modification_time(_ADDON_META_PATH)
             if new_stamp != stamp:
-                logger.info("Config file changed. Reloading it.")
                 stamp = new_stamp
-                self._setup()
+                type(self)()._reload(_get_anki_config())
 
-            time.sleep(1)
+    def _reload(self, new_config: _CONFIG_AS_DICT, /) -> None:
+        """Replace the singleton with a new snapshot and run callbacks from :meth:`on_reload`.
+
+        Nothing is done, if no value in the new config differs from the current one.
+
+        Args:
+            new_config: Config from Anki.
+        """
+        with _reload_lock:
+            current_config = self.as_dict()
+            merged_config = _merge_dicts(current_config, new_config)
+            if merged_config == current_config:
+                logger.trace("Config wasn't changed, skipping reload.")
+                return
+
+            snapshot = type(self).from_dict(merged_config)
+            _share_unchanged(self, snapshot)
+            type(self)._instances[type(self)] = snapshot
+        logger.info(f"Config was changed. Reloaded it (version {snapshot.version}).")
+        snapshot._run_reload_callbacks(self)
+
+    def _run_reload_callbacks(self, previous: "Config", /) -> None:
+        """Run all callbacks, registered with :meth:`on_reload`.
+
+        Args:
+            previous: Config before the reload.
+        """
+        for callback in _reload_callbacks:
+            try:
+                callback(previous, self)
+            except Exception:
+                logger.exception(f"Config reload callback {callback!r} failed.")
@@ -0,0 +1,164 @@
+"""Module for Anki hooks, that keep processed fields up to date while editing.
+
+Without them, processed field is updated only by :func:`czech_plus.utils.compile_all_notes`
+on start. With them, only the edited note is compiled, right after one of its source fields
+was changed. If :attr:`~czech_plus.config.CompilerSettings.lazy` is enabled, notes are also
+compiled when they are shown.
+"""
+import typing as t
+from collections.abc import Sequence
+
+from aqt import gui_hooks
+from czech_plus._vendor.loguru import logger
+
+from czech_plus import config as config_module
+from czech_plus import utils
+from czech_plus.logic import processor
+from czech_plus.logic.compiler import Compiler
+
+import anki.cards  # isort:skip # Circular import before importing anki.collection
+import anki.notes  # isort:skip
+
+__all__ = ["register", "on_editor_did_unfocus_field", "on_add_cards_did_add_note", "on_card_will_show"]
+
+_REVIEW_CACHE_SIZE = 1024
+"""How many processed fields to keep in memory for :func:`on_card_will_show`."""
+_review_cache: utils.LRUCache[str, str] = utils.LRUCache(_REVIEW_CACHE_SIZE)
+
+
+def register() -> None:
+    """Register all hooks in Anki."""
+    gui_hooks.editor_did_unfocus_field.append(on_editor_did_unfocus_field)
+    gui_hooks.add_cards_did_add_note.append(on_add_cards_did_add_note)
+    gui_hooks.card_will_show.append(on_card_will_show)
+    logger.debug("Hooks were registered.")
+
+
+def on_editor_did_unfocus_field(changed: bool, note: anki.notes.Note, field_index: int) -> bool:
+    """Compile the note in editor, if one of its source fields was changed.
+
+    The note is only updated in memory, editor saves it by itself (or adds it, if it is a new note).
+
+    Args:
+        changed: Whether the note was already changed by other hooks.
+        note: The note in editor.
+        field_index: Index of the field, that lost focus.
+
+    Returns:
+        Whether the note was changed, so editor will reload it.
+    """
+    note_type = _get_note_type_name(note)
+    if note_type is None:
+        return changed
+
+    note_processor = processor.get_processor(note_type)
+    if note_processor is None or note.keys()[field_index] not in note_processor.source_fields:
+        return changed
+
+    return _update_note(note, note_type) or changed
+
+
+def on_add_cards_did_add_note(note: anki.notes.Note) -> None:
+    """Compile the note, that was just added.
+
+    Args:
+        note: The added note, it is already in the collection.
+    """
+    note_type = _get_note_type_name(note)
+    if note_type is None or processor.get_processor(note_type) is None:
+        return
+
+    if _update_note(note, note_type):
+        note.col.update_note(note, skip_undo_entry=True)
+
+
+def on_card_will_show(text: str, card: anki.cards.Card, kind: str) -> str:
+    """Compile the note of the shown card, if its processed field is missing or out of date.
+
+    Does nothing, unless :attr:`~czech_plus.config.CompilerSettings.lazy` is enabled. Processed
+    fields are cached by fingerprint of the source fields, so cards, that are shown again, cost
+    nothing. Updated note is saved right away, and the old processed content is replaced with the
+    new one in the already rendered text, so output of other filters is kept. If the old content
+    isn't in the text (for example, the field was empty), the new one is shown next time.
+
+    Args:
+        text: Already rendered question or answer.
+        card: The shown card.
+        kind: Where the card is shown, for example ``reviewQuestion``.
+
+    Returns:
+        The text to show.
+    """
+    if not config_module.Config().compiler.lazy:
+        return text
+    if kind.startswith("clayout"):  # card layout editor can show unsaved note type
+        return text
+
+    note = card.note()
+    note_type = _get_note_type_name(note)
+    if note_type is None or processor.get_processor(note_type) is None:
+        return text
+
+    old_fields = list(note.fields)
+    if not _update_note(note, note_type, cache=_review_cache):
+        return text
+
+    try:
+        note.col.update_note(note, skip_undo_entry=True)
+    except Exception:
+        logger.exception(f"Failed to save note {note.id}.")
+        return text
+    return _replace_changed_fields(text, old_fields, note.fields)
+
+
+def _get_note_type_name(note: anki.notes.Note) -> t.Optional[str]:
+    """Get name of the note's note type.
+
+    Args:
+        note: The note.
+
+    Returns:
+        Name of the note type or :obj:`None`, if note type wasn't found.
+    """
+    note_type = note.note_type()
+    if note_type is None:
+        return None
+    return t.cast(str, note_type["name"])
+
+
+def _update_note(note: anki.notes.Note, note_type: str, *, cache: t.Optional[utils.LRUCache[str, str]] = None) -> bool:
+    """Update processed field of the note in memory.
+
+    Errors are only logged, so a typo in a note will never break the editor or reviewer.
+
+    Args:
+        note: The note.
+        note_type: Name of the note type.
+        cache: See :meth:`czech_plus.logic.compiler.Compiler.update_note`.
+
+    Returns:
+        Whether the processed field was changed.
+    """
+    logger.debug(f"Compiling edited note {note.id} ({note_type})...")
+    try:
+        return Compiler(note.col.weakref).update_note(note, note_type, cache=cache)
+    except Exception:
+        logger.exception(f"Failed to compile note {note.id}.")
+        return False
+
+
+def _replace_changed_fields(text: str, old_fields: Sequence[str], new_fields: Sequence[str]) -> str:
+    """Replace old content of the changed fields with the new one in the rendered text.
+
+    Args:
+        text: Rendered question or answer.
+        old_fields: Fields of the note before it was compiled.
+        new_fields: Fields of the note after it was compiled.
+
+    Returns:
+        The text with the new content. Empty fields can't be found in the text, so they are skipped.
+    """
+    for old, new in zip(old_fields, new_fields):
+        if old != new and old:
+            text = text.replace(old, new)
+    return text
@@ -0,0 +1,220 @@
+"""Module for persistent cache of processed fields.
+
+Many profiles share the same downloaded decks, so the same fields are processed again and again.
+This cache is stored in :data:`~czech_plus.config.USER_FILES_DIR`, which is shared by all profiles,
+and survives restarts.
+"""
+import contextlib
+import sqlite3
+import threading
+import time
+import typing as t
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from czech_plus._vendor.loguru import logger
+
+from czech_plus import config as config_module
+
+__all__ = ["ProcessedCache", "get_cache", "reset_cache"]
+
+_SECONDS_IN_DAY = 24 * 60 * 60
+_QUERY_BATCH_SIZE = 500
+"""How many keys to look up with one query, SQLite limits count of parameters."""
+
+
+class ProcessedCache:
+    """Persistent cache of processed fields.
+
+    Keys are fingerprints of the source fields (see :func:`czech_plus.logic.fingerprint.fingerprint`),
+    so they already include hash of the note type settings and processor version. Every key is also
+    scoped by note type name.
+
+    New values are written to the disk right away, or at the end of :meth:`batch`. Inside :meth:`batch`,
+    entries for many keys can be read at once with :meth:`prefetch`. Entries, that weren't
+    used for :attr:`~czech_plus.config.CompilerSettings.cache_max_age_days` days, and the oldest entries
+    over :attr:`~czech_plus.config.CompilerSettings.cache_max_entries` are evicted on open.
+
+    Example:
+        .. code-block:: python
+
+            cache = ProcessedCache()
+            with cache.batch():
+                cache.prefetch(note_type, keys)
+                for key, content in notes:
+                    if (processed := cache.get(note_type, key)) is None:
+                        processed = process(content)
+                        cache.set(note_type, key, processed)
+    """
+
+    def __init__(self, path: t.Optional[Path] = None) -> None:
+        if path is None:
+            path = config_module.USER_FILES_DIR / "processed_cache.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        # the same file can be opened by other profiles or worker processes
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS processed ("
+            " note_type TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " used_at INTEGER NOT NULL,"
+            " PRIMARY KEY (note_type, key)"
+            ") WITHOUT ROWID"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS processed_used_at ON processed (used_at)")
+        self._lock = threading.Lock()
+        self._batch_depth = 0
+        self._changed: dict[tuple[str, str], str] = {}
+        self._used: set[tuple[str, str]] = set()
+        self._prefetched: dict[tuple[str, str], t.Optional[tuple[str, int]]] = {}
+        self._today = int(time.time() // _SECONDS_IN_DAY)
+
+        self.evict()
+
+    def get(self, note_type: str, key: str, /) -> t.Optional[str]:
+        """Get processed field from the cache.
+
+        Args:
+            note_type: Name of the note type.
+            key: Fingerprint of the source fields.
+
+        Returns:
+            Processed field or :obj:`None`, if it isn't in the cache.
+        """
+        with self._lock:
+            if (note_type, key) in self._changed:
+                return self._changed[(note_type, key)]
+
+            if (note_type, key) in self._prefetched:
+                row = self._prefetched[(note_type, key)]
+            else:
+                row = self._connection.execute(
+                    "SELECT value, used_at FROM processed WHERE note_type = ? AND key = ?", (note_type, key)
+                ).fetchone()
+            if row is None:
+                return None
+
+            value, used_at = row
+            if used_at < self._today:
+                self._used.add((note_type, key))
+            return value
+
+    def prefetch(self, note_type: str, keys: Iterable[str], /) -> None:
+        """Read entries for many keys with a few queries, so :meth:`get` won't query them one by one.
+
+        Read entries are kept until the end of :meth:`batch`.
+
+        Args:
+            note_type: Name of the note type.
+            keys: Fingerprints of the source fields.
+        """
+        with self._lock:
+            new_keys = [key for key in dict.fromkeys(keys) if (note_type, key) not in self._prefetched]
+            for start in range(0, len(new_keys), _QUERY_BATCH_SIZE):
+                part = new_keys[start : start + _QUERY_BATCH_SIZE]
+                found = {
+                    key: (value, used_at)
+                    for key, value, used_at in self._connection.execute(
+                        "SELECT key, value, used_at FROM processed"
+                        f" WHERE note_type = ? AND key IN ({', '.join('?' * len(part))})",
+                        (note_type, *part),
+                    )
+                }
+                for key in part:
+                    self._prefetched[(note_type, key)] = found.get(key)
+
+    def set(self, note_type: str, key: str, value: str, /) -> None:
+        """Put processed field into the cache.
+
+        Args:
+            note_type: Name of the note type.
+            key: Fingerprint of the source fields.
+            value: Processed field.
+        """
+        with self._lock:
+            self._changed[(note_type, key)] = value
+        if self._batch_depth == 0:
+            self.save()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Write all new values in one transaction, at the end of ``with`` block."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._prefetched.clear()
+                self.save()
+
+    def save(self) -> None:
+        """Write new values and update usage dates."""
+        with self._lock:
+            if not self._changed and not self._used:
+                return
+
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO processed (note_type, key, value, used_at) VALUES (?, ?, ?, ?)",
+                    ((note_type, key, value, self._today) for (note_type, key), value in self._changed.items()),
+                )
+                self._connection.executemany(
+                    "UPDATE processed SET used_at = ? WHERE note_type = ? AND key = ?",
+                    ((self._today, note_type, key) for note_type, key in self._used),
+                )
+            logger.trace(f"Saved {len(self._changed)} new and {len(self._used)} used cache entries.")
+            self._changed.clear()
+            self._used.clear()
+
+    def evict(self) -> None:
+        """Remove too old entries and the oldest entries over the limit."""
+        settings = config_module.Config().compiler
+        with self._lock, self._connection:
+            removed = self._connection.execute(
+                "DELETE FROM processed WHERE used_at < ?", (self._today - settings.cache_max_age_days,)
+            ).rowcount
+            removed += self._connection.execute(
+                "DELETE FROM processed WHERE (note_type, key) IN ("
+                " SELECT note_type, key FROM processed ORDER BY used_at DESC LIMIT -1 OFFSET ?"
+                ")",
+                (settings.cache_max_entries,),
+            ).rowcount
+        if removed:
+            logger.debug(f"Evicted {removed} entries from the processed cache.")
+
+    def close(self) -> None:
+        """Save changes and close connection to the database."""
+        self.save()
+        self._connection.close()
+
+
+_cache: t.Optional[ProcessedCache] = None
+
+
+def get_cache() -> t.Optional[ProcessedCache]:
+    """Get cache of the current process.
+
+    Returns:
+        The cache or :obj:`None`, if it is disabled in config.
+    """
+    global _cache
+
+    if not config_module.Config().compiler.cache:
+        return None
+    if _cache is None:
+        _cache = ProcessedCache()
+    return _cache
+
+
+def reset_cache() -> None:
+    """Close cache of the current process, so :func:`get_cache` will open it again."""
+    global _cache
+
+    if _cache is not None:
+        _cache.close()
+        _cache = None
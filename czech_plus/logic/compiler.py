@@ -1,13 +1,93 @@
 """Module for the card compiler."""
+import collections
+import concurrent.futures
+import contextlib
+import dataclasses
+import itertools
 import typing as t
+from collections.abc import (
+    Collection,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
 
+import anki.dbproxy
+import anki.utils
 from anki.collection import Collection as AnkiCollection
 from czech_plus._vendor.loguru import logger
 
-from czech_plus.config import Config
-from czech_plus.logic import processor
+from czech_plus.config import _NOTE_TYPE_SETTINGS, Config
+from czech_plus.logic import parallel, processor
+from czech_plus.logic.diagnostics import Diagnostics
+from czech_plus.logic.fingerprint import FingerprintStore, fingerprint
+from czech_plus.logic.metrics import CompileMetrics, MetricsRecorder, timed
+from czech_plus.utils import hot_logger
 
-import anki.notes  # isort:skip # Circular import before importing anki.collection
+import anki.models  # isort:skip # Circular import before importing anki.collection
+import anki.notes  # isort:skip
+
+
+@dataclasses.dataclass
+class CompileResult:
+    """Counts of notes after the compilation."""
+
+    written: int = 0
+    """Notes, whose processed field was changed and written to the collection."""
+    unchanged: int = 0
+    """Notes, whose processed field is already up to date."""
+    failed: int = 0
+    """Notes, that failed to compile."""
+    cancelled: bool = False
+    """Whether the compilation was cancelled before all notes were compiled."""
+    metrics: t.Optional[CompileMetrics] = dataclasses.field(default=None, compare=False, repr=False)
+    """Timings of the run, set only by :meth:`Compiler.compile_all_notes`."""
+    diagnostics: Diagnostics = dataclasses.field(default_factory=Diagnostics, compare=False, repr=False)
+    """Problems with notes, found while compiling."""
+
+    def __add__(self, other: "CompileResult") -> "CompileResult":
+        """Sum counts of two results."""
+        return CompileResult(
+            written=self.written + other.written,
+            unchanged=self.unchanged + other.unchanged,
+            failed=self.failed + other.failed,
+            cancelled=self.cancelled or other.cancelled,
+            diagnostics=self.diagnostics + other.diagnostics,
+        )
+
+
+class _NoteRow(t.NamedTuple):
+    """Note, read from the ``notes`` table with all columns, that are needed to write it back."""
+
+    id: int
+    guid: str
+    mid: int
+    mod: int
+    usn: int
+    tags: str
+    content: dict[str, str]
+    """Fields of the note by their names."""
+
+
+@dataclasses.dataclass
+class _Chunk:
+    """Chunk of notes with the same note type, that was read from the collection."""
+
+    note_type: str
+    """Name of the note type."""
+    size: int
+    """Count of all notes in the chunk, including skipped."""
+    to_process: dict[int, _NoteRow] = dataclasses.field(default_factory=dict)
+    """Notes, that need to be processed."""
+    fingerprints: dict[int, str] = dataclasses.field(default_factory=dict)
+    """New fingerprints of the notes, that need to be processed. They are updated, if processed field is written."""
+    result: CompileResult = dataclasses.field(default_factory=CompileResult)
+    """Counts of notes, that were already skipped or failed while reading."""
+
+    def rows_to_process(self) -> list[tuple[int, dict[str, str]]]:
+        """Get rows for :func:`czech_plus.logic.parallel.process_rows` (IDs and fields of the notes to process)."""
+        return [(note.id, note.content) for note in self.to_process.values()]
 
 
 class Compiler:
@@ -30,69 +110,538 @@ class Compiler:
             self._cached_anki_collection = self._get_anki_collection()
         return self._cached_anki_collection
 
-    def compile_all_notes(self) -> None:
+    def compile_all_notes(
+        self,
+        *,
+        on_progress: t.Optional[t.Callable[[int, int], None]] = None,
+        should_cancel: t.Optional[t.Callable[[], bool]] = None,
+        note_types: t.Optional[Collection[str]] = None,
+    ) -> CompileResult:
         """Compile all notes.
 
-        Just fetches all notes via :meth:`_get_notes_ids` and calls
-        :meth:`compile_note` for each of them.
+        Streams all notes of configured note types via :meth:`_get_chunks` and compiles
+        every chunk of them (see :attr:`~czech_plus.config.CompilerSettings.chunk_size`).
+        If :attr:`~czech_plus.config.CompilerSettings.incremental` is enabled, notes with unchanged
+        source fields and processed field are skipped.
+
+        Timings of every phase are returned in :attr:`CompileResult.metrics`, and if
+        :attr:`~czech_plus.config.CompilerSettings.write_metrics` is enabled, also written
+        to ``compile_metrics.json``. Problems with notes are not logged one by one, instead
+        one summary of :attr:`CompileResult.diagnostics` is logged at the end.
+
+        This method doesn't touch UI, so it is safe to run it in a background thread.
+
+        Args:
+            on_progress: Called after every chunk with count of already compiled notes and total count.
+            should_cancel: Called before every chunk, if it returns :obj:`True`, the compilation stops.
+                Already compiled chunks stay written.
+            note_types: Names of the note types to compile. All configured note types by default.
+
+        Returns:
+            Counts of written, unchanged and failed notes.
         """
         logger.debug("Compile notes was called.")
+        recorder = MetricsRecorder()
+        result = CompileResult()
+        with recorder.phase("discovery"):
+            note_types_ids = self._get_note_types(only=note_types)
+            done, total = 0, self._count_notes(note_types_ids)
+        # when processing in parallel, keep some chunks in the queue so workers never wait for us
+        in_flight: collections.deque[tuple[_Chunk, "concurrent.futures.Future[list[parallel.ProcessedRow]]"]]
+        in_flight = collections.deque()
+
+        with recorder.phase("load"):
+            fingerprints_context: t.ContextManager[t.Optional[FingerprintStore]] = contextlib.nullcontext()
+            if self._config.compiler.incremental:
+                fingerprints_context = FingerprintStore(str(self._anki_collection.path))
+        workers = parallel.get_workers_count(total)
+        with fingerprints_context as fingerprints, parallel.get_executor(workers) as pool:
+            max_in_flight = workers * 2 if workers > 1 else 1
+            executor: concurrent.futures.Executor = pool
 
-        for note_id, note_type in self._get_notes_ids():
+            def fall_back_to_serial() -> None:
+                nonlocal executor
+                if not isinstance(executor, parallel.SerialExecutor):
+                    logger.exception("Worker process died, processing the rest of the notes in the main process.")
+                    executor = parallel.SerialExecutor()
+
+            def submit(chunk: _Chunk) -> "concurrent.futures.Future[list[parallel.ProcessedRow]]":
+                try:
+                    return executor.submit(parallel.process_rows, chunk.note_type, chunk.rows_to_process())
+                except concurrent.futures.BrokenExecutor:
+                    fall_back_to_serial()
+                    return executor.submit(parallel.process_rows, chunk.note_type, chunk.rows_to_process())
+
+            def finish_oldest_chunk() -> None:
+                nonlocal result, done
+                chunk, future = in_flight.popleft()
+                try:
+                    try:
+                        processed_rows = future.result()
+                    except concurrent.futures.BrokenExecutor:
+                        fall_back_to_serial()
+                        processed_rows = submit(chunk).result()
+                    for row in processed_rows:
+                        recorder.add_time("lexing", row.lexing)
+                        recorder.add_time("processing", row.elapsed - row.lexing)
+                        recorder.add_note(row.note_id, chunk.note_type, row.elapsed)
+                    with recorder.phase("flush"):
+                        result += self._finish_chunk(chunk, processed_rows, fingerprints=fingerprints)
+                except Exception:
+                    logger.exception(f"Failed to compile chunk of {chunk.size} notes ({chunk.note_type})")
+                    result.failed += chunk.size
+
+                done += chunk.size
+                recorder.add_notes(chunk.size)
+                if on_progress is not None:
+                    on_progress(done, total)
+
+            chunks = timed(self._get_chunks(note_types_ids), lambda seconds: recorder.add_time("load", seconds))
+            for note_type, notes in chunks:
+                if should_cancel is not None and should_cancel():
+                    logger.info(f"Compilation was cancelled after {done} of {total} notes.")
+                    result.cancelled = True
+                    break
+
+                try:
+                    with recorder.phase("load"):
+                        chunk = self._read_chunk(note_type, notes, fingerprints=fingerprints)
+                except Exception:
+                    logger.exception(f"Failed to compile chunk of {len(notes)} notes ({note_type})")
+                    result.failed += len(notes)
+                    done += len(notes)
+                    recorder.add_notes(len(notes))
+                    continue
+
+                in_flight.append((chunk, submit(chunk)))
+                if len(in_flight) >= max_in_flight:
+                    finish_oldest_chunk()
+
+            while in_flight:
+                finish_oldest_chunk()
+
+            if fingerprints is not None:
+                with recorder.phase("flush"):
+                    fingerprints.save()
+
+        result.metrics = recorder.finish()
+        logger.info(
+            f"Compiled notes: {result.written} written, {result.unchanged} unchanged, {result.failed} failed"
+            f" in {result.metrics.elapsed:.2f}s ({result.metrics.notes_per_second:.0f} notes/s)."
+        )
+        logger.debug(f"Compile phases: {result.metrics.phases}")
+        result.diagnostics.log_summary()
+        if self._config.compiler.write_metrics:
             try:
-                self.compile_note(note_id, note_type)
+                result.metrics.write()
             except Exception:
-                logger.exception(f"Failed to compile note {note_id} ({note_type})")
+                logger.exception("Failed to write compile metrics.")
+        return result
+
+    def compile_notes(
+        self, note_type: str, notes_ids: Sequence[int], *, fingerprints: t.Optional[FingerprintStore] = None
+    ) -> CompileResult:
+        """Compile a chunk of notes with the same note type.
+
+        Unlike :meth:`compile_note`, it reads fields of all notes with one query,
+        and writes all changed notes in one transaction. Notes, whose processed
+        field is already up to date, are not written, so Anki won't sync them again.
+
+        Args:
+            note_type: Name of the note type.
+            notes_ids: IDs of the notes.
+            fingerprints: If passed, notes will be skipped if their fingerprints
+                weren't changed since the last compilation.
+
+        Returns:
+            Counts of written, unchanged and failed notes in this chunk. Summary of problems is already logged.
+        """
+        chunk = self._read_chunk(note_type, list(self._get_notes(note_type, notes_ids)), fingerprints=fingerprints)
+        processed_rows = parallel.process_rows(note_type, chunk.rows_to_process())
+        result = self._finish_chunk(chunk, processed_rows, fingerprints=fingerprints)
+        result.diagnostics.log_summary()
+        return result
 
-    def compile_note(self, note_id: int, note_type: str) -> None:
+    def _read_chunk(
+        self,
+        note_type: str,
+        notes: Sequence[_NoteRow],
+        *,
+        fingerprints: t.Optional[FingerprintStore] = None,
+    ) -> "_Chunk":
+        """Filter out notes of the chunk, that weren't changed since the last compilation.
+
+        Args:
+            note_type: Name of the note type.
+            notes: Notes of the chunk.
+            fingerprints: If passed, notes will be skipped if their fingerprints
+                weren't changed since the last compilation.
+
+        Returns:
+            Chunk with notes, that need to be processed.
+        """
+        logger.debug(f"Compiling {len(notes)} notes ({note_type})...")
+        chunk = _Chunk(note_type=note_type, size=len(notes))
+
+        for note in notes:
+            note_id = note.id
+            if fingerprints is not None:
+                try:
+                    new_fingerprint = self._get_fingerprint(note.content, note_type)
+                except Exception as exception:
+                    logger.opt(exception=True).debug(f"Failed to compile note {note_id} ({note_type})")
+                    chunk.result.diagnostics.add(
+                        "failed to compute fingerprint", note_id, f"{type(exception).__name__}: {exception}"
+                    )
+                    chunk.result.failed += 1
+                    continue
+
+                if fingerprints.get(note_id) == new_fingerprint:
+                    logger.trace(f"Note {note_id} wasn't changed since the last compilation, skipping.")
+                    chunk.result.unchanged += 1
+                    continue
+                chunk.fingerprints[note_id] = new_fingerprint
+
+            chunk.to_process[note_id] = note
+
+        return chunk
+
+    def _finish_chunk(
+        self,
+        chunk: "_Chunk",
+        processed_rows: Sequence[parallel.ProcessedRow],
+        *,
+        fingerprints: t.Optional[FingerprintStore] = None,
+    ) -> CompileResult:
+        """Write processed notes, which were changed, and save their fingerprints.
+
+        Args:
+            chunk: Result of :meth:`_read_chunk`.
+            processed_rows: Result of :func:`czech_plus.logic.parallel.process_rows` for the chunk.
+            fingerprints: Store to save new fingerprints into.
+
+        Returns:
+            Counts of written, unchanged and failed notes in this chunk.
+        """
+        result = dataclasses.replace(chunk.result)
+        processed_field_name = self._get_dispatch(chunk.note_type).processed_field
+
+        processed_notes: list[tuple[_NoteRow, str]] = []
+        for note_id, processed, error, *_, issues in processed_rows:
+            result.diagnostics.add_many(issues, note_id)
+            if processed is None:
+                hot_logger.debug("Failed to compile note {} ({})\n{}", note_id, chunk.note_type, error)
+                result.diagnostics.add("failed to process", note_id, error)
+                chunk.fingerprints.pop(note_id, None)
+                result.failed += 1
+                continue
+
+            note = chunk.to_process[note_id]
+            if note.content.get(processed_field_name) == processed:
+                logger.trace(f"Processed field of note {note_id} is already up to date.")
+                result.unchanged += 1
+                continue
+            processed_notes.append((note, processed))
+            if note_id in chunk.fingerprints:
+                chunk.fingerprints[note_id] = self._get_fingerprint(
+                    {**note.content, processed_field_name: processed}, chunk.note_type
+                )
+
+        self._write_processed(chunk.note_type, processed_notes)
+        result.written += len(processed_notes)
+        if fingerprints is not None:
+            for note_id, new_fingerprint in chunk.fingerprints.items():
+                fingerprints.set(note_id, new_fingerprint)
+        return result
+
+    def compile_note(self, note_id: int, note_type: str, *, fingerprints: t.Optional[FingerprintStore] = None) -> bool:
         """Compile a note.
 
         Args:
             note_id: ID of the note.
             note_type: Name of the note type.
+            fingerprints: If passed, the note will be skipped if its fingerprint
+                wasn't changed since the last compilation.
+
+        Returns:
+            Whether the note was written. It isn't written, if processed field is already up to date.
         """
         logger.debug(f"Compiling note {note_id} ({note_type})...")
 
         note = anki.notes.Note(self._anki_collection, id=anki.notes.NoteId(note_id))
-        processed = processor.process_card(dict(note.items()), note_type)
+        content = dict(note.items())
+
+        new_fingerprint = None
+        if fingerprints is not None:
+            new_fingerprint = self._get_fingerprint(content, note_type)
+            if fingerprints.get(note_id) == new_fingerprint:
+                logger.trace(f"Note {note_id} wasn't changed since the last compilation, skipping.")
+                return False
+
+        written = self.update_note(note, note_type, content=content)
+        if written:
+            note.flush()
+            if new_fingerprint is not None:
+                new_fingerprint = self._get_fingerprint(dict(note.items()), note_type)
+        else:
+            logger.trace(f"Processed field of note {note_id} is already up to date.")
+
+        if fingerprints is not None and new_fingerprint is not None:
+            fingerprints.set(note_id, new_fingerprint)
+        return written
+
+    def update_note(
+        self,
+        note: anki.notes.Note,
+        note_type: str,
+        *,
+        content: t.Optional[dict[str, str]] = None,
+        cache: t.Optional[MutableMapping[str, str]] = None,
+    ) -> bool:
+        """Update processed field of already loaded note, without saving it.
+
+        Used for notes, that are edited or shown right now, so the caller decides how to save them.
+
+        Args:
+            note: The note.
+            note_type: Name of the note type.
+            content: Fields of the note, if they were already read.
+            cache: Processed content by fingerprint of the source fields. If passed, it is used
+                instead of processing and filled with new results.
+
+        Returns:
+            Whether the processed field was changed.
+        """
+        if content is None:
+            content = dict(note.items())
+
+        cache_key = processed = None
+        if cache is not None:
+            cache_key = self._get_fingerprint(content, note_type, with_processed=False)
+            processed = cache.get(cache_key)
 
         if processed is None:
-            raise ValueError(f"You specified invalid note type name in config - {note_type!r}")
+            processed = processor.process_card(content, note_type)
+            if processed is None:
+                raise ValueError(f"You specified invalid note type name in config - {note_type!r}")
+            if cache is not None and cache_key is not None:
+                cache[cache_key] = processed
 
-        processed_field_name = {
-            self._config.cards.nouns.note_type_name: self._config.cards.nouns.fields.processed,
-            self._config.cards.verbs.note_type_name: self._config.cards.verbs.fields.processed,
-            self._config.cards.adjectives.note_type_name: self._config.cards.adjectives.fields.processed,
-        }[note_type]
+        processed_field_name = self._get_dispatch(note_type).processed_field
+        if content.get(processed_field_name) == processed:
+            return False
 
         note[processed_field_name] = processed
-        note.flush()
+        return True
+
+    def _get_fingerprint(self, content: Mapping[str, str], note_type: str, *, with_processed: bool = True) -> str:
+        """Get fingerprint of the note's source fields.
+
+        Processed field is included by default, so notes, whose processed field was changed outside
+        of the addon (e.g. synced from a device without it or restored from a backup), are compiled again.
+
+        Args:
+            content: Fields of the note.
+            note_type: Name of the note type.
+            with_processed: Whether to include current value of the processed field.
+
+        Returns:
+            The fingerprint, see :func:`czech_plus.logic.fingerprint.fingerprint`.
+        """
+        dispatch = self._get_dispatch(note_type)
+        fields = [content[field_name] for field_name in dispatch.processor.source_fields]
+        if with_processed:
+            fields.append(content.get(dispatch.processed_field, ""))
+        return fingerprint(dispatch.settings, fields)
+
+    def _get_dispatch(self, note_type: str) -> processor.Dispatch:
+        """Get processor and settings for the note type, see :func:`czech_plus.logic.processor.get_dispatch`.
+
+        Args:
+            note_type: Name of the note type.
+
+        Returns:
+            Dispatch for the note type.
+
+        Raises:
+            ValueError: If the note type isn't configured.
+        """
+        dispatch = processor.get_dispatch(note_type)
+        if dispatch is None:
+            raise ValueError(f"You specified invalid note type name in config - {note_type!r}")
+        return dispatch
+
+    @property
+    def _db(self) -> anki.dbproxy.DBProxy:
+        """Get the database of the Anki collection.
+
+        Raises:
+            RuntimeError: If the collection is already closed.
+        """
+        db = self._anki_collection.db
+        if db is None:
+            raise RuntimeError("Anki collection is closed.")
+        return db
+
+    def _get_chunks(self, note_types: Mapping[int, str]) -> Iterator[tuple[str, list[_NoteRow]]]:
+        """Stream notes of the note types in chunks, every chunk has only one note type.
+
+        Notes are read with one query, which is paginated by ``(mid, id)``, so only one
+        page (:attr:`~czech_plus.config.CompilerSettings.chunk_size` notes) is in memory at once.
+
+        Args:
+            note_types: Result of :meth:`_get_note_types`.
+
+        Yields:
+            Tuples with note type name and notes of the chunk.
+        """
+        if not note_types:
+            return
+
+        chunk_size = self._config.compiler.chunk_size
+        fields_names = {
+            note_type_id: self._anki_collection.models.field_names(
+                self._anki_collection.models.get(anki.models.NotetypeId(note_type_id))  # type: ignore[arg-type]
+            )
+            for note_type_id in note_types
+        }
+        last_key = (0, 0)
+        while True:
+            page = self._db.all(
+                f"SELECT id, guid, mid, mod, usn, tags, flds FROM notes WHERE mid IN {anki.utils.ids2str(note_types)}"
+                " AND (mid, id) > (?, ?) ORDER BY mid, id LIMIT ?",
+                last_key[0],
+                last_key[1],
+                chunk_size,
+            )
+            if not page:
+                return
+            last_key = (page[-1][2], page[-1][0])
+
+            for note_type_id, rows in itertools.groupby(page, key=lambda row: row[2]):
+                yield note_types[note_type_id], [_to_note_row(row, fields_names[note_type_id]) for row in rows]
+
+            if len(page) < chunk_size:
+                return
+
+    def _get_notes(self, note_type: str, notes_ids: Sequence[int]) -> Iterator[_NoteRow]:
+        """Get all notes with one query.
+
+        Args:
+            note_type: Name of the note type. All notes must have this note type.
+            notes_ids: IDs of the notes.
 
-    def _get_notes_ids(self) -> list[tuple[int, str]]:
-        """Get IDs of all notes with needed note types.
+        Yields:
+            The notes.
+        """
+        note_type_dict = self._anki_collection.models.by_name(note_type)
+        if note_type_dict is None:
+            raise ValueError(f"You specified invalid note type name in config - {note_type!r}")
+        field_names = self._anki_collection.models.field_names(note_type_dict)
+
+        for row in self._db.all(
+            f"SELECT id, guid, mid, mod, usn, tags, flds FROM notes WHERE id IN {anki.utils.ids2str(notes_ids)}"
+        ):
+            yield _to_note_row(row, field_names)
+
+    def _write_processed(self, note_type: str, processed_notes: Sequence[tuple[_NoteRow, str]]) -> None:
+        """Write processed content to the notes in one transaction.
+
+        Note objects are created from already read rows, so notes aren't read from the collection again.
+
+        Args:
+            note_type: Name of the note type.
+            processed_notes: Tuples with the note and its processed content.
+        """
+        if not processed_notes:
+            return
+
+        processed_field_name = self._get_dispatch(note_type).processed_field
+        empty_notes: dict[int, anki.notes.Note] = {}
+        notes: list[anki.notes.Note] = []
+        for row, processed in processed_notes:
+            if row.mid not in empty_notes:
+                empty_notes[row.mid] = anki.notes.Note(self._anki_collection, anki.models.NotetypeId(row.mid))
+            note = self._to_note(row, empty_notes[row.mid])
+            note[processed_field_name] = processed
+            notes.append(note)
+
+        logger.debug(f"Writing {len(notes)} notes ({note_type}).")
+        self._anki_collection.update_notes(notes, skip_undo_entry=True)
+
+    def _to_note(self, row: _NoteRow, empty_note: anki.notes.Note) -> anki.notes.Note:
+        """Create note object from the row, without reading the note from the collection again.
+
+        Loading a note with :class:`anki.notes.Note` costs more than reading it, so only an empty note is
+        created once for every note type, and the row's columns replace its attributes in a copy.
+
+        Args:
+            row: The note.
+            empty_note: New note of the same note type.
+
+        Returns:
+            Note object, which can be saved with :meth:`anki.collection.Collection.update_notes`.
+        """
+        note = anki.notes.Note.__new__(anki.notes.Note)
+        vars(note).update(vars(empty_note))
+        note.id = anki.notes.NoteId(row.id)
+        note.guid = row.guid
+        note.mid = anki.models.NotetypeId(row.mid)
+        note.mod = row.mod
+        note.usn = row.usn
+        note.tags = self._anki_collection.tags.split(row.tags)
+        note.fields = list(row.content.values())
+        return note
+
+    def _get_note_types(self, *, only: t.Optional[Collection[str]] = None) -> dict[int, str]:
+        """Get IDs of all configured note types.
+
+        Note types, that don't exist in the collection, are skipped with a warning.
+
+        Args:
+            only: If passed, other note types are skipped.
 
         Returns:
-            List of tuples with note ID and note type name.
+            Mapping from note type ID to its name.
         """
-        note_type_id = self._anki_collection.models.id_for_name(self._config.cards.nouns.note_type_name)
-        assert note_type_id is not None
-        noun_notes_ids = self._anki_collection.models.nids(note_type_id)
-        logger.trace(f"{noun_notes_ids=}")
-
-        note_type_id = self._anki_collection.models.id_for_name(self._config.cards.verbs.note_type_name)
-        assert note_type_id is not None
-        verb_notes_ids = self._anki_collection.models.nids(note_type_id)
-        logger.trace(f"{verb_notes_ids=}")
-
-        note_type_id = self._anki_collection.models.id_for_name(self._config.cards.adjectives.note_type_name)
-        assert note_type_id is not None
-        adjective_notes_ids = self._anki_collection.models.nids(note_type_id)
-        logger.trace(f"{adjective_notes_ids=}")
-
-        notes_ids: list[tuple[int, str]] = [
-            (note_id, self._config.cards.nouns.note_type_name) for note_id in noun_notes_ids
-        ]
-        notes_ids.extend((note_id, self._config.cards.verbs.note_type_name) for note_id in verb_notes_ids)
-        notes_ids.extend((note_id, self._config.cards.adjectives.note_type_name) for note_id in adjective_notes_ids)
-
-        return notes_ids
+        cards = self._config.cards
+        all_settings: tuple[_NOTE_TYPE_SETTINGS, ...] = (cards.nouns, cards.verbs, cards.adjectives)
+        note_types: dict[int, str] = {}
+        for settings in all_settings:
+            if only is not None and settings.note_type_name not in only:
+                continue
+            note_type_id = self._anki_collection.models.id_for_name(settings.note_type_name)
+            if note_type_id is None:
+                logger.warning(f"Note type {settings.note_type_name!r} wasn't found in the collection, skipping.")
+                continue
+            note_types[note_type_id] = settings.note_type_name
+
+        logger.trace(f"{note_types=}")
+        return note_types
+
+    def _count_notes(self, note_types: Mapping[int, str]) -> int:
+        """Count notes of the note types.
+
+        Args:
+            note_types: Result of :meth:`_get_note_types`.
+
+        Returns:
+            Count of the notes.
+        """
+        if not note_types:
+            return 0
+        return t.cast(int, self._db.scalar(f"SELECT count() FROM notes WHERE mid IN {anki.utils.ids2str(note_types)}"))
+
+
+def _to_note_row(row: anki.dbproxy.Row, field_names: Sequence[str], /) -> _NoteRow:
+    """Create :class:`_NoteRow` from the row of ``SELECT id, guid, mid, mod, usn, tags, flds FROM notes``.
+
+    Args:
+        row: The row.
+        field_names: Names of the note type's fields.
+
+    Returns:
+        The note.
+    """
+    note_id, guid, mid, mod, usn, tags, fields = row
+    return _NoteRow(note_id, guid, mid, mod, usn, tags, dict(zip(field_names, anki.utils.split_fields(fields))))
@@ -0,0 +1,131 @@
+"""Module for collecting problems with notes, instead of logging every one of them.
+
+Big collections often have thousands of incomplete notes. Logging a warning (or a traceback)
+for each of them floods the logs and slows the compilation down, so problems are counted
+by category in :class:`Diagnostics`, and only one summary is logged at the end.
+
+Processors don't know, which note they process, so they call :func:`report`, which adds
+the category to the issues of the current note (see :func:`capture`).
+"""
+import contextlib
+import dataclasses
+import threading
+import typing as t
+from collections.abc import Iterable, Iterator
+
+from czech_plus._vendor.loguru import logger
+
+from czech_plus import config as config_module
+
+__all__ = ["SAMPLE_SIZE", "Issue", "Diagnostics", "report", "capture", "tracebacks_enabled"]
+
+SAMPLE_SIZE = 5
+"""How many note IDs to keep for every category."""
+
+Issue = tuple[str, t.Optional[str]]
+"""Category of the problem and its details, see :func:`report`."""
+
+_captured = threading.local()
+
+
+@dataclasses.dataclass
+class Diagnostics:
+    """Problems, found in one compilation."""
+
+    counts: dict[str, int] = dataclasses.field(default_factory=dict)
+    """Count of notes by category of the problem."""
+    samples: dict[str, list[int]] = dataclasses.field(default_factory=dict)
+    """First :data:`SAMPLE_SIZE` note IDs for every category."""
+    details: dict[str, str] = dataclasses.field(default_factory=dict)
+    """The first details (e.g. an error) for every category, if there were any."""
+
+    def add(self, category: str, note_id: int, /, details: t.Optional[str] = None) -> None:
+        """Add a problem.
+
+        Args:
+            category: Short human-readable description, like ``empty Gender field``.
+            note_id: ID of the note.
+            details: Details of the problem, for example an error message.
+        """
+        self.counts[category] = self.counts.get(category, 0) + 1
+        sample = self.samples.setdefault(category, [])
+        if len(sample) < SAMPLE_SIZE:
+            sample.append(note_id)
+        if details is not None:
+            self.details.setdefault(category, details)
+
+    def add_many(self, issues: Iterable[Issue], note_id: int, /) -> None:
+        """Add all problems of the note, see :func:`capture`."""
+        for category, details in issues:
+            self.add(category, note_id, details)
+
+    def __add__(self, other: "Diagnostics") -> "Diagnostics":
+        """Combine problems of two parts of the compilation."""
+        result = Diagnostics(
+            counts=dict(self.counts),
+            samples={category: list(sample) for category, sample in self.samples.items()},
+            details={**other.details, **self.details},
+        )
+        for category, count in other.counts.items():
+            result.counts[category] = result.counts.get(category, 0) + count
+            sample = result.samples.setdefault(category, [])
+            sample.extend(other.samples[category][: SAMPLE_SIZE - len(sample)])
+        return result
+
+    def __bool__(self) -> bool:
+        """Whether any problems were found."""
+        return bool(self.counts)
+
+    def summary(self) -> str:
+        """Get human-readable summary of all problems."""
+        lines = [f"Found problems in {sum(self.counts.values())} notes:"]
+        for category, count in sorted(self.counts.items(), key=lambda item: item[1], reverse=True):
+            sample = ", ".join(map(str, self.samples[category]))
+            more = ", ..." if count > len(self.samples[category]) else ""
+            lines.append(f"- {category}: {count} notes (e.g. {sample}{more})")
+            if category in self.details:
+                lines.append(f"  first error: {self.details[category]}")
+        return "\n".join(lines)
+
+    def log_summary(self) -> None:
+        """Log :meth:`summary` as one warning, if there are any problems."""
+        if self:
+            logger.warning(self.summary())
+
+
+def report(category: str, /, details: t.Optional[str] = None) -> None:
+    """Report a problem with the note, that is being processed now.
+
+    If problems aren't captured (see :func:`capture`), for example when a single note is
+    compiled from the editor, the problem is logged as a warning right away.
+
+    Args:
+        category: Short human-readable description, like ``empty Gender field``.
+        details: Details of the problem, which are different for every note (e.g. offset in the field).
+    """
+    issues: t.Optional[list[Issue]] = getattr(_captured, "issues", None)
+    if issues is None:
+        logger.warning(f"Problem with the note: {category}." + (f" {details}." if details is not None else ""))
+        return
+    issues.append((category, details))
+
+
+@contextlib.contextmanager
+def capture() -> Iterator[list[Issue]]:
+    """Capture problems, reported with :func:`report` inside ``with`` block, in the current thread.
+
+    Yields:
+        List, which is filled with reported problems.
+    """
+    previous: t.Optional[list[Issue]] = getattr(_captured, "issues", None)
+    issues: list[Issue] = []
+    _captured.issues = issues
+    try:
+        yield issues
+    finally:
+        _captured.issues = previous
+
+
+def tracebacks_enabled() -> bool:
+    """Whether full tracebacks should be kept for failed notes. They are useful only for debugging."""
+    return config_module.Config().logging.level <= config_module.LogLevel.DEBUG
@@ -0,0 +1,132 @@
+"""Module for fingerprinting source fields of the notes.
+
+Fingerprint changes only when something, that affects the ``Processed`` field, changes. So if
+the fingerprint is the same as on the last compilation, we can safely skip the note.
+"""
+import functools
+import hashlib
+import sqlite3
+import typing as t
+from collections.abc import Sequence
+from pathlib import Path
+
+from czech_plus._vendor.loguru import logger
+
+from czech_plus import config as config_module
+from czech_plus.logic.processor import PROCESSOR_VERSION
+
+__all__ = ["fingerprint", "FingerprintStore"]
+
+_FIELDS_SEPARATOR = "\x1f"  # the same as Anki uses in the database, so it can't be inside a field
+
+
+def fingerprint(note_type_settings: object, fields: Sequence[str], /) -> str:
+    """Calculate fingerprint of the note.
+
+    Args:
+        note_type_settings: Settings of the note type from config (e.g.
+            :class:`~czech_plus.config.NounCardsSettings`). Renaming a field will change the fingerprint.
+        fields: Values of the fields, that are read by the processor.
+
+    Returns:
+        Hex digest of the fingerprint.
+    """
+    hasher = _get_settings_hasher(PROCESSOR_VERSION, note_type_settings).copy()
+    for field in fields:
+        hasher.update((_FIELDS_SEPARATOR + field).encode())
+    return hasher.hexdigest()
+
+
+@functools.lru_cache(maxsize=16)
+def _get_settings_hasher(processor_version: int, note_type_settings: object, /) -> "hashlib._Hash":
+    """Get hasher, that already hashed the settings. Settings are frozen, so it is computed once for every config."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{processor_version}{_FIELDS_SEPARATOR}{note_type_settings!r}".encode())
+    return hasher
+
+
+class FingerprintStore:
+    """Persistent storage for fingerprints of already compiled notes.
+
+    Fingerprints are stored in SQLite database inside :data:`~czech_plus.config.USER_FILES_DIR`.
+    Notes IDs are unique only inside one collection (shared decks have the same IDs in every profile),
+    so we also store the collection's path.
+
+    Example:
+        .. code-block:: python
+
+            with FingerprintStore(collection.path) as store:
+                if store.get(note_id) != new_fingerprint:
+                    ...  # compile the note
+                    store.set(note_id, new_fingerprint)
+    """
+
+    def __init__(self, collection: str, /, path: t.Optional[Path] = None) -> None:
+        if path is None:
+            path = config_module.USER_FILES_DIR / "fingerprints.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._collection = collection
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " collection TEXT NOT NULL,"
+            " note_id INTEGER NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " PRIMARY KEY (collection, note_id)"
+            ") WITHOUT ROWID"
+        )
+        self._fingerprints: dict[int, str] = dict(
+            self._connection.execute(
+                "SELECT note_id, fingerprint FROM fingerprints WHERE collection = ?", (collection,)
+            ).fetchall()
+        )
+        self._changed: dict[int, str] = {}
+        logger.debug(f"Loaded {len(self._fingerprints)} fingerprints for {collection!r}.")
+
+    def __enter__(self) -> "FingerprintStore":
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Save all changes and close the connection."""
+        self.save()
+        self.close()
+
+    def get(self, note_id: int, /) -> t.Optional[str]:
+        """Get fingerprint of the note from the last compilation.
+
+        Args:
+            note_id: ID of the note.
+
+        Returns:
+            The fingerprint or :obj:`None`, if the note was never compiled.
+        """
+        return self._fingerprints.get(note_id)
+
+    def set(self, note_id: int, fingerprint: str, /) -> None:
+        """Set new fingerprint for the note. It will be written to the disk on :meth:`save`.
+
+        Args:
+            note_id: ID of the note.
+            fingerprint: New fingerprint.
+        """
+        self._fingerprints[note_id] = fingerprint
+        self._changed[note_id] = fingerprint
+
+    def save(self) -> None:
+        """Write all changed fingerprints to the disk."""
+        if not self._changed:
+            return
+
+        logger.debug(f"Saving {len(self._changed)} changed fingerprints.")
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO fingerprints (collection, note_id, fingerprint) VALUES (?, ?, ?)",
+                ((self._collection, note_id, fingerprint) for note_id, fingerprint in self._changed.items()),
+            )
+        self._changed.clear()
+
+    def close(self) -> None:
+        """Close connection to the database."""
+        self._connection.close()
@@ -1,12 +1,14 @@
 """Package for parsing input from the cards."""
 import abc
+import enum
+import re
 import typing as t
-from collections.abc import Callable, Generator, Iterator
+from collections.abc import Callable, Generator, Iterator, Mapping
 
 from czech_plus._vendor.loguru import logger
 
 from czech_plus.logic.lexer import tokens
-from czech_plus.utils import assert_that
+from czech_plus.utils import assert_that, hot_logger
 
 if t.TYPE_CHECKING:
     import typing_extensions as te
@@ -14,12 +16,109 @@ if t.TYPE_CHECKING:
 _HOOK_GENERATOR_SIGNATURE: "te.TypeAlias" = Generator[
     t.Optional[tuple[tokens.BaseToken, bool, bool]], t.Union[str, t.Literal[None]], None
 ]
-_HOOK_SIGNATURE: "te.TypeAlias" = Callable[[], _HOOK_GENERATOR_SIGNATURE]
+# hook takes instance of the lexer class, on which it is registered, so methods of
+# subclasses (e.g. `VerbLexer._future_form_start`) can't be typed with `BaseLexer` argument
+_HOOK_SIGNATURE: "te.TypeAlias" = Callable[[t.Any], _HOOK_GENERATOR_SIGNATURE]  # type: ignore[misc] # Explicit "Any"
 _ON_NEXT_HOOK: "te.TypeAlias" = Generator[
     t.Optional[tokens.BaseToken], t.Union[str, t.Literal[None]], tuple[bool, bool]
 ]
 
 
+class _SymbolKind(enum.Enum):
+    """What special symbol does, used by :meth:`BaseLexer.lex_fast`."""
+
+    ESCAPE = enum.auto()
+    WORD_ESCAPE = enum.auto()
+    SEPARATE = enum.auto()
+    ADDITIONAL_SEPARATE = enum.auto()
+    SKIP = enum.auto()
+    FUTURE_FORM_START = enum.auto()
+    FUTURE_FORM_END = enum.auto()
+
+
+class _FastTable(t.NamedTuple):
+    """Precompiled data for :func:`_lex_with_table`."""
+
+    special: "re.Pattern[str]"
+    """Matches special symbol together with its argument (e.g. escaped word), in one capturing group."""
+    tokens: dict[str, t.Optional[tokens.BaseToken]]
+    """Special symbol and its token, :obj:`None` for escapes."""
+
+
+class _HookTable(t.NamedTuple):
+    """Hooks of a lexer class, see :meth:`BaseLexer._get_hook_table`."""
+
+    hooks: Mapping[str, _HOOK_SIGNATURE]
+    """Symbol and its hook."""
+    symbols: frozenset[str]
+    """All symbols, that have a hook."""
+
+
+_SEPARATOR = tokens.SeparatorToken()
+_ADDITIONAL_SEPARATOR = tokens.AdditionalSeparatorToken()
+_SKIP = tokens.SkipToken()
+_FUTURE_FORM_START = tokens.FutureFormTokenStart()
+_FUTURE_FORM_END = tokens.FutureFormTokenEnd()
+
+_HOOK_TABLES: dict[type["BaseLexer"], _HookTable] = {}
+_FAST_TABLES: dict[type["BaseLexer"], t.Optional[_FastTable]] = {}
+_SYMBOL_TOKENS: dict[_SymbolKind, tokens.BaseToken] = {
+    _SymbolKind.SEPARATE: _SEPARATOR,
+    _SymbolKind.ADDITIONAL_SEPARATE: _ADDITIONAL_SEPARATOR,
+    _SymbolKind.SKIP: _SKIP,
+    _SymbolKind.FUTURE_FORM_START: _FUTURE_FORM_START,
+    _SymbolKind.FUTURE_FORM_END: _FUTURE_FORM_END,
+}
+
+
+def _lex_with_table(
+    table: _FastTable, string: str, offsets: t.Optional[list[tuple[int, int]]] = None, /
+) -> list[t.Union[tokens.BaseToken, str]]:
+    """Lex ``string`` with the fast table, engine of :meth:`BaseLexer.lex_fast` and :meth:`BaseLexer.lex_spans`.
+
+    Args:
+        table: Result of :meth:`BaseLexer._get_fast_table`.
+        string: String to lex.
+        offsets: If passed, start and end of every token in ``string`` are appended to it.
+            Escaped token covers only escaped content, without escape symbol.
+
+    Returns:
+        Tokens and strings.
+    """
+    # parts are text and special symbols in turn, text may be empty
+    parts = table.special.split(string)
+    tokens_by_symbol, escaped_token = table.tokens, tokens.EscapedToken
+    result: list[t.Union[tokens.BaseToken, str]] = []
+    append = result.append
+    text, position = parts[0], 0
+
+    for i in range(1, len(parts), 2):
+        special = parts[i]
+        token = tokens_by_symbol[special[0]]
+        if token is None:
+            token = escaped_token(special[1:])
+        elif token is _FUTURE_FORM_START:
+            text = text[:-1]  # remove the space before the future form
+        if text:
+            append(text)
+        append(token)
+
+        if offsets is not None:
+            start = position + len(parts[i - 1])
+            if text:
+                offsets.append((position, position + len(text)))
+            escaped = tokens_by_symbol[special[0]] is None
+            offsets.append((start + 1, start + len(special)) if escaped else (start, start + 1))
+            position = start + len(special)
+        text = parts[i + 1]
+
+    if text:
+        append(text)
+        if offsets is not None:
+            offsets.append((position, position + len(text)))
+    return result
+
+
 class BaseLexer(abc.ABC):
     """Main class for transforming raw strings to tokens."""
 
@@ -30,6 +129,42 @@ class BaseLexer(abc.ABC):
     SKIP_SYMBOL = "_"
 
     _ESCAPE_WORD_STOP_SYMBOLS = {SEPARATE_SYMBOL, ESCAPE_SYMBOL, None}
+    _registered_hooks: t.ClassVar[dict[str, _HOOK_SIGNATURE]] = {}
+
+    @classmethod
+    def register_hook(cls, symbol: str, hook: _HOOK_SIGNATURE, /) -> None:
+        """Add new special symbol to this lexer class and all its subclasses.
+
+        Registered hooks override default ones (see :meth:`_default_hooks`) and hooks, registered
+        on parent classes.
+
+        Args:
+            symbol: Symbol, that triggers the hook.
+            hook: Function, that takes lexer instance and returns generator. See :meth:`._handle_hook`
+                for the generator signature description.
+
+        Raises:
+            ValueError: If ``symbol`` isn't exactly one symbol.
+
+        Example:
+            .. code-block:: python
+
+                def _comment(lexer: BaseLexer) -> _HOOK_GENERATOR_SIGNATURE:
+                    while (yield) is not None:
+                        pass
+                    yield tokens.SkipToken(), False, False
+
+                NounLexer.register_hook("#", _comment)
+        """
+        if len(symbol) != 1:
+            raise ValueError(f"Hook symbol must be exactly one symbol, got {symbol!r}.")
+        if "_registered_hooks" not in cls.__dict__:
+            cls._registered_hooks = {}
+        cls._registered_hooks[symbol] = hook
+
+        # subclasses inherit registered hooks, so all tables may be outdated
+        _HOOK_TABLES.clear()
+        _FAST_TABLES.clear()
 
     def lex(self, string: str) -> Iterator[t.Union[tokens.BaseToken, str]]:
         r"""Lex ``string`` argument.
@@ -37,98 +172,209 @@ class BaseLexer(abc.ABC):
         Yields:
             :mod:`Token <czech_plus.logic.lexer.tokens>` or :obj:`string <str>`\ .
         """
-        logger.debug(f"Lexing: {string}")
+        hot_logger.debug("Lexing: {}", string)
+        hooks, hook_symbols = self._get_hook_table()
         rerun, skip = False, False
         temp_string = ""
         on_next_hook: t.Optional[_ON_NEXT_HOOK] = None
 
         for i, symbol in enumerate(string):
             while True:
-                logger.debug(f"Lexing {symbol!r} (index: {i}) in {string=}")
+                hot_logger.debug("Lexing {!r} (index: {}) in string={!r}", symbol, i, string)
                 if skip:
-                    logger.debug("skip is True")
+                    hot_logger.debug("skip is True")
                     skip = False
                     break
 
                 if on_next_hook is not None:
-                    logger.debug("on_next_hook is not None")
+                    hot_logger.debug("on_next_hook is not None")
                     while True:
                         try:
                             token = on_next_hook.send(symbol)
                         except StopIteration as exception:
-                            logger.debug(f"`on_next_hook` raised StopIteration with values: {exception.value}")
+                            hot_logger.debug("`on_next_hook` raised StopIteration with values: {}", exception.value)
                             rerun, skip = exception.value  # return statement in generator
                             on_next_hook = None
                             break
                         else:
-                            logger.debug(f"`on_next_hook` returned: {token=}")
+                            hot_logger.debug("`on_next_hook` returned: token={!r}", token)
                             if token is None:
-                                logger.trace("token is None")
+                                hot_logger.trace("token is None")
                                 break
 
                             if temp_string != "":
-                                logger.debug(f"temp_string != '' ({temp_string=})")
+                                hot_logger.debug("temp_string != '' (temp_string={!r})", temp_string)
 
                                 yield temp_string
                                 temp_string = ""
                             yield token
 
-                    logger.trace(f"{rerun=}")
+                    hot_logger.trace("rerun={!r}", rerun)
                     if not rerun:
                         break
                     rerun = False
 
-                hook = self._hooks.get(symbol)
-                logger.debug(f"Got {hook=} on {symbol=}")
-                if hook is None:
-                    logger.trace("hook is None")
+                if symbol not in hook_symbols:
+                    hot_logger.trace("symbol={!r} has no hook", symbol)
                     temp_string += symbol
                     break
 
+                hook = hooks[symbol]
+                hot_logger.debug("Got hook={!r} on symbol={!r}", hook, symbol)
                 handle_hook_generator = self._handle_hook(hook)
                 while True:
-                    logger.trace(f"Handling `handle_hook_generator` with {hook=}")
+                    hot_logger.trace("Handling `handle_hook_generator` with hook={!r}", hook)
                     try:
                         token = next(handle_hook_generator)
                     except StopIteration as exception:
-                        logger.debug(f"`handle_hook_generator` raised StopIteration with values: {exception.value}")
+                        hot_logger.debug(
+                            "`handle_hook_generator` raised StopIteration with values: {}", exception.value
+                        )
                         rerun, skip = exception.value  # return statement in generator
-                        assert_that(rerun is False, "This doesn't make sense if you rerun symbol in first iteration!")
+                        assert_that(
+                            rerun is False, "This doesn't make sense if you rerun symbol in first iteration!", offset=i
+                        )
                         break
                     else:
-                        logger.debug(f"`handle_hook_generator` returned: {token=}")
+                        hot_logger.debug("`handle_hook_generator` returned: token={!r}", token)
                         if token is None:
-                            logger.trace("token is None")
+                            hot_logger.trace("token is None")
                             on_next_hook = handle_hook_generator
                             break
 
                         if temp_string != "":
-                            logger.trace("temp_string != ''")
+                            hot_logger.trace("temp_string != ''")
                             if isinstance(token, tokens.FutureFormTokenStart):
-                                logger.trace(f"isinstance(token, tokens.FutureFormTokenStart) is True")
+                                hot_logger.trace("isinstance(token, tokens.FutureFormTokenStart) is True")
                                 temp_string = temp_string[:-1]
                                 if temp_string == "":
-                                    logger.trace("After stripping temp string, it's empty.")
+                                    hot_logger.trace("After stripping temp string, it's empty.")
                                     yield token
                                     continue
                             yield temp_string
                             temp_string = ""
                         yield token
-                logger.debug(f"Ended lexing for {symbol!r} (index: {i}).")
+                hot_logger.debug("Ended lexing for {!r} (index: {}).", symbol, i)
                 break  # pragma: no cover # somewhy doesn't catch this string
 
         if temp_string != "":
-            logger.debug("temp_string != '', but lexed full string.")
+            hot_logger.debug("temp_string != '', but lexed full string.")
             yield temp_string
         if on_next_hook is not None:
-            logger.debug("on_next_hook is not None, but lexed full string.")
+            hot_logger.debug("on_next_hook is not None, but lexed full string.")
             yield t.cast(tokens.BaseToken, on_next_hook.send(None))
 
+    def lex_fast(self, string: str) -> Iterator[t.Union[tokens.BaseToken, str]]:
+        r"""Lex ``string`` argument, the same way as :meth:`lex`, but much faster.
+
+        Instead of running hook generators for every symbol, the string is split on special
+        symbols with one precompiled regex (see :func:`_lex_with_table`). The result is exactly
+        the same, as in :meth:`lex`, including all its quirks (e.g. separator always skips the
+        next symbol).
+
+        If the lexer has hooks, which this engine doesn't know (e.g. added with :meth:`register_hook`),
+        it falls back to :meth:`lex`.
+
+        Yields:
+            :mod:`Token <czech_plus.logic.lexer.tokens>` or :obj:`string <str>`\ .
+        """
+        table = self._get_fast_table()
+        if table is None:
+            yield from self.lex(string)
+            return
+
+        hot_logger.debug("Lexing: {}", string)
+        yield from _lex_with_table(table, string)
+
+    def lex_spans(self, string: str) -> Iterator[tokens.Span]:
+        r"""Lex ``string`` argument into :class:`spans <czech_plus.logic.lexer.tokens.Span>`\ .
+
+        It uses the same engine, as :meth:`lex_fast`, but also tracks where every token is
+        in the string, e.g. to report offset of a problem.
+
+        Yields:
+            Spans, in the same order as tokens from :meth:`lex`.
+
+        Raises:
+            TypeError: If the lexer has hooks, unknown for this engine (e.g. added with :meth:`register_hook`).
+        """
+        table = self._get_fast_table()
+        if table is None:
+            raise TypeError(f"{type(self).__name__} has custom hooks, use `lex` instead.")
+
+        hot_logger.debug("Lexing: {}", string)
+        offsets: list[tuple[int, int]] = []
+        lexed = _lex_with_table(table, string, offsets)
+        for token, (start, end) in zip(lexed, offsets):
+            yield tokens.Span(tokens.kind_of(token), start, end)
+
+    @classmethod
+    def _get_hook_table(cls) -> _HookTable:
+        """Get (and build on the first call) hooks of this lexer class.
+
+        Hooks are the same for all instances, so they are collected only once per class, and
+        not on every symbol.
+        """
+        table = _HOOK_TABLES.get(cls)
+        if table is not None:
+            return table
+
+        hooks = cls._default_hooks()
+        for klass in reversed(cls.__mro__):
+            hooks.update(klass.__dict__.get("_registered_hooks", {}))
+
+        table = _HOOK_TABLES[cls] = _HookTable(hooks=hooks, symbols=frozenset(hooks))
+        return table
+
+    @classmethod
+    def _get_fast_table(cls) -> t.Optional[_FastTable]:
+        """Get (and compile on the first call) data for :meth:`lex_spans`.
+
+        Returns:
+            The table or :obj:`None`, if some hooks are unknown for :meth:`lex_spans`.
+        """
+        if cls in _FAST_TABLES:
+            return _FAST_TABLES[cls]
+
+        known_hooks: dict[_HOOK_SIGNATURE, _SymbolKind] = {
+            BaseLexer._escape_one_symbol: _SymbolKind.ESCAPE,
+            BaseLexer._escape_entire_word: _SymbolKind.WORD_ESCAPE,
+            BaseLexer._separate_words: _SymbolKind.SEPARATE,
+            BaseLexer._additional_separate_words: _SymbolKind.ADDITIONAL_SEPARATE,
+            BaseLexer._skip_word: _SymbolKind.SKIP,
+            VerbLexer._future_form_start: _SymbolKind.FUTURE_FORM_START,
+            VerbLexer._future_form_end: _SymbolKind.FUTURE_FORM_END,
+        }
+        symbols: dict[str, _SymbolKind] = {}
+        for symbol, hook in cls._get_hook_table().hooks.items():
+            if hook not in known_hooks:
+                logger.debug(f"{cls.__name__} has unknown {hook=}, fast lexing is disabled for it.")
+                _FAST_TABLES[cls] = None
+                return None
+            symbols[symbol] = known_hooks[hook]
+
+        stop_symbols = "".join(symbol for symbol in cls._ESCAPE_WORD_STOP_SYMBOLS if symbol is not None)
+        patterns = []
+        for symbol, kind in symbols.items():
+            if kind in {_SymbolKind.ESCAPE, _SymbolKind.SEPARATE, _SymbolKind.ADDITIONAL_SEPARATE}:
+                # escapes the next symbol or skips it, there is no next symbol at the end of input
+                patterns.append(f"{re.escape(symbol)}.?")
+            elif kind is _SymbolKind.WORD_ESCAPE:
+                patterns.append(f"{re.escape(symbol)}[^{re.escape(stop_symbols)}]*")
+            else:
+                patterns.append(re.escape(symbol))
+
+        table = _FAST_TABLES[cls] = _FastTable(
+            special=re.compile(f"({'|'.join(patterns)})", re.DOTALL),
+            tokens={symbol: _SYMBOL_TOKENS.get(kind) for symbol, kind in symbols.items()},
+        )
+        return table
+
     def _handle_hook(self, hook: _HOOK_SIGNATURE) -> _ON_NEXT_HOOK:
         r"""Handle hook and yield result.
 
         Args:
-            hook: Hook callable, that returns generator.
+            hook: Hook function, that takes lexer instance and returns generator.
 
         Yields:
             :obj:`None` or :mod:`token <czech_plus.logic.lexer.tokens>`\ .
@@ -164,12 +410,12 @@ class BaseLexer(abc.ABC):
                 for token in _handle_hook():
                     # some token handling code
         """
-        logger.debug(f"Handling {hook=}...")
-        result = next(generator := hook())
-        logger.debug(f"{result=}")
+        hot_logger.debug("Handling hook={!r}...", hook)
+        result = next(generator := hook(self))
+        hot_logger.debug("result={!r}", result)
         while result is None:
             result = generator.send((yield))  # type: ignore[misc] # Yield value expected
-            logger.debug(f"send {result=}")
+            hot_logger.debug("send result={!r}", result)
 
         token, rerun, skip = result
         yield token
@@ -181,11 +427,11 @@ class BaseLexer(abc.ABC):
 
         See :meth:`._handle_hook` for signature description.
         """
-        logger.debug("Escaping one symbol...")
+        hot_logger.debug("Escaping one symbol...")
         next_symbol = yield  # type: ignore[misc] # Yield value expected
-        logger.trace(f"{next_symbol=}")
+        hot_logger.trace("next_symbol={!r}", next_symbol)
         if next_symbol is None:
-            logger.debug("next_symbol is None; falling back to ''")
+            hot_logger.debug("next_symbol is None; falling back to ''")
             next_symbol = ""
 
         yield tokens.EscapedToken(next_symbol), False, False
@@ -195,18 +441,18 @@ class BaseLexer(abc.ABC):
 
         See :meth:`._handle_hook` for signature description.
         """
-        logger.debug("Escaping entire word...")
+        hot_logger.debug("Escaping entire word...")
         escaped_part = ""
 
         while True:
             symbol = yield  # type: ignore[misc] # Yield value expected
-            logger.trace(f"Received {symbol=}")
+            hot_logger.trace("Received symbol={!r}", symbol)
             if symbol in self._ESCAPE_WORD_STOP_SYMBOLS:
-                logger.trace("Received symbol is separate symbol or None.")
+                hot_logger.trace("Received symbol is separate symbol or None.")
                 break
             escaped_part += t.cast(str, symbol)
 
-        logger.debug(f"Escaped word: {escaped_part!r}")
+        hot_logger.debug("Escaped word: {!r}", escaped_part)
         yield tokens.EscapedToken(escaped_part), True, False
 
     def _separate_words(self) -> _HOOK_GENERATOR_SIGNATURE:
@@ -214,7 +460,7 @@ class BaseLexer(abc.ABC):
 
         See :meth:`._handle_hook` for signature description.
         """
-        logger.debug("Separating words...")
+        hot_logger.debug("Separating words...")
         yield tokens.SeparatorToken(), False, True
 
     def _additional_separate_words(self) -> _HOOK_GENERATOR_SIGNATURE:
@@ -222,7 +468,7 @@ class BaseLexer(abc.ABC):
 
         See :meth:`._handle_hook` for signature description.
         """
-        logger.debug("Separating words with additional separate symbol...")
+        hot_logger.debug("Separating words with additional separate symbol...")
         yield tokens.AdditionalSeparatorToken(), False, True
 
     def _skip_word(self) -> _HOOK_GENERATOR_SIGNATURE:
@@ -230,24 +476,26 @@ class BaseLexer(abc.ABC):
 
         See :meth:`._handle_hook` for signature description.
         """
-        logger.debug("Skipping word...")
+        hot_logger.debug("Skipping word...")
         yield tokens.SkipToken(), False, False
 
-    @property
-    def _hooks(self) -> dict[str, _HOOK_SIGNATURE]:
-        """Dict, where first element is symbol for hook, and value is a hook.
+    @classmethod
+    def _default_hooks(cls) -> dict[str, _HOOK_SIGNATURE]:
+        """Dict, where key is symbol for hook, and value is a hook. Later entries win, if symbols are the same.
 
+        It is called only once per class, see :meth:`_get_hook_table`. Use :meth:`register_hook`
+        to add new hooks without subclassing.
         See :meth:`._handle_hook` for hook signature description.
         """
         hooks: dict[str, _HOOK_SIGNATURE] = {
-            self.ESCAPE_SYMBOL: self._escape_one_symbol,
-            self.WORD_ESCAPE_SYMBOL: self._escape_entire_word,
-            self.SEPARATE_SYMBOL: self._separate_words,
-            self.SKIP_SYMBOL: self._skip_word,
+            cls.ESCAPE_SYMBOL: cls._escape_one_symbol,
+            cls.WORD_ESCAPE_SYMBOL: cls._escape_entire_word,
+            cls.SEPARATE_SYMBOL: cls._separate_words,
+            cls.SKIP_SYMBOL: cls._skip_word,
         }
 
-        if self.ADDITIONAL_SEPARATE_SYMBOL:
-            hooks[self.ADDITIONAL_SEPARATE_SYMBOL] = self._additional_separate_words
+        if cls.ADDITIONAL_SEPARATE_SYMBOL:
+            hooks[cls.ADDITIONAL_SEPARATE_SYMBOL] = cls._additional_separate_words
 
         return hooks
 
@@ -276,7 +524,7 @@ class VerbLexer(BaseLexer):
 
         See :meth:`~.BaseLexer._handle_hook` for signature description.
         """
-        logger.debug("Found future form start...")
+        hot_logger.debug("Found future form start...")
         yield tokens.FutureFormTokenStart(), False, False
 
     def _future_form_end(self) -> _HOOK_GENERATOR_SIGNATURE:
@@ -284,14 +532,14 @@ class VerbLexer(BaseLexer):
 
         See :meth:`~.BaseLexer._handle_hook` for signature description.
         """
-        logger.debug("Found future form end...")
+        hot_logger.debug("Found future form end...")
         yield tokens.FutureFormTokenEnd(), False, False
 
-    @property
-    def _hooks(self) -> dict[str, _HOOK_SIGNATURE]:
-        hooks = super()._hooks
-        hooks[self.FUTURE_FORM_START_SYMBOL] = self._future_form_start
-        hooks[self.FUTURE_FORM_END_SYMBOL] = self._future_form_end
+    @classmethod
+    def _default_hooks(cls) -> dict[str, _HOOK_SIGNATURE]:
+        hooks = super()._default_hooks()
+        hooks[cls.FUTURE_FORM_START_SYMBOL] = cls._future_form_start
+        hooks[cls.FUTURE_FORM_END_SYMBOL] = cls._future_form_end
         return hooks
 
 
@@ -1,45 +1,170 @@
-"""Module for tokens, that then used inside lexer."""
+"""Module for tokens, that then used inside lexer.
+
+Tokens without data are singletons, so ``SeparatorToken() is SeparatorToken()``. To find out,
+what token is it, compare its :attr:`~BaseToken.kind` (or :func:`kind_of`) instead of long
+:func:`isinstance` chains.
+"""
 import abc
+import enum
+import typing as t
 from dataclasses import dataclass
 
+if t.TYPE_CHECKING:
+    import typing_extensions as te
+
+
+class TokenKind(enum.Enum):
+    """Kind of token or :class:`Span`."""
+
+    TEXT = enum.auto()
+    """Plain text, equivalent of :obj:`str` in usual lexing."""
+    SEPARATOR = enum.auto()
+    """See :class:`SeparatorToken`."""
+    ADDITIONAL_SEPARATOR = enum.auto()
+    """See :class:`AdditionalSeparatorToken`."""
+    ESCAPED = enum.auto()
+    """See :class:`EscapedToken`. The span covers only escaped content, without escape symbol."""
+    SKIP = enum.auto()
+    """See :class:`SkipToken`."""
+    FUTURE_FORM_START = enum.auto()
+    """See :class:`FutureFormTokenStart`."""
+    FUTURE_FORM_END = enum.auto()
+    """See :class:`FutureFormTokenEnd`."""
+
 
-@dataclass
 class BaseToken(abc.ABC):
     """Base class for all tokens."""
 
+    __slots__ = ()
+
+    kind: t.ClassVar[TokenKind]
+    """Kind of the token, defined in every concrete token class."""
+
+    def __repr__(self) -> str:
+        """Show only name of the class, like dataclasses without fields."""
+        return f"{type(self).__name__}()"
+
+
+class _SingletonToken(BaseToken, abc.ABC):
+    """Token without data, which has only one instance."""
 
-@dataclass
-class SeparatorToken(BaseToken):
+    __slots__ = ()
+
+    _instance: t.ClassVar[t.Optional["_SingletonToken"]]
+
+    def __new__(cls) -> "te.Self":
+        """Return the only instance of the class, create it on the first call."""
+        instance = cls.__dict__.get("_instance")
+        if instance is None:
+            instance = cls._instance = super().__new__(cls)
+        return t.cast("te.Self", instance)
+
+    def __reduce__(self) -> tuple[type["_SingletonToken"], tuple[()]]:
+        """Unpickle to the same instance, with :meth:`__new__`."""
+        return type(self), ()
+
+
+class SeparatorToken(_SingletonToken):
     """Token for separator symbol."""
 
+    __slots__ = ()
+    kind = TokenKind.SEPARATOR
+
 
-@dataclass
-class AdditionalSeparatorToken(BaseToken):
+class AdditionalSeparatorToken(_SingletonToken):
     """Token for additional separator symbol."""
 
+    __slots__ = ()
+    kind = TokenKind.ADDITIONAL_SEPARATOR
 
-@dataclass
+
+@dataclass(frozen=True)
 class EscapedToken(BaseToken):
     """Token for escape symbol."""
 
+    __slots__ = ("content",)
+    kind: t.ClassVar[TokenKind] = TokenKind.ESCAPED
+
     content: str
 
+    def __reduce__(self) -> tuple[type["EscapedToken"], tuple[str]]:
+        """Pickle with the content, frozen dataclass with slots can't restore its state with ``setattr``."""
+        return type(self), (self.content,)
 
-@dataclass
-class SkipToken(BaseToken):
+
+class SkipToken(_SingletonToken):
     """Token for skip symbol."""
 
+    __slots__ = ()
+    kind = TokenKind.SKIP
+
 
-@dataclass
-class BaseFutureFormToken(BaseToken, abc.ABC):
+class BaseFutureFormToken(_SingletonToken, abc.ABC):
     """Base token for verb's future form."""
 
+    __slots__ = ()
+
 
-@dataclass
 class FutureFormTokenStart(BaseFutureFormToken):
     """Open token for verb's future form."""
 
+    __slots__ = ()
+    kind = TokenKind.FUTURE_FORM_START
+
 
-@dataclass
 class FutureFormTokenEnd(BaseFutureFormToken):
     """Close token for verb's future form."""
+
+    __slots__ = ()
+    kind = TokenKind.FUTURE_FORM_END
+
+
+def kind_of(token_or_string: t.Union[BaseToken, str], /) -> TokenKind:
+    """Get kind of the token, or :attr:`TokenKind.TEXT` for strings."""
+    if isinstance(token_or_string, str):
+        return TokenKind.TEXT
+    return token_or_string.kind
+
+
+class Span(t.NamedTuple):
+    """Token, that refers back to the source string, instead of copying it.
+
+    Returned by :meth:`czech_plus.logic.lexer.BaseLexer.lex_spans`. ``start`` and ``end`` are offsets
+    in the source string, so they can also be used in error messages.
+    """
+
+    kind: TokenKind
+    start: int
+    end: int
+
+    def text(self, source: str, /) -> str:
+        """Get text of the span.
+
+        Args:
+            source: The string, that was lexed.
+        """
+        return source[self.start : self.end]
+
+    def to_token(self, source: str, /) -> t.Union[BaseToken, str]:
+        """Convert span to usual token (or string, for :attr:`TokenKind.TEXT`).
+
+        Args:
+            source: The string, that was lexed.
+        """
+        if self.kind is TokenKind.TEXT:
+            return source[self.start : self.end]
+        if self.kind is TokenKind.ESCAPED:
+            return EscapedToken(source[self.start : self.end])
+        return _SINGLETONS[self.kind]
+
+
+_SINGLETONS: dict[TokenKind, BaseToken] = {
+    token.kind: token
+    for token in (
+        SeparatorToken(),
+        AdditionalSeparatorToken(),
+        SkipToken(),
+        FutureFormTokenStart(),
+        FutureFormTokenEnd(),
+    )
+}
@@ -0,0 +1,210 @@
+"""Module for measuring, where time goes while compiling notes."""
+import contextlib
+import dataclasses
+import datetime
+import heapq
+import json
+import time
+import typing as t
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from czech_plus._vendor.loguru import logger
+
+from czech_plus import config as config_module
+
+__all__ = ["PHASES", "NoteTiming", "CompileMetrics", "MetricsRecorder", "timed", "lexing_clock"]
+
+_T = t.TypeVar("_T")
+
+PHASES = ("discovery", "load", "lexing", "processing", "flush")
+"""Phases of the compilation, in order.
+
+``discovery`` is finding notes to compile, ``load`` is reading them (and their fingerprints),
+``lexing`` and ``processing`` are summed over all processes, ``flush`` is writing notes and
+fingerprints back.
+"""
+SLOWEST_NOTES_COUNT = 10
+"""How many slowest notes to keep in :attr:`CompileMetrics.slowest_notes`."""
+
+
+class NoteTiming(t.NamedTuple):
+    """How long it took to process one note."""
+
+    note_id: int
+    """ID of the note."""
+    note_type: str
+    """Name of the note type."""
+    seconds: float
+    """Time of lexing and processing."""
+
+
+@dataclasses.dataclass
+class CompileMetrics:
+    """Metrics of one compilation run."""
+
+    phases: dict[str, float] = dataclasses.field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+    """Seconds spent in every phase, see :data:`PHASES`."""
+    elapsed: float = 0.0
+    """Wall-clock seconds of the whole run."""
+    notes_count: int = 0
+    """Count of all notes, including skipped and failed."""
+    note_types: dict[str, int] = dataclasses.field(default_factory=dict)
+    """Count of processed notes by note type name."""
+    slowest_notes: list[NoteTiming] = dataclasses.field(default_factory=list)
+    """The slowest processed notes, the slowest first."""
+
+    @property
+    def notes_per_second(self) -> float:
+        """Count of notes, compiled in one second."""
+        if self.elapsed == 0:
+            return 0.0
+        return self.notes_count / self.elapsed
+
+    def as_dict(self) -> dict[str, t.Any]:  # type: ignore[misc] # Explicit "Any" is not allowed
+        """Convert metrics to dict, which can be dumped to JSON."""
+        # circular import
+        from czech_plus.logic.processor import PROCESSOR_VERSION
+
+        return {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "processor_version": PROCESSOR_VERSION,
+            "elapsed": self.elapsed,
+            "notes_count": self.notes_count,
+            "notes_per_second": self.notes_per_second,
+            "phases": self.phases,
+            "note_types": self.note_types,
+            "slowest_notes": [note._asdict() for note in self.slowest_notes],
+        }
+
+    def write(self, path: t.Optional[Path] = None) -> Path:
+        """Write metrics as JSON.
+
+        Args:
+            path: Where to write. By default, ``compile_metrics.json`` near ``config.json``.
+
+        Returns:
+            Path of the written file.
+        """
+        if path is None:
+            path = config_module.BASE_DIR / "compile_metrics.json"
+
+        with path.open("w", encoding="utf8") as file:
+            json.dump(self.as_dict(), file, indent=4)
+        logger.debug(f"Compile metrics were written to {path}.")
+        return path
+
+
+class MetricsRecorder:
+    """Collects :class:`CompileMetrics` while compiling."""
+
+    def __init__(self) -> None:
+        self._metrics = CompileMetrics()
+        self._slowest_notes: list[tuple[float, int, str]] = []  # min-heap, so the fastest is removed first
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, /) -> Iterator[None]:
+        """Measure time of the code inside ``with`` block.
+
+        Args:
+            name: Name of the phase, see :data:`PHASES`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float, /) -> None:
+        """Add already measured time to the phase.
+
+        Args:
+            name: Name of the phase, see :data:`PHASES`.
+            seconds: Measured time.
+        """
+        self._metrics.phases[name] += seconds
+
+    def add_notes(self, count: int, /) -> None:
+        """Count notes, that were compiled, skipped or failed."""
+        self._metrics.notes_count += count
+
+    def add_note(self, note_id: int, note_type: str, seconds: float, /) -> None:
+        """Record processing of one note.
+
+        Args:
+            note_id: ID of the note.
+            note_type: Name of the note type.
+            seconds: Time of lexing and processing.
+        """
+        self._metrics.note_types[note_type] = self._metrics.note_types.get(note_type, 0) + 1
+
+        item = (seconds, note_id, note_type)
+        if len(self._slowest_notes) < SLOWEST_NOTES_COUNT:
+            heapq.heappush(self._slowest_notes, item)
+        elif item > self._slowest_notes[0]:
+            heapq.heapreplace(self._slowest_notes, item)
+
+    def finish(self) -> CompileMetrics:
+        """Stop recording.
+
+        Returns:
+            Collected metrics.
+        """
+        self._metrics.elapsed = time.perf_counter() - self._start
+        self._metrics.slowest_notes = [
+            NoteTiming(note_id, note_type, seconds)
+            for seconds, note_id, note_type in sorted(self._slowest_notes, reverse=True)
+        ]
+        return self._metrics
+
+
+def timed(iterable: Iterable[_T], on_time: t.Callable[[float], None], /) -> Iterator[_T]:
+    """Measure time of getting every item from the iterable.
+
+    Useful for lazy generators, which are consumed in other place, for example lexers.
+
+    Args:
+        iterable: Iterable to measure.
+        on_time: Called with time of getting every item (and of the final :exc:`StopIteration`).
+
+    Yields:
+        The same items.
+    """
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            on_time(time.perf_counter() - start)
+            return
+        on_time(time.perf_counter() - start)
+        yield item
+
+
+class _LexingClock:
+    """Total time, spent in lexers in the current process."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+
+    def add(self, seconds: float, /) -> None:
+        """Add measured time."""
+        self.total += seconds
+
+    def wrap(self, iterable: Iterable[_T], /) -> Iterable[_T]:
+        """Measure time of lexing, see :func:`timed`.
+
+        Measuring every token costs more than lexing of short fields, so it is done only if
+        :attr:`~czech_plus.config.CompilerSettings.write_metrics` is enabled. Otherwise, the
+        iterable is returned as is, and lexing is counted as processing.
+        """
+        if not config_module.Config().compiler.write_metrics:
+            return iterable
+        return timed(iterable, self.add)
+
+
+lexing_clock = _LexingClock()
+"""Lexers are lazy and consumed by processors, so we can't just measure them with a timer.
+Instead, processors wrap them with :meth:`_LexingClock.wrap`."""
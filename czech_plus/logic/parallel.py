@@ -0,0 +1,169 @@
+"""Module for processing notes in multiple processes.
+
+Lexing and processing are pure functions of the fields and the config, so they can be
+run in subprocesses. Everything, that touches the collection, stays in the main process.
+"""
+import concurrent.futures
+import contextlib
+import multiprocessing
+import os
+import time
+import traceback
+import typing as t
+from collections.abc import Iterator, Sequence
+
+from czech_plus._vendor.loguru import logger
+
+from czech_plus import config as config_module
+from czech_plus import utils
+from czech_plus.logic import diagnostics, metrics, processor
+
+__all__ = ["ProcessedRow", "process_rows", "SerialExecutor", "get_workers_count", "get_executor"]
+
+_T = t.TypeVar("_T")
+
+
+class ProcessedRow(t.NamedTuple):
+    """Result of processing one note."""
+
+    note_id: int
+    """ID of the note."""
+    processed: t.Optional[str]
+    """Processed content or :obj:`None`, if processing failed."""
+    error: t.Optional[str]
+    """Error message, if processing failed. We don't pass exceptions, because not all of them can be pickled.
+
+    Contains full traceback only if :func:`czech_plus.logic.diagnostics.tracebacks_enabled`.
+    """
+    elapsed: float = 0.0
+    """Seconds spent on lexing and processing the note."""
+    lexing: float = 0.0
+    """Seconds spent on lexing the note, it is part of :attr:`elapsed`."""
+    issues: tuple[diagnostics.Issue, ...] = ()
+    """Problems, reported while processing the note, see :func:`czech_plus.logic.diagnostics.report`."""
+
+
+def process_rows(note_type: str, rows: Sequence[tuple[int, dict[str, str]]], /) -> list[ProcessedRow]:
+    """Process fields of many notes with the same note type.
+
+    It never raises, failures are returned for every row separately. Notes are processed
+    with :func:`czech_plus.logic.processor.process_many`, so new results are written to the
+    processed cache in one transaction.
+
+    Args:
+        note_type: Name of the note type.
+        rows: Tuples with note ID and its fields.
+
+    Returns:
+        Processed rows, in the same order.
+    """
+    dispatch = processor.get_dispatch(note_type)
+    fields = () if dispatch is None else dispatch.processor.source_fields
+    processed_rows = processor.process_many(
+        note_type,
+        (
+            [content[field_name] for field_name in fields]
+            for _, content in rows
+            if all(field_name in content for field_name in fields)
+        ),
+    )
+    with contextlib.closing(processed_rows) if processed_rows is not None else contextlib.nullcontext():
+        return _process_rows(note_type, rows, fields, processed_rows)
+
+
+def _process_rows(
+    note_type: str,
+    rows: Sequence[tuple[int, dict[str, str]]],
+    fields: Sequence[str],
+    processed_rows: t.Optional[Iterator[t.Union[str, Exception]]],
+    /,
+) -> list[ProcessedRow]:
+    """Actual logic of :func:`process_rows`, ``processed_rows`` has a result for every row with all ``fields``."""
+    result: list[ProcessedRow] = []
+    with_traceback = diagnostics.tracebacks_enabled()
+    for note_id, content in rows:
+        lexing_before = metrics.lexing_clock.total
+        start = time.perf_counter()
+        processed: t.Optional[str] = None
+        error: t.Optional[str] = None
+        with diagnostics.capture() as issues:
+            try:
+                if processed_rows is None:
+                    raise ValueError(f"You specified invalid note type name in config - {note_type!r}")
+                for field_name in fields:
+                    if field_name not in content:
+                        raise KeyError(field_name)
+                processed_or_exception = next(processed_rows)
+                if isinstance(processed_or_exception, Exception):
+                    raise processed_or_exception
+                processed = processed_or_exception
+            except Exception as exception:
+                error = traceback.format_exc() if with_traceback else f"{type(exception).__name__}: {exception}"
+        elapsed = time.perf_counter() - start
+        result.append(
+            ProcessedRow(note_id, processed, error, elapsed, metrics.lexing_clock.total - lexing_before, tuple(issues))
+        )
+    return result
+
+
+class SerialExecutor(concurrent.futures.Executor):
+    """Executor, that runs everything right away in the current thread.
+
+    Used when parallel processing is disabled, so compiler has only one code path.
+    """
+
+    def submit(  # type: ignore[misc] # Explicit Any
+        self, fn: t.Callable[..., _T], /, *args: object, **kwargs: object
+    ) -> "concurrent.futures.Future[_T]":
+        """Run ``fn`` and return already finished future."""
+        future: "concurrent.futures.Future[_T]" = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exception:
+            future.set_exception(exception)
+        return future
+
+
+def get_workers_count(notes_count: int, /) -> int:
+    """Get how many processes should be used for processing.
+
+    Args:
+        notes_count: How many notes will be processed.
+
+    Returns:
+        Count of processes. ``1`` means, that everything should be done in the current process.
+    """
+    settings = config_module.Config().compiler
+    if notes_count < settings.parallel_threshold:
+        return 1
+    return settings.processes or os.cpu_count() or 1
+
+
+def get_executor(workers: int, /) -> concurrent.futures.Executor:
+    """Get executor for processing.
+
+    Args:
+        workers: Result of :func:`get_workers_count`.
+
+    Returns:
+        :class:`SerialExecutor` if ``workers`` is ``1``, otherwise process pool.
+    """
+    if workers <= 1:
+        return SerialExecutor()
+
+    logger.info(f"Processing notes in {workers} processes.")
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(config_module.Config().as_dict(),),
+    )
+
+
+def _init_worker(config_as_dict: "config_module._CONFIG_AS_DICT", /) -> None:
+    """Initialize a worker process with the same config, as in the main process.
+
+    Config in the worker is not read from Anki and not watched for changes.
+    """
+    config_module.Config._instances[config_module.Config] = config_module.Config.from_dict(config_as_dict)
+    utils.setup_logging()
@@ -1,20 +1,97 @@
-"""Package for processors of the words."""
+"""Package for processors of the words.
+
+Implementations (and their lexers) are imported only when the first note is processed, see
+:func:`get_dispatch`.
+"""
+import contextlib
 import typing as t
+from collections.abc import Generator, Iterable, Sequence
 
 from czech_plus._vendor.loguru import logger
 
-from czech_plus.config import Config
-from czech_plus.logic.processor.implementations import (
-    adjective,
-    base,
-    noun,
-    verb,
-)
+from czech_plus.config import _NOTE_TYPE_SETTINGS, CardsSettings, Config
+from czech_plus.logic import diagnostics
+from czech_plus.utils import hot_logger
+
+if t.TYPE_CHECKING:
+    from czech_plus.logic import cache as cache_module
+    from czech_plus.logic.processor.implementations import base
+
+__all__ = [
+    "PROCESSOR_VERSION",
+    "Dispatch",
+    "get_dispatch",
+    "get_processor",
+    "process_card",
+    "process_many",
+]
+
+PROCESSOR_VERSION = 1
+"""Version of the processors output.
+
+Bump it, when output of any processor changes, so all already processed notes will be recompiled.
+"""
+
+
+class Dispatch(t.NamedTuple):
+    """Everything, that is needed to compile notes of one note type."""
 
-__all__ = ["get_processor", "process_card"]
+    processor: "base.BaseProcessor"
+    """Processor for the note type. It is shared, so it must not keep any state between calls."""
+    processed_field: str
+    """Name of the field, where processed content is written."""
+    settings: "_NOTE_TYPE_SETTINGS"
+    """Settings of the note type from config."""
 
 
-def get_processor(note_type: str) -> t.Optional[base.BaseProcessor]:
+_dispatch_table: t.Optional[tuple[CardsSettings, dict[str, Dispatch]]] = None
+"""Cards settings, from which the table was built, and the table itself."""
+
+
+def get_dispatch(note_type: str) -> t.Optional[Dispatch]:
+    """Get processor and settings for the note type.
+
+    The table is built once and rebuilt only after cards settings were changed. Reloaded
+    config reuses unchanged settings objects (see :class:`~czech_plus.config.Config`), so
+    it is checked by identity.
+
+    Args:
+        note_type: Name of the note type.
+
+    Returns:
+        Dispatch for the note type or None, if it wasn't found.
+    """
+    cards = Config().cards
+    cached = _dispatch_table
+    if cached is not None and cached[0] is cards:
+        return cached[1].get(note_type)
+    return _build_dispatch_table(cards).get(note_type)
+
+
+def _build_dispatch_table(cards: CardsSettings, /) -> dict[str, Dispatch]:
+    """Build the table for :func:`get_dispatch` from the cards settings."""
+    global _dispatch_table
+    from czech_plus.logic.processor.implementations import (  # see module docstring
+        adjective,
+        noun,
+        verb,
+    )
+
+    logger.trace("Building dispatch table for note types.")
+
+    processors: tuple[tuple[type[base.BaseProcessor], _NOTE_TYPE_SETTINGS], ...] = (
+        (noun.NounProcessor, cards.nouns),
+        (verb.VerbProcessor, cards.verbs),
+        (adjective.AdjectiveProcessor, cards.adjectives),
+    )
+    dispatch_table: dict[str, Dispatch] = {}
+    for processor_class, settings in processors:
+        dispatch_table[settings.note_type_name] = Dispatch(processor_class(), settings.fields.processed, settings)
+    _dispatch_table = cards, dispatch_table
+    return dispatch_table
+
+
+def get_processor(note_type: str) -> t.Optional["base.BaseProcessor"]:
     """Get processor for the note type.
 
     Args:
@@ -23,18 +100,8 @@ def get_processor(note_type: str) -> t.Optional[base.BaseProcessor]:
     Returns:
         Processor for the note type or None, if it wasn't found.
     """
-    logger.trace(f"Getting processor for {note_type=}.")
-    config = Config()
-
-    parsers_table: dict[str, type[base.BaseProcessor]] = {
-        config.cards.nouns.note_type_name: noun.NounProcessor,
-        config.cards.verbs.note_type_name: verb.VerbProcessor,
-        config.cards.adjectives.note_type_name: adjective.AdjectiveProcessor,
-    }
-    if note_type not in parsers_table.keys():
-        return None
-
-    return parsers_table[note_type]()
+    dispatch = get_dispatch(note_type)
+    return None if dispatch is None else dispatch.processor
 
 
 def process_card(content: dict[str, str], note_type: str) -> t.Optional[str]:
@@ -44,17 +111,131 @@ def process_card(content: dict[str, str], note_type: str) -> t.Optional[str]:
         content: Content of the card.
         note_type: Name of the note type.
 
+    Results are cached on the disk (see :mod:`czech_plus.logic.cache`), so the same fields
+    are never processed twice, even in different profiles.
+
     Returns:
         Processed content of the card or None, if processor wasn't found.
     """
-    logger.debug(f"Processing card with {note_type=}...")
-    logger.trace(str(content))
+    hot_logger.debug("Processing card with note_type={!r}...", note_type)
+    hot_logger.trace("{}", content)
 
-    processor = get_processor(note_type)
-    if processor is None:
+    dispatch = get_dispatch(note_type)
+    if dispatch is None:
         logger.debug("No processor for this note type.")
         return None
 
-    processed = processor.process(content)
-    logger.debug(f"Processed: {processed=}")
+    from czech_plus.logic import cache as cache_module  # circular import
+
+    values = [content[field_name] for field_name in dispatch.processor.source_fields]
+    return _process(note_type, dispatch, values, cache_module.get_cache())
+
+
+def process_many(
+    note_type: str, rows: Iterable[Sequence[str]], /
+) -> t.Optional[Generator[t.Union[str, Exception], None, None]]:
+    """Process many cards of the same note type at once.
+
+    Unlike :func:`process_card`, the processor is looked up only once, identical rows are
+    processed only once, the cache is read and written for all rows at once, and failed rows
+    don't stop the others.
+
+    Results are produced lazily. Problems (see :func:`czech_plus.logic.diagnostics.report`) are
+    reported while result of their row is produced, also for identical rows, so wrap every
+    :func:`next` call with :func:`czech_plus.logic.diagnostics.capture` to get problems of every row.
+    New results are written to the cache, when the generator is exhausted or closed.
+
+    Args:
+        note_type: Name of the note type.
+        rows: Values of the source fields (see :attr:`.BaseProcessor.source_fields`) of every card,
+            in the same order as the fields.
+
+    Returns:
+        Generator of processed content (or the exception, if processing failed) for every row, in
+        the same order. None, if processor wasn't found.
+    """
+    dispatch = get_dispatch(note_type)
+    if dispatch is None:
+        logger.debug(f"No processor for {note_type=}.")
+        return None
+    return _process_many(note_type, dispatch, [tuple(row) for row in rows])
+
+
+def _process_many(
+    note_type: str, dispatch: Dispatch, rows: Sequence[tuple[str, ...]], /
+) -> Generator[t.Union[str, Exception], None, None]:
+    """Actual logic of :func:`process_many`."""
+    from czech_plus.logic import cache as cache_module  # circular import
+    from czech_plus.logic.fingerprint import fingerprint  # circular import
+
+    cache = cache_module.get_cache()
+    fields_count = len(dispatch.processor.source_fields)
+    processed_rows: dict[tuple[str, ...], tuple[t.Union[str, Exception], list[diagnostics.Issue]]] = {}
+    with cache.batch() if cache is not None else contextlib.nullcontext():
+        if cache is not None:
+            cache.prefetch(
+                note_type, (fingerprint(dispatch.settings, values) for values in rows if len(values) == fields_count)
+            )
+        for values in rows:
+            known = processed_rows.get(values)
+            if known is None:
+                processed: t.Union[str, Exception]
+                with diagnostics.capture() as issues:
+                    try:
+                        if len(values) != fields_count:
+                            raise ValueError(f"Expected {fields_count} fields, got {len(values)}.")
+                        processed = _process(note_type, dispatch, values, cache)
+                    except Exception as exception:
+                        hot_logger.debug("Failed to process {!r}: {!r}", values, exception)
+                        processed = exception
+                known = processed_rows[values] = processed, issues
+
+            processed, issues = known
+            for category, details in issues:
+                diagnostics.report(category, details=details)
+            yield processed
+
+
+def _process(
+    note_type: str, dispatch: Dispatch, values: Sequence[str], cache: t.Optional["cache_module.ProcessedCache"], /
+) -> str:
+    """Process values of the source fields, or get them from the cache.
+
+    Results, for which problems were reported (see :func:`czech_plus.logic.diagnostics.report`), are
+    not cached, so the problems are reported every time, not only when the cache is cold.
+
+    Args:
+        note_type: Name of the note type.
+        dispatch: Dispatch for the note type.
+        values: Values of the source fields, in the same order as the fields.
+        cache: The cache, if it is enabled.
+
+    Returns:
+        Processed content.
+    """
+    from czech_plus.logic.fingerprint import fingerprint  # circular import
+
+    cache_key = None
+    if cache is not None:
+        cache_key = fingerprint(dispatch.settings, values)
+        if (processed := cache.get(note_type, cache_key)) is not None:
+            hot_logger.debug("Processed (from cache): {!r}", processed)
+            return processed
+
+    content = dict(zip(dispatch.processor.source_fields, values))
+    if cache is None or cache_key is None:
+        processed = dispatch.processor.process(content)
+        hot_logger.debug("Processed: {!r}", processed)
+        return processed
+
+    issues: list[diagnostics.Issue] = []
+    try:
+        with diagnostics.capture() as issues:
+            processed = dispatch.processor.process(content)
+    finally:
+        for category, details in issues:
+            diagnostics.report(category, details=details)
+    hot_logger.debug("Processed: {!r}", processed)
+    if not issues:
+        cache.set(note_type, cache_key, processed)
     return processed
@@ -1,8 +1,8 @@
 """Module for implementing processing adjectives."""
-from czech_plus._vendor.loguru import logger
-
+from czech_plus.logic import diagnostics
 from czech_plus.logic.lexer import AdjectiveLexer, tokens
 from czech_plus.logic.processor.implementations import BaseProcessor
+from czech_plus.utils import hot_logger
 
 
 class AdjectiveProcessor(BaseProcessor):
@@ -13,6 +13,12 @@ class AdjectiveProcessor(BaseProcessor):
 
         self.__czech_field_name = self._config.cards.adjectives.fields.czech
         self.__cocd_field_name = self._config.cards.adjectives.fields.completion_of_comparison_degrees
+        self.__lexer = AdjectiveLexer()
+
+    @property
+    def source_fields(self) -> tuple[str, ...]:
+        """Names of the fields, which are read by :meth:`process`."""
+        return self.__czech_field_name, self.__cocd_field_name
 
     def process(self, content: dict[str, str], /) -> str:
         """Process the content of the card.
@@ -23,31 +29,33 @@ class AdjectiveProcessor(BaseProcessor):
         Returns:
             The processed content.
         """
-        logger.debug(
-            f"Parsing adjective card\n"
-            f"{self.__czech_field_name} (Czech field): {content[self.__czech_field_name]}\n"
-            f"{self.__cocd_field_name} (CoCD field): {content[self.__cocd_field_name]}"
+        hot_logger.debug(
+            "Parsing adjective card\n{} (Czech field): {}\n{} (CoCD field): {}",
+            self.__czech_field_name,
+            content[self.__czech_field_name],
+            self.__cocd_field_name,
+            content[self.__cocd_field_name],
         )
         if not content[self.__cocd_field_name]:
-            logger.warning(f"CoCD field is empty, skipping. Czech field: {content[self.__czech_field_name]}")
+            diagnostics.report(f"empty {self.__cocd_field_name} field")
             return content[self.__czech_field_name]
 
-        lexer = AdjectiveLexer()
-        lexed_czech = self._navigate_over(lexer.lex(content[self.__czech_field_name]))
-        lexed_cocd = self._navigate_over(lexer.lex(content[self.__cocd_field_name]))
+        lexed_czech = self._navigate_over(self.__lexer.lex_fast(content[self.__czech_field_name]))
+        lexed_cocd = self._navigate_over(self.__lexer.lex_fast(content[self.__cocd_field_name]))
 
         result = ""
         for token_or_string in lexed_czech:
             cocd = next(lexed_cocd)
-            logger.trace(f"{token_or_string=} {cocd=}")
+            hot_logger.trace("token_or_string={!r} cocd={!r}", token_or_string, cocd)
 
-            if isinstance(cocd, tokens.SeparatorToken):
-                assert isinstance(token_or_string, tokens.SeparatorToken)
+            kind = tokens.kind_of(cocd)
+            if kind is tokens.TokenKind.SEPARATOR:
+                assert token_or_string is tokens.SeparatorToken()
                 result += ", "
-            elif isinstance(cocd, tokens.SkipToken):
+            elif kind is tokens.TokenKind.SKIP:
                 assert isinstance(token_or_string, str)
                 result += token_or_string
-            elif isinstance(cocd, str):
+            elif kind is tokens.TokenKind.TEXT:
                 assert isinstance(token_or_string, str)
                 result += f"{token_or_string} ({cocd})"
             else:  # pragma: no cover
@@ -3,17 +3,27 @@ import abc
 import typing as t
 
 from czech_plus.config import Config
+from czech_plus.logic import metrics
 from czech_plus.logic.lexer import tokens
 
 _T = t.TypeVar("_T", bound=t.Iterator[t.Union[str, tokens.BaseToken]])
 
 
 class BaseProcessor(abc.ABC):
-    """Abstract processor class."""
+    """Abstract processor class.
+
+    Instances are shared between all notes of the note type (see
+    :func:`czech_plus.logic.processor.get_dispatch`), so :meth:`process` must not keep any state in them.
+    """
 
     def __init__(self) -> None:
         self._config = Config()
 
+    @property
+    @abc.abstractmethod
+    def source_fields(self) -> tuple[str, ...]:
+        """Names of the fields, which are read by :meth:`process`."""
+
     @abc.abstractmethod
     def process(self, content: dict[str, str], /) -> str:
         """Process the content.
@@ -40,7 +50,7 @@ class BaseProcessor(abc.ABC):
             The same generator.
         """
         temp_string = ""
-        for token_or_string in generator:
+        for token_or_string in metrics.lexing_clock.wrap(generator):
             if isinstance(token_or_string, str):
                 temp_string += token_or_string
             elif isinstance(token_or_string, tokens.EscapedToken):
@@ -1,9 +1,11 @@
 """Module for implementing processing nouns."""
-from czech_plus._vendor.loguru import logger
+import typing as t
 
 from czech_plus import models
+from czech_plus.logic import diagnostics
 from czech_plus.logic.lexer import NounLexer, tokens
 from czech_plus.logic.processor.implementations import BaseProcessor
+from czech_plus.utils import hot_logger
 
 
 class NounProcessor(BaseProcessor):
@@ -14,6 +16,12 @@ class NounProcessor(BaseProcessor):
 
         self.__czech_field_name = self._config.cards.nouns.fields.czech
         self.__gender_field_name = self._config.cards.nouns.fields.gender
+        self.__lexer = NounLexer()
+
+    @property
+    def source_fields(self) -> tuple[str, ...]:
+        """Names of the fields, which are read by :meth:`process`."""
+        return self.__czech_field_name, self.__gender_field_name
 
     def process(self, content: dict[str, str], /) -> str:
         """Process the content.
@@ -24,33 +32,35 @@ class NounProcessor(BaseProcessor):
         Returns:
             The processed ``czech`` field, ready to be inserted into the card.
         """
-        logger.debug(
-            f"Parsing noun card\n"
-            f"{self.__czech_field_name} (Czech field): {content[self.__czech_field_name]}\n"
-            f"{self.__gender_field_name} (Gender field): {content[self.__gender_field_name]}"
+        hot_logger.debug(
+            "Parsing noun card\n{} (Czech field): {}\n{} (Gender field): {}",
+            self.__czech_field_name,
+            content[self.__czech_field_name],
+            self.__gender_field_name,
+            content[self.__gender_field_name],
         )
         if not content[self.__gender_field_name]:
-            logger.warning(f"Gender field is empty, skipping. Czech field: {content[self.__czech_field_name]}")
+            diagnostics.report(f"empty {self.__gender_field_name} field")
             return content[self.__czech_field_name]
 
-        lexer = NounLexer()
-        lexed_czech = self._navigate_over(lexer.lex(content[self.__czech_field_name]))
-        lexed_gender = self._navigate_over(lexer.lex(content[self.__gender_field_name]))
+        lexed_czech = self._navigate_over(self.__lexer.lex_fast(content[self.__czech_field_name]))
+        lexed_gender = self._navigate_over(self.__lexer.lex_fast(content[self.__gender_field_name]))
 
         result = ""
         for token_or_string in lexed_czech:
             gender = next(lexed_gender)
-            logger.trace(f"{token_or_string=} {gender=}")
+            hot_logger.trace("token_or_string={!r} gender={!r}", token_or_string, gender)
 
-            if isinstance(gender, tokens.SeparatorToken):
-                assert isinstance(token_or_string, tokens.SeparatorToken)
+            kind = tokens.kind_of(gender)
+            if kind is tokens.TokenKind.SEPARATOR:
+                assert token_or_string is tokens.SeparatorToken()
                 result += ", "
-            elif isinstance(gender, tokens.SkipToken):
+            elif kind is tokens.TokenKind.SKIP:
                 assert isinstance(token_or_string, str)
                 result += token_or_string
-            elif isinstance(gender, str):
+            elif kind is tokens.TokenKind.TEXT:
                 assert isinstance(token_or_string, str)
-                result += f"{models.Gender[gender].value} {token_or_string}"
+                result += f"{models.Gender[t.cast(str, gender)].value} {token_or_string}"
             else:  # pragma: no cover
                 raise NotImplementedError("We don't support other scenarios here.")
 
@@ -1,14 +1,20 @@
 """Module for implementing processing verbs."""
 import typing as t
 
-from czech_plus._vendor.loguru import logger
-
 from czech_plus import models
+from czech_plus.logic import diagnostics
 from czech_plus.logic.lexer import VerbLexer, tokens
 from czech_plus.logic.processor.implementations import BaseProcessor
-from czech_plus.utils import assert_that
+from czech_plus.utils import assert_that, hot_logger
 
 _T = t.TypeVar("_T", bound=t.Iterator[t.Union[str, tokens.BaseToken]])
+_FUTURE_FORM_KINDS = frozenset({tokens.TokenKind.FUTURE_FORM_START, tokens.TokenKind.FUTURE_FORM_END})
+_PROCESSED_PREPOSITION_AND_CASE_TOKENS = {
+    tokens.TokenKind.ADDITIONAL_SEPARATOR: ", ",
+    tokens.TokenKind.FUTURE_FORM_START: "[",
+    tokens.TokenKind.FUTURE_FORM_END: "]",
+}
+"""What to put instead of tokens without data in prepositions and cases."""
 
 
 class VerbProcessor(BaseProcessor):
@@ -19,6 +25,12 @@ class VerbProcessor(BaseProcessor):
 
         self.__czech_field_name = self._config.cards.verbs.fields.czech
         self.__pac_field_name = self._config.cards.verbs.fields.prepositions_and_cases
+        self.__lexer = VerbLexer()
+
+    @property
+    def source_fields(self) -> tuple[str, ...]:
+        """Names of the fields, which are read by :meth:`process`."""
+        return self.__czech_field_name, self.__pac_field_name
 
     def process(self, content: dict[str, str], /) -> str:
         """Process the content.
@@ -29,156 +41,154 @@ class VerbProcessor(BaseProcessor):
         Returns:
             The processed ``czech`` field, ready to be inserted into the card.
         """
-        logger.debug(
-            "Processing verb card\n"
-            f"{self.__czech_field_name} (Czech field): {content[self.__czech_field_name]}\n"
-            f"{self.__pac_field_name} (Prepositions and Cases field): {content[self.__pac_field_name]}"
+        hot_logger.debug(
+            "Processing verb card\n{} (Czech field): {}\n{} (Prepositions and Cases field): {}",
+            self.__czech_field_name,
+            content[self.__czech_field_name],
+            self.__pac_field_name,
+            content[self.__pac_field_name],
         )
 
-        pre_processed = self._pre_process(content)
         if not content[self.__pac_field_name]:
-            logger.warning(f"PaC field is empty, skipping. Czech field: {content[self.__czech_field_name]}")
+            diagnostics.report(f"empty {self.__pac_field_name} field")
             return content[self.__czech_field_name]
-        return self._process(pre_processed)
-
-    def _pre_process(
-        self, content: dict[str, str]
-    ) -> t.Iterator[
-        tuple[
-            t.Union[str, tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd], list[t.Union[tokens.BaseToken, str]]
-        ]
-    ]:
-        logger.debug(
-            "Pre-processing verb card\n"
-            f"{self.__czech_field_name} (Czech field): {content[self.__czech_field_name]}\n"
-            f"{self.__pac_field_name} (Prepositions and Cases field): {content[self.__pac_field_name]}"
-        )
+        return self._render(content[self.__czech_field_name], content[self.__pac_field_name])
+
+    def _render(self, czech_field: str, pac_field: str, /) -> str:
+        """Render the processed field in one pass over both token streams.
+
+        Prepositions and cases of every Czech word are read right from the lexer, and all
+        parts of the result are collected in a list, which is joined once at the end.
+
+        Args:
+            czech_field: Content of the Czech field.
+            pac_field: Content of the prepositions and cases field.
+
+        Returns:
+            The processed field.
 
-        lexer = VerbLexer()
-        lexed_czech = self._navigate_over(lexer.lex(content[self.__czech_field_name]))
-        lexed_prepositions_and_cases = self._navigate_over(
-            lexer.lex(content[self.__pac_field_name]), dont_skip_escaped=True
+        Raises:
+            RuntimeError: If a future form in the Czech field has no pair in the prepositions and cases field.
+        """
+        lexed_czech = self._navigate_over(self.__lexer.lex_fast(czech_field))
+        lexed_prepositions_and_cases = self._navigate_over(self.__lexer.lex_fast(pac_field), dont_skip_escaped=True)
+        separator, skip_token, future_form_start = (
+            tokens.SeparatorToken(),
+            tokens.SkipToken(),
+            tokens.FutureFormTokenStart(),
         )
+        process_preposition_and_case = self._process_preposition_and_case
 
+        result: list[str] = []
         future_form_was = False
+        future_forms = 0
         for czech in lexed_czech:
-            logger.debug(f"Pre-processing czech {czech!r}.")
-            if isinstance(czech, tokens.AdditionalSeparatorToken):
-                logger.debug("Skipping additional separator token.")
-                continue
-            elif isinstance(czech, str):
-                prepositions_and_cases = list(self._pre_process_czech_token(czech, lexed_prepositions_and_cases))
-                logger.debug(f"Pre-processed prepositions and cases here: {prepositions_and_cases!r}.")
-                if len(prepositions_and_cases) > 0 and isinstance(
-                    prepositions_and_cases[-1], (tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd)
-                ):
-                    logger.debug("Future form was found.")
-                    future_form_was = True
-                    prepositions_and_cases.pop()
-                yield czech, prepositions_and_cases
-            elif isinstance(czech, (tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd)):
-                logger.debug("Processing future form.")
-                if not future_form_was and isinstance(czech, tokens.FutureFormTokenStart):
-                    assert_that(list(self._pre_process_czech_token(czech, lexed_prepositions_and_cases)) == [czech])
+            kind = tokens.kind_of(czech)
+            if kind is tokens.TokenKind.TEXT:
+                if result and not result[-1].endswith("["):
+                    result.append(", ")
+                result.append(t.cast(str, czech))
+
+                # the last token of the word is dropped, if it is a future form
+                # token, and a skip token in the end removes trailing comma
+                processed: list[str] = []
+                skip = False
+                consumed = 0
+                token: t.Optional[t.Union[tokens.BaseToken, str]]
+                pending: t.Optional[t.Union[tokens.BaseToken, str]] = None
+                while True:
+                    if pending is not None:
+                        token, pending = pending, None
+                    else:
+                        token = next(lexed_prepositions_and_cases, None)
+                    if token is None:
+                        break
+                    if token is separator:
+                        assert consumed != 0
+                        break
+                    consumed += 1
+
+                    token_kind = tokens.kind_of(token)
+                    if token_kind is tokens.TokenKind.FUTURE_FORM_START:
+                        future_form_was = True
+                        break
+                    if token_kind is tokens.TokenKind.FUTURE_FORM_END:
+                        pending = next(lexed_prepositions_and_cases, None)
+                        if pending is None or pending is separator:
+                            future_form_was = True
+                            continue
+
+                    if skip:
+                        skip = False
+                    elif token is skip_token:
+                        skip = True
+                    else:
+                        processed.append(process_preposition_and_case(token))
+
+                if skip:
+                    joined = "".join(processed)
+                    if joined.endswith(", "):
+                        processed = [joined[:-2]]
+                if any(processed):
+                    result.append(" (")
+                    result.extend(processed)
+                    result.append(")")
+            elif kind in _FUTURE_FORM_KINDS:
+                if kind is tokens.TokenKind.FUTURE_FORM_START:
+                    if not future_form_was:
+                        token = next(lexed_prepositions_and_cases, None)
+                        if token is None:
+                            offset = self._future_form_offset(czech_field, future_forms)
+                            diagnostics.report(
+                                "future form without pair in prepositions and cases",
+                                details=None if offset is None else f"offset {offset}",
+                            )
+                            raise RuntimeError("Future form in the Czech field has no pair in prepositions and cases.")
+                        assert_that(token is future_form_start)
+                    result.append(" [" if result else "[")
+                    future_forms += 1
+                else:
+                    result.append("]")
                 future_form_was = False
-                yield czech, [czech]
-            else:  # pragma: no cover
+            elif kind is not tokens.TokenKind.ADDITIONAL_SEPARATOR:  # pragma: no cover
                 raise NotImplementedError(f"Unexpected czech token type: {czech} ({type(czech)})")
 
-    def _pre_process_czech_token(
-        self,
-        czech: t.Union[tokens.BaseToken, str],
-        lexed_prepositions_and_cases: t.Iterator[t.Union[tokens.BaseToken, str]],
-    ) -> t.Iterator[t.Union[tokens.BaseToken, str]]:
-        logger.debug(f"Pre-processing czech token {czech!r}.")
-        if isinstance(czech, tokens.FutureFormTokenStart):
-            assert_that(next(lexed_prepositions_and_cases) == tokens.FutureFormTokenStart())
-            yield tokens.FutureFormTokenStart()
-        elif isinstance(czech, str):
-            for i, preposition_and_case in enumerate(lexed_prepositions_and_cases):
-                logger.debug(f"Pre-processing preposition and case {preposition_and_case!r} in czech token {czech!r}.")
-                if isinstance(preposition_and_case, tokens.SeparatorToken):
-                    logger.debug(f"Skipping separator token (index={i}).")
-                    assert i != 0
-                    break
-
-                yield preposition_and_case
-
-                if isinstance(preposition_and_case, tokens.FutureFormTokenStart):
-                    logger.trace("'tokens.FutureFormTokenStart' was found.")
-                    break
-        else:  # pragma: no cover
-            raise NotImplementedError(f"Unexpected czech token type: {czech} ({type(czech)})")
-
-    def _process(
-        self,
-        pre_processed: t.Iterator[
-            tuple[
-                t.Union[str, tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd],
-                list[t.Union[tokens.BaseToken, str]],
-            ]
-        ],
-    ) -> str:
-        result: str = ""
-        for czech, prepositions_and_cases in pre_processed:
-            logger.debug(f"Processing {czech=} {prepositions_and_cases=} in pre-processed.")
-
-            skip = False
-            processed_prepositions_and_cases = ""
-            for i, preposition_and_case in enumerate(prepositions_and_cases):
-                logger.debug(
-                    f"Processing {preposition_and_case=} (index={i}) in prepositions and cases. "
-                    f"Already processed: {processed_prepositions_and_cases!r}"
-                )
-                if skip:
-                    logger.debug(f"Skipping {preposition_and_case=} (index={i}), skip was True.")
-                    skip = False
-                    continue
-
-                if isinstance(preposition_and_case, tokens.SkipToken):
-                    logger.debug("Found skip token.")
-                    if i == len(prepositions_and_cases) - 1 and processed_prepositions_and_cases.endswith(", "):
-                        logger.trace("Removing trailing comma on the end.")
-                        processed_prepositions_and_cases = processed_prepositions_and_cases[:-2]
-                        break
-                    skip = True
-                    continue
-
-                processed_prepositions_and_cases += (
-                    added_part := self._process_preposition_and_case(preposition_and_case)
-                )
-                logger.trace(f"Added {added_part!r} to processed prepositions and cases.")
-
-            if isinstance(czech, (tokens.FutureFormTokenStart, tokens.FutureFormTokenEnd)):
-                logger.debug(f"'czech' is future form. ({czech=} {processed_prepositions_and_cases=})")
-                to_add = ((" " if result else "") + "[") if isinstance(czech, tokens.FutureFormTokenStart) else "]"
-                logger.trace(f"Adding {to_add!r} to the result.")
-                result += to_add
-            else:
-                logger.trace(f"'czech' is not a future form. ({czech=} {processed_prepositions_and_cases=})")
-                result += ", " if result and not result.endswith("[") else ""
-                result += czech
-                if processed_prepositions_and_cases != "":
-                    result += " (" + processed_prepositions_and_cases + ")"
-        logger.debug(f"Processed result: {result!r}.")
-        return result
+        rendered = "".join(result)
+        hot_logger.debug("Processed result: {!r}.", rendered)
+        return rendered
+
+    def _future_form_offset(self, czech_field: str, index: int, /) -> t.Optional[int]:
+        """Find where a future form starts in the Czech field, to report a problem with it.
+
+        Args:
+            czech_field: Content of the Czech field.
+            index: Index of the future form, counting from zero.
+
+        Returns:
+            Offset of the future form start symbol, or :obj:`None` if the lexer can't track offsets
+            (see :meth:`~czech_plus.logic.lexer.BaseLexer.lex_spans`).
+        """
+        try:
+            spans = self.__lexer.lex_spans(czech_field)
+            starts = [span.start for span in spans if span.kind is tokens.TokenKind.FUTURE_FORM_START]
+        except TypeError:
+            return None
+        return starts[index]
 
     def _process_preposition_and_case(self, preposition_and_case: t.Union[tokens.BaseToken, str], /) -> str:
-        logger.trace(f"Processing preposition and case: {preposition_and_case!r}.")
-        if isinstance(preposition_and_case, tokens.AdditionalSeparatorToken):
-            return ", "
-        elif isinstance(preposition_and_case, tokens.EscapedToken):
-            return preposition_and_case.content
-        elif isinstance(preposition_and_case, str):
-            return self._process_raw_preposition_and_case(preposition_and_case)
-        elif isinstance(preposition_and_case, tokens.FutureFormTokenStart):
-            return "["
-        elif isinstance(preposition_and_case, tokens.FutureFormTokenEnd):
-            return "]"
-        else:  # pragma: no cover
+        hot_logger.trace("Processing preposition and case: {!r}.", preposition_and_case)
+        kind = tokens.kind_of(preposition_and_case)
+        if kind is tokens.TokenKind.TEXT:
+            return self._process_raw_preposition_and_case(t.cast(str, preposition_and_case))
+        elif kind is tokens.TokenKind.ESCAPED:
+            return t.cast(tokens.EscapedToken, preposition_and_case).content
+
+        processed = _PROCESSED_PREPOSITION_AND_CASE_TOKENS.get(kind)
+        if processed is None:  # pragma: no cover
             raise NotImplementedError(
                 f"Unexpected preposition and case token type: {preposition_and_case} ({type(preposition_and_case)})"
             )
+        return processed
 
     def _process_raw_preposition_and_case(self, preposition_and_case: str, /) -> str:
         """Process raw preposition and case, when they're numbers for example.
@@ -189,7 +199,7 @@ class VerbProcessor(BaseProcessor):
         Returns:
             Processed preposition and case.
         """
-        logger.trace(f"Processing preposition and case: {preposition_and_case!r}")
+        hot_logger.trace("Processing preposition and case: {!r}", preposition_and_case)
 
         split = preposition_and_case.split(" ")
         if len(split) == 1:
@@ -200,7 +210,7 @@ class VerbProcessor(BaseProcessor):
             # prep !case
             # ^^^^^
             # notice that last symbol is a space, but it was deleted by split
-            logger.trace("Found preposition before escaped case.")
+            hot_logger.trace("Found preposition before escaped case.")
             return preposition_and_case
 
         preposition, case = split
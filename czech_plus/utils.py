@@ -3,15 +3,18 @@ r"""Module for utils.
 Some of those will be run in :mod:`czech_plus`\ .
 Some will be used in other places.
 """
+import collections
 import sys
 import typing
 
-import aqt
 from czech_plus._vendor.loguru import logger
 
 from czech_plus import config as config_module
 
-__all__ = ["setup_logging", "assert_that", "Singleton"]
+__all__ = ["setup_logging", "HotLogger", "hot_logger", "assert_that", "Singleton", "LRUCache"]
+
+_KT = typing.TypeVar("_KT")
+_VT = typing.TypeVar("_VT")
 
 
 def setup_logging() -> None:
@@ -38,14 +41,126 @@ def setup_logging() -> None:
         backtrace=True,
         diagnose=True,
     )
+    hot_logger.set_level(config.logging.level)
     logger.debug("Logging was setup!")
 
 
-def compile_all_notes() -> None:
-    """Just runs :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes`."""
+class _LogMethod(typing.Protocol):
+    """Signature of :class:`HotLogger` methods."""
+
+    def __call__(self, message: str, /, *args: object, **kwargs: object) -> None:
+        """Log the message, formatted with ``args`` and ``kwargs``."""
+
+
+def _do_nothing(message: str, /, *args: object, **kwargs: object) -> None:
+    """Replacement for disabled :class:`HotLogger` methods."""
+
+
+class HotLogger:
+    """Logging facade for hot paths, like lexers and processors, which log on every symbol.
+
+    Loguru checks level only after the message was already formatted, and f-strings with
+    :func:`repr` of tokens are expensive. This facade remembers the configured level (it is updated
+    in :func:`setup_logging`), and its methods for disabled levels are no-ops. Messages are formatted
+    lazily, with :meth:`str.format` style arguments, like in loguru.
+
+    Example:
+        .. code-block:: python
+
+            hot_logger.debug("Lexing {!r} (index: {})", symbol, i)
+    """
+
+    debug: _LogMethod
+    """Log with ``DEBUG`` level, if it is enabled."""
+    trace: _LogMethod
+    """Log with ``TRACE`` level, if it is enabled."""
+
+    def __init__(self) -> None:
+        # config isn't loaded yet, and by default nothing below WARNING is logged
+        self.level: typing.Optional[int] = None
+        self.debug = self.trace = _do_nothing
+
+    def set_level(self, level: int, /) -> None:
+        """Enable or disable methods, according to the level."""
+        self.level = level
+        self.debug = self._debug if level <= config_module.LogLevel.DEBUG else _do_nothing
+        self.trace = self._trace if level <= config_module.LogLevel.TRACE else _do_nothing
+
+    @staticmethod
+    def _debug(message: str, /, *args: object, **kwargs: object) -> None:
+        logger.opt(depth=1).debug(message, *args, **kwargs)
+
+    @staticmethod
+    def _trace(message: str, /, *args: object, **kwargs: object) -> None:
+        logger.opt(depth=1).trace(message, *args, **kwargs)
+
+
+hot_logger = HotLogger()
+"""Logger for hot paths, see :class:`HotLogger`."""
+
+
+def compile_all_notes(note_types: typing.Optional[typing.Collection[str]] = None) -> None:
+    """Runs :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` in background.
+
+    Anki's main window stays responsive, while a progress dialog shows how many notes were
+    already compiled. Closing the dialog cancels the compilation. The operation runs in
+    Anki's collection executor, so it is serialized with all other operations on the collection.
+
+    Args:
+        note_types: Names of the note types to compile. All configured note types by default.
+    """
+    import aqt
+    from aqt.operations import QueryOp
+
     from czech_plus.logic.compiler import Compiler  # circular import
 
-    logger.catch(Compiler(lambda: aqt.mw.col.weakref()).compile_all_notes)()  # type: ignore[union-attr]
+    main_window = aqt.mw
+    if main_window is None:
+        logger.warning("Anki main window is not initialized, can't compile notes.")
+        return
+
+    def on_progress(done: int, total: int) -> None:
+        main_window.taskman.run_on_main(
+            lambda: main_window.progress.update(label=f"Compiling notes ({done}/{total})...", value=done, max=total)
+        )
+
+    def on_failure(exception: Exception) -> None:
+        logger.opt(exception=exception).error("Failed to compile notes.")
+
+    QueryOp(
+        parent=main_window,
+        op=lambda collection: Compiler(collection.weakref).compile_all_notes(
+            on_progress=on_progress, should_cancel=main_window.progress.want_cancel, note_types=note_types
+        ),
+        success=lambda result: logger.debug(f"Compilation finished: {result}"),
+    ).failure(on_failure).with_progress("Compiling notes...").run_in_background()
+
+
+def recompile_changed_note_types(previous: "config_module.Config", current: "config_module.Config") -> None:
+    """Recompile notes of the note types, whose name or fields were changed in config.
+
+    Registered with :meth:`czech_plus.config.Config.on_reload`. Other note types are left alone.
+    In lazy mode, nothing is compiled, changed notes are compiled when they are shown.
+
+    Args:
+        previous: Config before the reload.
+        current: The new config.
+    """
+    note_types = current.cards.changed_note_types(previous.cards)
+    if not note_types:
+        return
+    if current.compiler.lazy:
+        logger.debug(f"Settings of {note_types} were changed, they will be compiled lazily.")
+        return
+
+    import aqt
+
+    main_window = aqt.mw
+    if main_window is None:
+        return
+    logger.info(f"Settings of {note_types} were changed, recompiling them.")
+    # config may be reloaded from a background thread, but operations must be started on the main one
+    main_window.taskman.run_on_main(lambda: compile_all_notes(note_types))
 
 
 class Singleton(type):
@@ -63,16 +178,64 @@ class Singleton(type):
         return cls._instances[cls]
 
 
-def assert_that(statement: bool, msg: str = "", /) -> None:
+class LRUCache(collections.OrderedDict[_KT, _VT]):
+    """Dict, that keeps only ``maxsize`` recently used items."""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key: _KT) -> _VT:
+        """Get the item and mark it as recently used."""
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key: _KT, default: typing.Optional[_VT] = None, /) -> typing.Optional[_VT]:  # type: ignore[override]
+        """Get the item (and mark it as recently used) or ``default``, if there is no such item."""
+        if key not in self:
+            return default
+        return self[key]
+
+    def __setitem__(self, key: _KT, value: _VT) -> None:
+        """Set the item and remove the least recently used one, if there are too many."""
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def assert_that(statement: bool, msg: str = "", /, *, offset: typing.Optional[int] = None) -> None:
     """By default, Anki removes all asserts from the code, so we need to craft own assert.
 
+    Failed checks are cheap: they are reported with :func:`czech_plus.logic.diagnostics.report`
+    (so counted in the compile summary), with only the caller's location and no traceback. If
+    ``strict_checks`` is enabled in logging config, every failed check is logged with the full traceback.
+
+    Args:
+        statement: The condition to check.
+        msg: Message to include in the report.
+        offset: Offset in the source field, where the check failed, if it is known.
+
     Example:
         .. code-block:: python
 
             assert next(generator) == str  # if this statement will not be executed - everything will fail.
     """
-    if not statement:
+    if statement:
+        return
+
+    if config_module.Config().logging.strict_checks:
         try:
             raise AssertionError(msg)
         except AssertionError:
             logger.exception("Oops, some assertion failed. It's either a bug nor error in syntax.")
+        return
+
+    from czech_plus.logic import diagnostics  # circular import
+
+    frame = sys._getframe(1)
+    category = f"failed check at {frame.f_globals.get('__name__')}:{frame.f_lineno}"
+    diagnostics.report(
+        f"{category} ({msg})" if msg else category, details=None if offset is None else f"offset {offset}"
+    )
@@ -1,9 +1,12 @@
 """Module for pytest configuration and global fixtures."""
+import pathlib
 import typing as t
 
 import pytest
+from pytest_mock import MockerFixture
 
 from czech_plus.config import Config
+from czech_plus.logic import cache
 
 _T = t.TypeVar("_T")
 
@@ -12,11 +15,13 @@ _T = t.TypeVar("_T")
 def mock_config() -> t.Iterator[t.Callable[[str, _T], _T]]:
     """Fixture for mocking config.
 
+    Every call replaces the config with a new snapshot, the same way as reload after a change in Anki,
+    and the original snapshot is put back after the test.
+
     Returns:
         A function that mocks the config.
     """
-    config = Config()
-    processed: dict[str, t.Any] = {}  # type: ignore[misc]
+    original = Config()
 
     def _mock_config(key: str, value: _T) -> _T:
         """Mock config.
@@ -28,27 +33,31 @@ def mock_config() -> t.Iterator[t.Callable[[str, _T], _T]]:
         Returns:
             The value that was set.
         """
-        content = config
+        new_config: dict[str, t.Any] = {}  # type: ignore[misc]
+        content = new_config
         parsed_key = key.split(".")
         for temp_key in parsed_key[:-1]:
-            content = getattr(content, temp_key)
+            content = content.setdefault(temp_key, {})
+        content[parsed_key[-1]] = value
 
-        processed[key] = getattr(content, parsed_key[-1])
-        object.__setattr__(content, parsed_key[-1], value)
+        Config()._reload(new_config)
         return value
 
     yield _mock_config
 
-    for key, value in processed.items():
-        parsed_key = key.split(".")
-        content = config
-
-        for temp_key in parsed_key[:-1]:
-            content = getattr(content, temp_key)
-        object.__setattr__(content, parsed_key[-1], value)
+    Config._instances[Config] = original
 
 
 @pytest.fixture(scope="session")
 def config() -> Config:
     """Fixture for config."""
     return Config()
+
+
+@pytest.fixture(autouse=True)
+def user_files_dir(tmp_path: pathlib.Path, mocker: MockerFixture) -> t.Iterator[pathlib.Path]:
+    """Don't let tests write into real ``user_files`` folder."""
+    path = tmp_path / "user_files"
+    mocker.patch("czech_plus.config.USER_FILES_DIR", path)
+    yield path
+    cache.reset_cache()
@@ -96,6 +96,18 @@ class CardsSettingsFactory(factory.Factory):
     adjectives: config.AdjectivesCardsSettings = factory.SubFactory("tests.factories.AdjectivesCardsSettingsFactory")
 
 
+class CompilerSettingsFactory(factory.Factory):
+    """Factory for :class:`~czech_plus.config.CompilerSettings` class."""
+
+    class Meta:  # noqa: D106
+        model = config.CompilerSettings
+
+    incremental: bool = factory.fuzzy.FuzzyAttribute(faker.pybool)
+    chunk_size: int = factory.fuzzy.FuzzyInteger(1, 1000)
+    processes: int = 1
+    parallel_threshold: int = factory.fuzzy.FuzzyInteger(0, 10000)
+
+
 class ConfigFactory(factory.Factory):
     """Factory for :class:`~czech_plus.config.Config` class."""
 
@@ -104,6 +116,7 @@ class ConfigFactory(factory.Factory):
 
     logging: config.LogSettings = factory.SubFactory("tests.factories.LogSettingsFactory")
     cards: config.CardsSettings = factory.SubFactory("tests.factories.CardsSettingsFactory")
+    compiler: config.CompilerSettings = factory.SubFactory("tests.factories.CompilerSettingsFactory")
 
     @classmethod
     def _create(cls, *args, **kwargs) -> config.Config:
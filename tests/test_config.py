@@ -1,5 +1,6 @@
 """Tests for the :mod:`czech_plus.config` module."""
 import dataclasses
+import json
 import pathlib
 import typing as t
 
@@ -46,6 +47,29 @@ class TestConfig:
 
         assert cfg == default_cfg
 
+    def test_write_config_replaces_outdated_file(self, tmp_path: pathlib.Path, mocker: MockerFixture) -> None:
+        """Test that outdated config file is replaced, without leaving temporary files."""
+        config_path = tmp_path / "config.json"
+        config_path.write_text("{}", encoding="utf8")
+        mocker.patch("czech_plus.config._CONFIG_PATH", config_path)
+        cfg = config.Config()
+
+        cfg._write_config()
+
+        assert json.loads(config_path.read_text(encoding="utf8")) == cfg.as_dict()
+        assert list(tmp_path.iterdir()) == [config_path]
+
+    def test_write_config_skips_up_to_date_file(self, tmp_path: pathlib.Path, mocker: MockerFixture) -> None:
+        """Test that config file isn't written, if it already has the same content."""
+        config_path = tmp_path / "config.json"
+        mocker.patch("czech_plus.config._CONFIG_PATH", config_path)
+        cfg = config.Config()
+        replace = mocker.patch("os.replace")
+
+        cfg._write_config()
+
+        replace.assert_not_called()
+
     def test_config_correctly_read_from_anki(
         self, remove_cached_config: t.Callable[[], None], mocker: MockerFixture, faker: Faker
     ) -> None:
@@ -71,3 +95,138 @@ class TestConfig:
         mocked = mocker.patch("aqt.mw.addonManager.getConfig", return_value=(config_as_dict := faker.pydict()))
         assert config._get_anki_config() == config_as_dict
         mocked.assert_called_once_with(config.BASE_DIR.stem)
+
+    def test_as_dict_and_from_dict_round_trip(self, mocker: MockerFixture) -> None:
+        """Test that :meth:`czech_plus.config.Config.from_dict` restores config from \
+        :meth:`czech_plus.config.Config.as_dict` output."""
+        custom_cfg = factories.ConfigFactory()
+        setup = mocker.patch("czech_plus.config.Config._setup")
+
+        assert config.Config.from_dict(custom_cfg.as_dict()) == custom_cfg
+        setup.assert_not_called()
+
+    def test_as_dict_stores_logging_level_as_name(self) -> None:
+        """Test that :meth:`czech_plus.config.Config.as_dict` result can be written as JSON."""
+        custom_cfg = factories.ConfigFactory()
+
+        assert custom_cfg.as_dict()["logging"]["level"] == custom_cfg.logging.level.name
+
+    def test_reload_skips_unchanged_config(self, mocker: MockerFixture) -> None:
+        """Test that nothing is done, if Anki config has the same values (even if some keys are missing)."""
+        cfg = config.Config()
+        setup = mocker.patch("czech_plus.config.Config._setup")
+        run_callbacks = mocker.patch("czech_plus.config.Config._run_reload_callbacks")
+
+        cfg._reload(cfg.as_dict())
+        cfg._reload({"logging": {"level": cfg.logging.level.name}})
+
+        setup.assert_not_called()
+        run_callbacks.assert_not_called()
+
+    def test_reload_replaces_snapshot(self, mocker: MockerFixture) -> None:
+        """Test that changed config is applied to a new snapshot, which shares unchanged parts with the old one."""
+        cfg = config.Config()
+        mocker.patch.dict(config.Config._instances)
+        run_callbacks = mocker.patch("czech_plus.config.Config._run_reload_callbacks")
+        chunk_size = cfg.compiler.chunk_size
+
+        cfg._reload(t.cast("config._CONFIG_AS_DICT", {"compiler": {"chunk_size": chunk_size + 1}}))
+
+        snapshot = config.Config()
+        assert snapshot is not cfg
+        assert snapshot.version > cfg.version
+        assert (snapshot.compiler.chunk_size, cfg.compiler.chunk_size) == (chunk_size + 1, chunk_size)
+        assert snapshot.cards is cfg.cards
+        assert snapshot.logging is cfg.logging
+        run_callbacks.assert_called_once_with(cfg)
+
+    def test_from_dict_creates_new_version(self) -> None:
+        """Test that snapshot with the same values is equal to the old one, but has a bigger version."""
+        cfg = config.Config()
+
+        snapshot = config.Config.from_dict(cfg.as_dict())
+
+        assert snapshot == cfg
+        assert snapshot.version > cfg.version
+
+    def test_anki_config_does_not_change_defaults(
+        self, remove_cached_config: t.Callable[[], None], mocker: MockerFixture
+    ) -> None:
+        """Test that values from Anki are applied to new objects, not to the shared default ones."""
+        custom_cfg = factories.ConfigFactory()
+        mocker.patch("czech_plus.config._get_anki_config", return_value=custom_cfg.as_dict())
+        remove_cached_config()
+
+        cfg = config.Config()
+
+        assert cfg == custom_cfg
+        assert config.CardsSettings().nouns.note_type_name == "Noun"
+        assert config.Config.from_dict({}).cards == config.CardsSettings()
+
+    def test_watches_with_config_updated_action(self, mocker: MockerFixture) -> None:
+        """Test that Anki's config updated action is used instead of polling, if it is available."""
+        mocker.patch.object(config.Config, "_watching", False)
+        main_window = mocker.patch("aqt.mw")
+        thread = mocker.patch("threading.Thread")
+        reload = mocker.patch("czech_plus.config.Config._reload")
+
+        cfg = config.Config()
+
+        thread.assert_not_called()
+        (addon, action), _ = main_window.addonManager.setConfigUpdatedAction.call_args
+        assert addon == config.BASE_DIR.stem
+        new_config: config._CONFIG_AS_DICT = {"logging": {}}
+        action(new_config)
+        reload.assert_called_once_with(new_config)
+        assert cfg is config.Config()
+
+    def test_watches_with_polling_on_old_anki(self, mocker: MockerFixture) -> None:
+        """Test that ``meta.json`` is polled, if Anki doesn't have config updated action."""
+        mocker.patch.object(config.Config, "_watching", False)
+        mocker.patch("aqt.mw", addonManager=mocker.Mock(spec=["getConfig"], **{"getConfig.return_value": {}}))
+        thread = mocker.patch("threading.Thread")
+
+        config.Config()
+
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once_with()
+
+    def test_not_watching_without_anki(self, mocker: MockerFixture) -> None:
+        """Test that nothing is watched, if Anki main window isn't initialized (e.g. in benchmarks)."""
+        mocker.patch.object(config.Config, "_watching", False)
+        mocker.patch("aqt.mw", None)
+        thread = mocker.patch("threading.Thread")
+
+        config.Config()
+
+        thread.assert_not_called()
+        assert config.Config._watching is False
+
+    def test_reload_callbacks(self, mocker: MockerFixture) -> None:
+        """Test that callbacks from :meth:`czech_plus.config.Config.on_reload` are called, even if one fails."""
+        mocker.patch("czech_plus.config._reload_callbacks", [])
+        failing, callback = mocker.Mock(side_effect=RuntimeError), mocker.Mock()
+        config.Config.on_reload(failing)
+        config.Config.on_reload(callback)
+        cfg, previous = config.Config(), config.Config.from_dict({})
+
+        cfg._run_reload_callbacks(previous)
+
+        failing.assert_called_once_with(previous, cfg)
+        callback.assert_called_once_with(previous, cfg)
+
+    @pytest.mark.parametrize("changed", ["note_type_name", "fields"])
+    def test_changed_note_types(self, changed: str, faker: Faker) -> None:
+        """Test that only note types with changed name or fields are returned, with their new names."""
+        previous = config.CardsSettings()
+        verbs = (
+            dataclasses.replace(previous.verbs, note_type_name=faker.word())
+            if changed == "note_type_name"
+            else dataclasses.replace(
+                previous.verbs, fields=dataclasses.replace(previous.verbs.fields, czech=faker.word())
+            )
+        )
+        current = dataclasses.replace(previous, nouns=config.NounCardsSettings(), verbs=verbs)
+
+        assert current.changed_note_types(previous) == [verbs.note_type_name]
+        assert previous.changed_note_types(previous) == []
@@ -0,0 +1,201 @@
+"""Tests for the :mod:`czech_plus.hooks` module."""
+import typing as t
+from unittest.mock import MagicMock
+
+import pytest
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus import hooks
+
+_T = t.TypeVar("_T")
+
+
+class TestHooks:
+    """Tests for hooks, that compile edited notes."""
+
+    @pytest.fixture
+    def note(self, mocker: MockerFixture, faker: Faker) -> MagicMock:
+        """Mocked note with three fields."""
+        note: MagicMock = mocker.Mock()
+        note.note_type.return_value = {"name": faker.word()}
+        note.keys.return_value = ["Czech", "Gender", "Processed"]
+        return note
+
+    @pytest.fixture
+    def get_processor(self, mocker: MockerFixture) -> MagicMock:
+        """Mocked :func:`czech_plus.logic.processor.get_processor`."""
+        get_processor = mocker.patch("czech_plus.logic.processor.get_processor")
+        get_processor.return_value.source_fields = ("Czech", "Gender")
+        return get_processor
+
+    @pytest.fixture
+    def update_note(self, mocker: MockerFixture) -> MagicMock:
+        """Mocked :meth:`czech_plus.logic.compiler.Compiler.update_note`."""
+        return mocker.patch("czech_plus.logic.compiler.Compiler.update_note", return_value=True)
+
+    @pytest.mark.parametrize("lazy", [True, False])
+    def test_register(self, lazy: bool, mocker: MockerFixture, mock_config: t.Callable[[str, _T], _T]) -> None:
+        """Test that all hooks are appended to Anki hooks, so ``lazy`` can be enabled without restart."""
+        mock_config("compiler.lazy", lazy)
+        gui_hooks = mocker.patch("czech_plus.hooks.gui_hooks")
+
+        hooks.register()
+
+        gui_hooks.editor_did_unfocus_field.append.assert_called_once_with(hooks.on_editor_did_unfocus_field)
+        gui_hooks.add_cards_did_add_note.append.assert_called_once_with(hooks.on_add_cards_did_add_note)
+        gui_hooks.card_will_show.append.assert_called_once_with(hooks.on_card_will_show)
+
+    @pytest.mark.parametrize("changed", [True, False])
+    def test_unfocus_source_field_compiles_note(
+        self, changed: bool, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that note is compiled after a source field lost focus."""
+        assert hooks.on_editor_did_unfocus_field(changed, note, 1) is True
+
+        update_note.assert_called_once_with(note, note.note_type.return_value["name"], cache=None)
+
+    @pytest.mark.parametrize("changed", [True, False])
+    def test_unfocus_not_changed_processed_field(
+        self, changed: bool, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that ``changed`` is passed through, if processed field is already up to date."""
+        update_note.return_value = False
+
+        assert hooks.on_editor_did_unfocus_field(changed, note, 0) is changed
+
+    @pytest.mark.parametrize("changed", [True, False])
+    def test_unfocus_other_field_does_nothing(
+        self, changed: bool, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that note isn't compiled, if the field isn't a source field."""
+        assert hooks.on_editor_did_unfocus_field(changed, note, 2) is changed
+
+        update_note.assert_not_called()
+
+    def test_unfocus_unknown_note_type_does_nothing(
+        self, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that notes of other note types are ignored."""
+        get_processor.return_value = None
+
+        assert hooks.on_editor_did_unfocus_field(False, note, 0) is False
+
+        update_note.assert_not_called()
+
+    def test_unfocus_error_does_not_break_editor(
+        self, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that errors while compiling are only logged."""
+        update_note.side_effect = Exception
+
+        assert hooks.on_editor_did_unfocus_field(False, note, 0) is False
+
+    @pytest.mark.parametrize("updated", [True, False])
+    def test_add_note_saves_note_only_if_changed(
+        self, updated: bool, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that added note is compiled and saved, if processed field was changed."""
+        update_note.return_value = updated
+
+        hooks.on_add_cards_did_add_note(note)
+
+        update_note.assert_called_once_with(note, note.note_type.return_value["name"], cache=None)
+        assert t.cast(MagicMock, note.col.update_note).called is updated
+        if updated:
+            note.col.update_note.assert_called_once_with(note, skip_undo_entry=True)
+
+    def test_add_note_unknown_note_type_does_nothing(
+        self, note: MagicMock, get_processor: MagicMock, update_note: MagicMock
+    ) -> None:
+        """Test that added notes of other note types are ignored."""
+        note.note_type.return_value = None
+
+        hooks.on_add_cards_did_add_note(note)
+
+        update_note.assert_not_called()
+        get_processor.assert_not_called()
+
+
+class TestCardWillShow:
+    """Tests for :func:`czech_plus.hooks.on_card_will_show`."""
+
+    @pytest.fixture(autouse=True)
+    def lazy(self, mock_config: t.Callable[[str, _T], _T]) -> None:
+        """Enable :attr:`czech_plus.config.CompilerSettings.lazy`."""
+        mock_config("compiler.lazy", True)
+
+    @pytest.fixture
+    def card(self, mocker: MockerFixture, faker: Faker) -> MagicMock:
+        """Mocked card with a note, which has source and processed fields."""
+        card: MagicMock = mocker.Mock()
+        card.note.return_value.note_type.return_value = {"name": faker.word()}
+        card.note.return_value.fields = [faker.word(), "old processed"]
+        return card
+
+    @pytest.fixture
+    def update_note(self, mocker: MockerFixture) -> MagicMock:
+        """Mocked :meth:`czech_plus.logic.compiler.Compiler.update_note`, that changes processed field."""
+
+        def update_note(note: MagicMock, *_: object, **__: object) -> bool:
+            note.fields[-1] = "new processed"
+            return True
+
+        mocker.patch("czech_plus.logic.processor.get_processor")
+        return mocker.patch("czech_plus.logic.compiler.Compiler.update_note", side_effect=update_note)
+
+    def test_up_to_date_note_is_shown_as_is(self, card: MagicMock, update_note: MagicMock, faker: Faker) -> None:
+        """Test that nothing is saved or changed, if processed field is up to date."""
+        update_note.side_effect = None
+        update_note.return_value = False
+        text = faker.sentence()
+
+        assert hooks.on_card_will_show(text, card, "reviewQuestion") == text
+
+        note = card.note.return_value
+        update_note.assert_called_once_with(note, note.note_type.return_value["name"], cache=hooks._review_cache)
+        note.col.update_note.assert_not_called()
+
+    @pytest.mark.parametrize("kind", ["reviewQuestion", "reviewAnswer", "previewQuestion", "previewAnswer"])
+    def test_stale_note_is_saved_and_replaced_in_text(self, kind: str, card: MagicMock, update_note: MagicMock) -> None:
+        """Test that updated note is saved and new processed content replaces the old one in the text, \
+        so changes of other filters are kept."""
+        text = hooks.on_card_will_show("<div class=filtered>old processed</div>", card, kind)
+
+        note = card.note.return_value
+        note.col.update_note.assert_called_once_with(note, skip_undo_entry=True)
+        assert text == "<div class=filtered>new processed</div>"
+        card.render_output.assert_not_called()
+
+    def test_empty_processed_field_is_shown_next_time(self, card: MagicMock, update_note: MagicMock) -> None:
+        """Test that text is kept as is, if processed field was empty, but the note is still saved."""
+        card.note.return_value.fields[-1] = ""
+
+        assert hooks.on_card_will_show("<div></div>", card, "reviewQuestion") == "<div></div>"
+
+        card.note.return_value.col.update_note.assert_called_once()
+
+    def test_failed_save_shows_text_as_is(self, card: MagicMock, update_note: MagicMock) -> None:
+        """Test that text isn't changed, if the note couldn't be saved."""
+        card.note.return_value.col.update_note.side_effect = Exception
+
+        assert hooks.on_card_will_show("old processed", card, "reviewQuestion") == "old processed"
+
+    def test_card_layout_is_ignored(self, card: MagicMock, update_note: MagicMock, faker: Faker) -> None:
+        """Test that cards in card layout editor are not compiled."""
+        text = faker.sentence()
+
+        assert hooks.on_card_will_show(text, card, "clayoutQuestion") == text
+
+        update_note.assert_not_called()
+
+    def test_does_nothing_if_not_lazy(
+        self, card: MagicMock, update_note: MagicMock, mock_config: t.Callable[[str, _T], _T], faker: Faker
+    ) -> None:
+        """Test that cards are not compiled, if :attr:`czech_plus.config.CompilerSettings.lazy` is disabled."""
+        mock_config("compiler.lazy", False)
+        text = faker.sentence()
+
+        assert hooks.on_card_will_show(text, card, "reviewQuestion") == text
+
+        update_note.assert_not_called()
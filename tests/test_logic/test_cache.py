@@ -0,0 +1,157 @@
+"""Tests :mod:`czech_plus.logic.cache`."""
+import pathlib
+import typing as t
+
+import pytest
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus.logic import cache as cache_module
+from czech_plus.logic.cache import ProcessedCache
+
+_T = t.TypeVar("_T")
+
+
+class TestProcessedCache:
+    """Tests :class:`czech_plus.logic.cache.ProcessedCache`."""
+
+    @pytest.fixture
+    def path(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        """Path to the cache database."""
+        return tmp_path / "cache.sqlite3"
+
+    def test_get_returns_none_for_unknown_key(self, path: pathlib.Path, faker: Faker) -> None:
+        """Test that :meth:`~czech_plus.logic.cache.ProcessedCache.get` returns :obj:`None` on miss."""
+        assert ProcessedCache(path).get(faker.word(), faker.pystr()) is None
+
+    def test_set_is_persistent(self, path: pathlib.Path, faker: Faker) -> None:
+        """Test that values are available after reopening."""
+        note_type, key, value = faker.word(), faker.pystr(), faker.sentence()
+        ProcessedCache(path).set(note_type, key, value)
+
+        assert ProcessedCache(path).get(note_type, key) == value
+
+    def test_keys_are_scoped_by_note_type(self, path: pathlib.Path, faker: Faker) -> None:
+        """Test that the same key in other note type is a different entry."""
+        cache = ProcessedCache(path)
+        key = faker.pystr()
+        cache.set("first", key, faker.word())
+
+        assert cache.get("second", key) is None
+
+    def test_batch_writes_at_the_end(self, path: pathlib.Path, faker: Faker) -> None:
+        """Test that values, set inside :meth:`~czech_plus.logic.cache.ProcessedCache.batch`, are written \
+        at the end of the batch, but are available right away."""
+        cache = ProcessedCache(path)
+        note_type, key, value = faker.word(), faker.pystr(), faker.sentence()
+
+        with cache.batch():
+            cache.set(note_type, key, value)
+            assert cache.get(note_type, key) == value
+            assert ProcessedCache(path).get(note_type, key) is None
+
+        assert ProcessedCache(path).get(note_type, key) == value
+
+    def test_prefetch_reads_many_keys_at_once(self, path: pathlib.Path, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that :meth:`~czech_plus.logic.cache.ProcessedCache.get` doesn't query prefetched keys, \
+        even if they are missing."""
+        mocker.patch("czech_plus.logic.cache._QUERY_BATCH_SIZE", 2)
+        note_type = faker.word()
+        entries = {faker.pystr(): faker.word() for _ in range(3)}
+        cache = ProcessedCache(path)
+        with cache.batch():
+            for key, value in entries.items():
+                cache.set(note_type, key, value)
+        missing = faker.pystr()
+
+        cache = ProcessedCache(path)
+        with cache.batch():
+            cache.prefetch(note_type, [*entries, missing])
+            connection = mocker.patch.object(cache, "_connection")
+
+            assert {key: cache.get(note_type, key) for key in entries} == entries
+            assert cache.get(note_type, missing) is None
+            connection.execute.assert_not_called()
+
+    def test_prefetched_entries_are_dropped_after_batch(self, path: pathlib.Path, faker: Faker) -> None:
+        """Test that prefetched entries are kept only until the end of the batch."""
+        cache = ProcessedCache(path)
+        note_type, key, value = faker.word(), faker.pystr(), faker.word()
+        with cache.batch():
+            cache.prefetch(note_type, [key])
+        ProcessedCache(path).set(note_type, key, value)
+
+        assert cache.get(note_type, key) == value
+
+    def test_evicts_old_entries(
+        self, path: pathlib.Path, mocker: MockerFixture, mock_config: t.Callable[[str, _T], _T], faker: Faker
+    ) -> None:
+        """Test that entries, that weren't used for too long, are removed on open."""
+        mock_config("compiler.cache_max_age_days", 10)
+        note_type, key = faker.word(), faker.pystr()
+        mocker.patch("time.time", return_value=0)
+        ProcessedCache(path).set(note_type, key, faker.word())
+
+        mocker.patch("time.time", return_value=11 * 24 * 60 * 60)
+        assert ProcessedCache(path).get(note_type, key) is None
+
+    def test_using_entry_prevents_eviction(
+        self, path: pathlib.Path, mocker: MockerFixture, mock_config: t.Callable[[str, _T], _T], faker: Faker
+    ) -> None:
+        """Test that usage date is updated, when entry is read."""
+        mock_config("compiler.cache_max_age_days", 10)
+        note_type, key, value = faker.word(), faker.pystr(), faker.word()
+        mocker.patch("time.time", return_value=0)
+        ProcessedCache(path).set(note_type, key, value)
+
+        mocker.patch("time.time", return_value=5 * 24 * 60 * 60)
+        cache = ProcessedCache(path)
+        cache.get(note_type, key)
+        cache.save()
+
+        mocker.patch("time.time", return_value=11 * 24 * 60 * 60)
+        assert ProcessedCache(path).get(note_type, key) == value
+
+    def test_evicts_least_recently_used_over_limit(
+        self, path: pathlib.Path, mocker: MockerFixture, mock_config: t.Callable[[str, _T], _T], faker: Faker
+    ) -> None:
+        """Test that only ``cache_max_entries`` most recently used entries are kept."""
+        mock_config("compiler.cache_max_entries", 1)
+        note_type = faker.word()
+        for day, key in enumerate(["old", "new"]):
+            mocker.patch("time.time", return_value=day * 24 * 60 * 60)
+            ProcessedCache(path).set(note_type, key, faker.word())
+
+        cache = ProcessedCache(path)
+        assert cache.get(note_type, "old") is None
+        assert cache.get(note_type, "new") is not None
+
+
+class TestGetCache:
+    """Tests :func:`czech_plus.logic.cache.get_cache`."""
+
+    def test_returns_none_if_disabled(self, mock_config: t.Callable[[str, _T], _T]) -> None:
+        """Test that cache can be disabled in config."""
+        mock_config("compiler.cache", False)
+        assert cache_module.get_cache() is None
+
+    def test_returns_the_same_cache(self, mock_config: t.Callable[[str, _T], _T], user_files_dir: pathlib.Path) -> None:
+        """Test that cache is opened once per process in ``user_files`` directory."""
+        mock_config("compiler.cache", True)
+        cache = cache_module.get_cache()
+
+        assert cache is not None
+        assert cache is cache_module.get_cache()
+        assert cache.path.parent == user_files_dir
+
+    def test_reset_cache_closes_it(self, mock_config: t.Callable[[str, _T], _T], mocker: MockerFixture) -> None:
+        """Test that :func:`czech_plus.logic.cache.reset_cache` closes the cache and next one is opened again."""
+        mock_config("compiler.cache", True)
+        cache = cache_module.get_cache()
+        assert cache is not None
+        close = mocker.spy(cache, "close")
+
+        cache_module.reset_cache()
+
+        close.assert_called_once_with()
+        assert cache_module.get_cache() is not cache
@@ -1,4 +1,7 @@
 """Tests :mod:`czech_plus.logic.compiler`."""
+import collections
+import concurrent.futures
+import concurrent.futures.process
 import typing as t
 from unittest.mock import MagicMock
 
@@ -9,11 +12,55 @@ from faker import Faker
 from pytest_mock import MockerFixture
 
 from czech_plus.config import Config
-from czech_plus.logic.compiler import Compiler
+from czech_plus.logic import diagnostics, parallel
+from czech_plus.logic.compiler import Compiler, CompileResult, _Chunk, _NoteRow
+from czech_plus.logic.fingerprint import FingerprintStore
+from czech_plus.logic.processor import get_processor
+from czech_plus.logic.processor.implementations.base import BaseProcessor
 
 _T = t.TypeVar("_T")
 
 
+def _note_row(note_id: int, content: dict[str, str], mid: int = 1) -> _NoteRow:
+    """Create note, as it is read from the collection. Columns, that the compiler doesn't use, are made up."""
+    return _NoteRow(note_id, f"guid{note_id}", mid, 100, -1, " tag ", content)
+
+
+def _content(note_type: str, faker: Faker, extra: t.Optional[dict[str, str]] = None) -> dict[str, str]:
+    """Create note content with unique values of all source fields of the note type, and ``extra`` fields."""
+    processor = t.cast(BaseProcessor, get_processor(note_type))
+    return {**{field_name: faker.unique.word() for field_name in processor.source_fields}, **(extra or {})}
+
+
+def _mock_process(mocker: MockerFixture, note_type: str) -> MagicMock:
+    """Mock ``process`` method of the processor for the note type."""
+    return mocker.patch.object(get_processor(note_type), "process")
+
+
+def _db_row(note: _NoteRow) -> tuple[object, ...]:
+    """Convert note back to the row of the ``notes`` table."""
+    return (*note[:-1], "\x1f".join(note.content.values()))
+
+
+def _mock_chunks(mocker: MockerFixture, chunks: list[tuple[str, list[tuple[int, dict[str, str]]]]]) -> MagicMock:
+    """Mock notes, that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` reads from the collection.
+
+    Returns:
+        Mocked :meth:`czech_plus.logic.compiler.Compiler._get_chunks`.
+    """
+    mocker.patch("czech_plus.logic.compiler.Compiler._get_note_types", return_value={})
+    mocker.patch(
+        "czech_plus.logic.compiler.Compiler._count_notes",
+        return_value=sum(len(notes_fields) for _, notes_fields in chunks),
+    )
+    return mocker.patch(
+        "czech_plus.logic.compiler.Compiler._get_chunks",
+        return_value=iter(
+            [(note_type, [_note_row(*note) for note in notes_fields]) for note_type, notes_fields in chunks]
+        ),
+    )
+
+
 @pytest.fixture
 def anki_collection(mocker: MockerFixture) -> AnkiCollection:
     """Fixture for mocked Anki collection."""
@@ -24,9 +71,18 @@ class TestCompiler:
     """Tests :func:`czech_plus.logic.compiler.Compiler`."""
 
     @pytest.fixture
-    def compiler(self, mocker: MockerFixture, anki_collection: AnkiCollection) -> Compiler:
+    def make_compiler(self, mocker: MockerFixture, anki_collection: AnkiCollection) -> t.Callable[[], Compiler]:
+        """Fixture for creating :class:`czech_plus.logic.compiler.Compiler` objects.
+
+        Compiler uses the config, which was current when it was created, so tests, that mock config,
+        must create it after that.
+        """
+        return lambda: Compiler(mocker.MagicMock(return_value=anki_collection))
+
+    @pytest.fixture
+    def compiler(self, make_compiler: t.Callable[[], Compiler]) -> Compiler:
         """Fixture for :class:`czech_plus.logic.compiler.Compiler` object."""
-        return Compiler(mocker.MagicMock(return_value=anki_collection))
+        return make_compiler()
 
     @pytest.fixture(
         params=(
@@ -51,7 +107,7 @@ class TestCompiler:
             }[note_type],
         )()
 
-        mocker.patch("czech_plus.logic.compiler.Compiler._get_notes_ids", return_value=[(note_id, note_type_name)])
+        _mock_chunks(mocker, [(note_type_name, [(note_id, {})])])
         return note_type_name, note_id
 
     def test_invalid_note_type_name_in_config(
@@ -82,25 +138,585 @@ class TestCompiler:
         assert compiler._anki_collection is stub.return_value
         stub.assert_called_once_with()
 
-    def test_compile_all_notes_calls_compile_note(
-        self, note_type_and_id: tuple[str, int], compiler: Compiler, mocker: MockerFixture, faker: Faker
+    @pytest.fixture
+    def stages(self, mocker: MockerFixture) -> tuple[MagicMock, MagicMock]:
+        """Mock reading and finishing stages of :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes`."""
+        read_chunk = mocker.patch(
+            "czech_plus.logic.compiler.Compiler._read_chunk",
+            side_effect=lambda note_type, notes, fingerprints: _Chunk(
+                note_type, len(notes), to_process={note.id: note for note in notes}
+            ),
+        )
+        finish_chunk = mocker.patch(
+            "czech_plus.logic.compiler.Compiler._finish_chunk", return_value=CompileResult(written=1)
+        )
+        return read_chunk, finish_chunk
+
+    def test_compile_all_notes_reads_processes_and_finishes_chunks(
+        self,
+        note_type_and_id: tuple[str, int],
+        compiler: Compiler,
+        mocker: MockerFixture,
+        stages: tuple[MagicMock, MagicMock],
     ) -> None:
-        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` just calls \
-        :meth:`czech_plus.logic.compiler.Compiler.compile_note` for all notes."""
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` reads, processes \
+        and finishes every chunk of notes."""
         note_type, note_id = note_type_and_id
-        mocked_compile_note = mocker.patch("czech_plus.logic.compiler.Compiler.compile_note")
-        mocked_get_cards_ids = t.cast(MagicMock, Compiler._get_notes_ids)
+        read_chunk, finish_chunk = stages
+        rows = [parallel.ProcessedRow(note_id, "processed", None)]
+        process_rows = mocker.patch("czech_plus.logic.parallel.process_rows", return_value=rows)
+        mocked_get_note_types = t.cast(MagicMock, Compiler._get_note_types)
+
+        assert compiler.compile_all_notes() == CompileResult(written=1)
+
+        mocked_get_note_types.assert_called_once_with(only=None)
+        t.cast(MagicMock, Compiler._get_chunks).assert_called_once_with(mocked_get_note_types.return_value)
+        read_chunk.assert_called_once_with(note_type, [_note_row(note_id, {})], fingerprints=mocker.ANY)
+        process_rows.assert_called_once_with(note_type, [(note_id, {})])
+        finish_chunk.assert_called_once_with(mocker.ANY, rows, fingerprints=mocker.ANY)
+        assert finish_chunk.call_args.args[0].to_process == {note_id: _note_row(note_id, {})}
+
+    @pytest.mark.parametrize("write_metrics", [True, False])
+    def test_compile_all_notes_returns_metrics(
+        self,
+        write_metrics: bool,
+        make_compiler: t.Callable[[], Compiler],
+        mocker: MockerFixture,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+        stages: tuple[MagicMock, MagicMock],
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` returns timings of the run \
+        and writes them, if enabled."""
+        mock_config("compiler.write_metrics", write_metrics)
+        compiler = make_compiler()
+        note_type = faker.word()
+        _mock_chunks(mocker, [(note_type, [(1, {}), (2, {})])])
+        mocker.patch(
+            "czech_plus.logic.parallel.process_rows",
+            return_value=[
+                parallel.ProcessedRow(1, faker.word(), None, elapsed=3.0, lexing=1.0),
+                parallel.ProcessedRow(2, faker.word(), None, elapsed=1.0, lexing=0.5),
+            ],
+        )
+        write = mocker.patch("czech_plus.logic.metrics.CompileMetrics.write")
+
+        result = compiler.compile_all_notes()
+
+        assert result.metrics is not None
+        assert result.metrics.notes_count == 2
+        assert result.metrics.note_types == {note_type: 2}
+        assert result.metrics.phases["lexing"] == 1.5
+        assert result.metrics.phases["processing"] == 2.5
+        assert [note.note_id for note in result.metrics.slowest_notes] == [1, 2]
+        assert write.called is write_metrics
+
+    @pytest.mark.parametrize("failed_stage", ["read", "finish"])
+    def test_compile_all_notes_continues_after_failed_chunk(
+        self,
+        failed_stage: str,
+        compiler: Compiler,
+        mocker: MockerFixture,
+        faker: Faker,
+        stages: tuple[MagicMock, MagicMock],
+    ) -> None:
+        """Test that one failed chunk doesn't stop the compilation."""
+        read_chunk, finish_chunk = stages
+        _mock_chunks(mocker, [(faker.word(), [(1, {})]), (faker.word(), [(2, {})])])
+        mocker.patch("czech_plus.logic.parallel.process_rows", return_value=[])
+        if failed_stage == "read":
+            read_chunk.side_effect = [Exception, _Chunk(faker.word(), 1)]
+        else:
+            finish_chunk.side_effect = [Exception, CompileResult(written=1)]
+
+        assert compiler.compile_all_notes() == CompileResult(written=1, failed=1)
+
+    def test_compile_all_notes_sums_results(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, stages: tuple[MagicMock, MagicMock]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` sums results of all chunks."""
+        _, finish_chunk = stages
+        _mock_chunks(mocker, [(faker.word(), [(1, {})]), (faker.word(), [(2, {})])])
+        finish_chunk.side_effect = [
+            CompileResult(written=1, unchanged=2, failed=3),
+            CompileResult(written=4, unchanged=5),
+        ]
+
+        assert compiler.compile_all_notes() == CompileResult(written=5, unchanged=7, failed=3)
+
+    @pytest.mark.parametrize("incremental", [True, False])
+    def test_compile_all_notes_passes_fingerprints_only_if_incremental(
+        self,
+        incremental: bool,
+        note_type_and_id: tuple[str, int],
+        make_compiler: t.Callable[[], Compiler],
+        mock_config: t.Callable[[str, _T], _T],
+        stages: tuple[MagicMock, MagicMock],
+    ) -> None:
+        """Test that fingerprints store is used by :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` \
+        only if incremental mode is enabled."""
+        read_chunk, finish_chunk = stages
+        mock_config("compiler.incremental", incremental)
+        compiler = make_compiler()
 
         compiler.compile_all_notes()
 
-        mocked_compile_note.assert_called_once_with(note_id, note_type)
-        mocked_get_cards_ids.assert_called_once_with()
+        assert isinstance(read_chunk.call_args.kwargs["fingerprints"], FingerprintStore) is incremental
+        assert isinstance(finish_chunk.call_args.kwargs["fingerprints"], FingerprintStore) is incremental
 
-    def test_compile_note_calls_what_and_how_expected(  # type: ignore[misc] # explicit any
+    def test_get_chunks(
+        self,
+        make_compiler: t.Callable[[], Compiler],
+        anki_collection: MagicMock,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._get_chunks` reads notes page by page and splits \
+        pages by note type."""
+        mock_config("compiler.chunk_size", 3)
+        compiler = make_compiler()
+        noun, verb = faker.word(), faker.word()
+        anki_collection.models.get.side_effect = lambda note_type_id: note_type_id
+        anki_collection.models.field_names.side_effect = lambda note_type_id: {1: ["a", "b"], 2: ["c"]}[note_type_id]
+        first_noun, second_noun = _note_row(10, {"a": "x", "b": "y"}), _note_row(11, {"a": "z", "b": "w"})
+        first_verb, second_verb = _note_row(20, {"c": "q"}, mid=2), _note_row(21, {"c": "r"}, mid=2)
+        anki_collection.db.all.side_effect = [
+            [_db_row(first_noun), _db_row(second_noun), _db_row(first_verb)],
+            [_db_row(second_verb)],
+        ]
+
+        assert list(compiler._get_chunks({1: noun, 2: verb})) == [
+            (noun, [first_noun, second_noun]),
+            (verb, [first_verb]),
+            (verb, [second_verb]),
+        ]
+        assert anki_collection.db.all.call_count == 2
+        # keyset pagination continues after the last row of the previous page
+        assert anki_collection.db.all.call_args_list[1].args[1:] == (2, 20, 3)
+
+    def test_get_chunks_stops_on_empty_page(
+        self,
+        make_compiler: t.Callable[[], Compiler],
+        anki_collection: MagicMock,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._get_chunks` stops, when there are no more notes."""
+        mock_config("compiler.chunk_size", 1)
+        compiler = make_compiler()
+        anki_collection.models.field_names.return_value = ["a"]
+        note = _note_row(10, {"a": "x"})
+        anki_collection.db.all.side_effect = [[_db_row(note)], []]
+        note_type = faker.word()
+
+        assert list(compiler._get_chunks({1: note_type})) == [(note_type, [note])]
+        assert anki_collection.db.all.call_count == 2
+
+    def test_get_chunks_without_note_types(self, compiler: Compiler, anki_collection: MagicMock) -> None:
+        """Test that no query is made, if there are no note types."""
+        assert list(compiler._get_chunks({})) == []
+        assert compiler._count_notes({}) == 0
+        anki_collection.db.all.assert_not_called()
+        anki_collection.db.scalar.assert_not_called()
+
+    def test_compile_all_notes_reports_progress(
+        self,
+        compiler: Compiler,
+        mocker: MockerFixture,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+        stages: tuple[MagicMock, MagicMock],
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` reports progress after every \
+        chunk."""
+        note_type = faker.word()
+        _mock_chunks(mocker, [(note_type, [(0, {}), (1, {})]), (note_type, [(2, {}), (3, {})]), (note_type, [(4, {})])])
+        on_progress = mocker.stub()
+
+        compiler.compile_all_notes(on_progress=on_progress)
+
+        assert on_progress.call_args_list == [mocker.call(2, 5), mocker.call(4, 5), mocker.call(5, 5)]
+
+    def test_compile_all_notes_can_be_cancelled(
+        self,
+        compiler: Compiler,
+        mocker: MockerFixture,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+        stages: tuple[MagicMock, MagicMock],
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_all_notes` stops, when asked to cancel."""
+        read_chunk, _ = stages
+        note_type = faker.word()
+        _mock_chunks(mocker, [(note_type, [(note_id, {})]) for note_id in range(5)])
+
+        result = compiler.compile_all_notes(should_cancel=mocker.Mock(side_effect=[False, False, True]))
+
+        assert read_chunk.call_count == 2
+        assert result == CompileResult(written=2, cancelled=True)
+
+    @pytest.mark.parametrize("workers", [2, 3])
+    def test_compile_all_notes_keeps_limited_chunks_in_flight(
+        self,
+        workers: int,
+        compiler: Compiler,
+        mocker: MockerFixture,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+        stages: tuple[MagicMock, MagicMock],
+    ) -> None:
+        """Test that with process pool, chunks are submitted ahead, but not more than twice the workers count."""
+        _, finish_chunk = stages
+        note_type = faker.word()
+        _mock_chunks(mocker, [(note_type, [(note_id, {})]) for note_id in range(10)])
+        mocker.patch("czech_plus.logic.parallel.get_workers_count", return_value=workers)
+        executor = parallel.SerialExecutor()
+        submit = mocker.spy(executor, "submit")
+        mocker.patch("czech_plus.logic.parallel.get_executor", return_value=executor)
+
+        max_in_flight = 0
+
+        def check_in_flight(*_: object, **__: object) -> CompileResult:
+            nonlocal max_in_flight
+            # the chunk being finished right now is still counted as in flight
+            max_in_flight = max(max_in_flight, submit.call_count - finish_chunk.call_count + 1)
+            return CompileResult(written=1)
+
+        finish_chunk.side_effect = check_in_flight
+
+        assert compiler.compile_all_notes() == CompileResult(written=10)
+        assert max_in_flight == workers * 2
+
+    def test_compile_all_notes_falls_back_to_serial(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, stages: tuple[MagicMock, MagicMock]
+    ) -> None:
+        """Test that if a worker process dies, chunks are processed in the main process instead of failing."""
+        note_type = faker.word()
+        _mock_chunks(mocker, [(note_type, [(note_id, {})]) for note_id in range(4)])
+        mocker.patch("czech_plus.logic.parallel.get_workers_count", return_value=2)
+        process_rows = mocker.patch("czech_plus.logic.parallel.process_rows", return_value=[])
+        broken_future: "concurrent.futures.Future[list[parallel.ProcessedRow]]" = concurrent.futures.Future()
+        broken_future.set_exception(concurrent.futures.process.BrokenProcessPool())
+        executor = mocker.MagicMock(spec=concurrent.futures.Executor)
+        executor.__enter__.return_value = executor
+        executor.__exit__.return_value = None
+        executor.submit.side_effect = [broken_future, concurrent.futures.process.BrokenProcessPool()]
+        mocker.patch("czech_plus.logic.parallel.get_executor", return_value=executor)
+
+        assert compiler.compile_all_notes() == CompileResult(written=4)
+        assert executor.submit.call_count == 2
+        assert process_rows.call_count == 4
+
+    def test_compile_notes_writes_processed(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_notes` writes all processed notes at once."""
+        note_type, _ = note_type_and_id
+        notes = [_note_row(faker.unique.pyint(), _content(note_type, faker)) for _ in range(3)]
+        mocker.patch("czech_plus.logic.compiler.Compiler._get_notes", return_value=iter(notes))
+        mocked_process = _mock_process(mocker, note_type)
+        mocked_process.side_effect = str
+        mocked_write = mocker.patch("czech_plus.logic.compiler.Compiler._write_processed")
+
+        compiler.compile_notes(note_type, [note.id for note in notes])
+
+        assert mocked_process.call_count == len(notes)
+        mocked_write.assert_called_once_with(note_type, [(note, str(note.content)) for note in notes])
+
+    def test_compile_notes_skips_failed_note(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that one failed note doesn't stop the chunk."""
+        note_type, _ = note_type_and_id
+        failed = _note_row(faker.unique.pyint(), _content(note_type, faker))
+        ok = _note_row(faker.unique.pyint(), _content(note_type, faker))
+        mocker.patch("czech_plus.logic.compiler.Compiler._get_notes", return_value=iter([failed, ok]))
+        _mock_process(mocker, note_type).side_effect = [Exception, (processed := faker.word())]
+        mocked_write = mocker.patch("czech_plus.logic.compiler.Compiler._write_processed")
+
+        compiler.compile_notes(note_type, [failed.id, ok.id])
+
+        mocked_write.assert_called_once_with(note_type, [(ok, processed)])
+
+    def test_compile_notes_aggregates_problems(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that failed notes and reported problems are logged in one summary."""
+        note_type, _ = note_type_and_id
+        failed_id, ok_id = faker.unique.pyint(), faker.unique.pyint()
+        mocker.patch(
+            "czech_plus.logic.compiler.Compiler._get_notes",
+            return_value=iter([_note_row(failed_id, {}), _note_row(ok_id, _content(note_type, faker))]),
+        )
+
+        def process(content: dict[str, str]) -> str:
+            diagnostics.report("empty field")
+            return t.cast(str, faker.word())
+
+        _mock_process(mocker, note_type).side_effect = process
+        mocker.patch("czech_plus.logic.compiler.Compiler._write_processed")
+        mocked_warning = mocker.patch("czech_plus.logic.diagnostics.logger.warning")
+
+        result = compiler.compile_notes(note_type, [failed_id, ok_id])
+
+        assert result.diagnostics.counts == {"failed to process": 1, "empty field": 1}
+        assert result.diagnostics.samples == {"failed to process": [failed_id], "empty field": [ok_id]}
+        mocked_warning.assert_called_once_with(result.diagnostics.summary())
+
+    def test_compile_notes_doesnt_write_unchanged_notes(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_notes` writes only notes, \
+        whose processed field was actually changed."""
+        note_type, _ = note_type_and_id
+        processed_field_name = compiler._get_dispatch(note_type).processed_field
+        processed = faker.word()
+        unchanged = _note_row(faker.unique.pyint(), _content(note_type, faker, {processed_field_name: processed}))
+        changed = _note_row(faker.unique.pyint(), _content(note_type, faker, {processed_field_name: faker.word()}))
+        failed = _note_row(faker.unique.pyint(), _content(note_type, faker))
+        mocker.patch("czech_plus.logic.compiler.Compiler._get_notes", return_value=iter([unchanged, changed, failed]))
+        _mock_process(mocker, note_type).side_effect = [processed, processed, Exception]
+        mocked_write = mocker.patch("czech_plus.logic.compiler.Compiler._write_processed")
+
+        result = compiler.compile_notes(note_type, [unchanged.id, changed.id, failed.id])
+
+        mocked_write.assert_called_once_with(note_type, [(changed, processed)])
+        assert result == CompileResult(written=1, unchanged=1, failed=1)
+
+    @pytest.mark.parametrize("changed", [True, False])
+    def test_compile_note_doesnt_write_unchanged_note(
+        self, changed: bool, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_note` writes only changed note."""
+        note_type, note_id = note_type_and_id
+        processed_field_name = compiler._get_dispatch(note_type).processed_field
+        processed = faker.word()
+        mocked_note = mocker.patch("anki.notes.Note")
+        mocked_note.return_value.items.return_value = [(processed_field_name, faker.word() if changed else processed)]
+        mocker.patch("czech_plus.logic.processor.process_card", return_value=processed)
+
+        assert compiler.compile_note(note_id, note_type) is changed
+        assert mocked_note.return_value.flush.called is changed
+
+    @pytest.mark.parametrize("changed", [True, False])
+    def test_update_note_changes_note_only_in_memory(
+        self, changed: bool, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.update_note` sets processed field, but doesn't save \
+        the note."""
+        note_type, _ = note_type_and_id
+        processed_field_name = compiler._get_dispatch(note_type).processed_field
+        processed = faker.word()
+        note = mocker.MagicMock()
+        note.items.return_value = [(processed_field_name, faker.word() if changed else processed)]
+        mocker.patch("czech_plus.logic.processor.process_card", return_value=processed)
+
+        assert compiler.update_note(note, note_type) is changed
+
+        assert note.__setitem__.called is changed
+        if changed:
+            note.__setitem__.assert_called_once_with(processed_field_name, processed)
+        note.flush.assert_not_called()
+
+    def test_update_note_uses_cache(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.update_note` processes the same fields only once, \
+        if cache is passed."""
+        note_type, _ = note_type_and_id
+        note = mocker.MagicMock()
+        note_processor = get_processor(note_type)
+        assert note_processor is not None
+        note.items.return_value = [(field_name, faker.word()) for field_name in note_processor.source_fields]
+        process_card = mocker.patch("czech_plus.logic.processor.process_card", return_value=(processed := faker.word()))
+        cache: dict[str, str] = {}
+
+        assert compiler.update_note(note, note_type, cache=cache) is True
+        assert compiler.update_note(note, note_type, cache=cache) is True
+
+        process_card.assert_called_once()
+        assert list(cache.values()) == [processed]
+
+    def test_compile_result_addition(self, faker: Faker) -> None:
+        """Test that :class:`czech_plus.logic.compiler.CompileResult` objects can be summed."""
+        first = CompileResult(written=faker.pyint(), unchanged=faker.pyint(), failed=faker.pyint())
+        second = CompileResult(written=faker.pyint(), unchanged=faker.pyint(), failed=faker.pyint())
+
+        assert first + second == CompileResult(
+            written=first.written + second.written,
+            unchanged=first.unchanged + second.unchanged,
+            failed=first.failed + second.failed,
+        )
+
+    def test_get_notes(
+        self, compiler: Compiler, anki_collection: MagicMock, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._get_notes` maps fields to their names."""
+        note_type, note_id = note_type_and_id
+        note = _note_row(note_id, {"first": faker.word(), "second": faker.word()})
+        anki_collection.models.field_names.return_value = ["first", "second"]
+        anki_collection.db.all.return_value = [_db_row(note)]
+
+        assert list(compiler._get_notes(note_type, [note_id])) == [note]
+        anki_collection.db.all.assert_called_once()
+
+    def test_get_notes_with_invalid_note_type(
+        self, compiler: Compiler, anki_collection: MagicMock, faker: Faker
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._get_notes` raises on unknown note type."""
+        anki_collection.models.by_name.return_value = None
+
+        with pytest.raises(ValueError):
+            list(compiler._get_notes(faker.word(), [faker.pyint()]))
+
+    def test_closed_collection(self, compiler: Compiler, anki_collection: MagicMock) -> None:
+        """Test that reading from closed collection raises a clear error."""
+        anki_collection.db = None
+
+        with pytest.raises(RuntimeError):
+            compiler._count_notes({1: "note type"})
+
+    def test_write_processed(
         self,
         config: Config,
         compiler: Compiler,
         mocker: MockerFixture,
+        anki_collection: MagicMock,
+        faker: Faker,
+        note_type_and_id: tuple[str, int],
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._write_processed` writes in one transaction, \
+        without reading the notes again."""
+        note_type, note_id = note_type_and_id
+        processed_field_name = compiler._get_dispatch(note_type).processed_field
+        note = _note_row(note_id, {"Czech": faker.word(), processed_field_name: faker.word()})
+        anki_collection.weakref.return_value.models.field_map.return_value = {
+            field_name: (index, {}) for index, field_name in enumerate(note.content)
+        }
+        anki_collection.tags.split.side_effect = str.split
+
+        compiler._write_processed(note_type, [(note, (processed := faker.word()))])
+
+        anki_collection.get_note.assert_not_called()
+        anki_collection.update_notes.assert_called_once_with([mocker.ANY], skip_undo_entry=True)
+        (written,), _ = anki_collection.update_notes.call_args
+        written_note = written[0]
+        assert (written_note.id, written_note.guid, written_note.mid, written_note.mod, written_note.usn) == note[:5]
+        assert written_note.tags == ["tag"]
+        assert written_note.fields == [note.content["Czech"], processed]
+
+    def test_write_processed_does_nothing_without_notes(
+        self, compiler: Compiler, anki_collection: MagicMock, faker: Faker
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._write_processed` doesn't write empty chunk."""
+        compiler._write_processed(faker.word(), [])
+        anki_collection.update_notes.assert_not_called()
+
+    @pytest.mark.parametrize("same_fingerprint", [True, False])
+    def test_compile_notes_skips_unchanged_notes(
+        self,
+        same_fingerprint: bool,
+        compiler: Compiler,
+        mocker: MockerFixture,
+        faker: Faker,
+        note_type_and_id: tuple[str, int],
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_notes` skips notes, whose fingerprint \
+        is the same as on the last compilation."""
+        note_type, note_id = note_type_and_id
+        content = _content(note_type, faker)
+        note = _note_row(note_id, content)
+        mocker.patch("czech_plus.logic.compiler.Compiler._get_notes", return_value=iter([note]))
+        _mock_process(mocker, note_type).return_value = (processed := faker.word())
+        mocked_write = mocker.patch("czech_plus.logic.compiler.Compiler._write_processed")
+        new_fingerprint = compiler._get_fingerprint(content, note_type)
+
+        fingerprints = mocker.MagicMock(spec=FingerprintStore)
+        fingerprints.get.return_value = new_fingerprint if same_fingerprint else faker.pystr()
+
+        compiler.compile_notes(note_type, [note_id], fingerprints=fingerprints)
+
+        if same_fingerprint:
+            mocked_write.assert_called_once_with(note_type, [])
+            fingerprints.set.assert_not_called()
+        else:
+            mocked_write.assert_called_once_with(note_type, [(note, processed)])
+            processed_field_name = compiler._get_dispatch(note_type).processed_field
+            fingerprints.set.assert_called_once_with(
+                note_id, compiler._get_fingerprint({**content, processed_field_name: processed}, note_type)
+            )
+
+    def test_changed_processed_field_is_not_skipped(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that note is compiled again, if only its processed field was changed outside of the addon."""
+        note_type, note_id = note_type_and_id
+        processed_field_name = compiler._get_dispatch(note_type).processed_field
+        content: dict[str, str] = collections.defaultdict(faker.word)
+        content[processed_field_name] = processed = faker.word()
+        fingerprints = mocker.MagicMock(spec=FingerprintStore)
+        fingerprints.get.return_value = compiler._get_fingerprint(content, note_type)
+
+        content[processed_field_name] = ""
+        chunk = compiler._read_chunk(note_type, [note := _note_row(note_id, content)], fingerprints=fingerprints)
+        rows = [parallel.ProcessedRow(note_id, processed, None)]
+        result = compiler._finish_chunk(chunk, rows, fingerprints=fingerprints)
+
+        assert chunk.to_process == {note_id: note}
+        assert result.written == 1
+        fingerprints.set.assert_called_once_with(note_id, fingerprints.get.return_value)
+
+    def test_compile_notes_saves_fingerprint_of_unchanged_note(
+        self, compiler: Compiler, mocker: MockerFixture, faker: Faker, note_type_and_id: tuple[str, int]
+    ) -> None:
+        """Test that fingerprint is saved even if the note wasn't written, so next time it will be skipped."""
+        note_type, note_id = note_type_and_id
+        processed_field_name = compiler._get_dispatch(note_type).processed_field
+        content = _content(note_type, faker, {processed_field_name: (processed := faker.word())})
+        mocker.patch("czech_plus.logic.compiler.Compiler._get_notes", return_value=iter([_note_row(note_id, content)]))
+        _mock_process(mocker, note_type).return_value = processed
+        mocker.patch("czech_plus.logic.compiler.Compiler._write_processed")
+        fingerprints = mocker.MagicMock(spec=FingerprintStore)
+        fingerprints.get.return_value = None
+
+        assert compiler.compile_notes(note_type, [note_id], fingerprints=fingerprints) == CompileResult(unchanged=1)
+        fingerprints.set.assert_called_once_with(note_id, compiler._get_fingerprint(content, note_type))
+
+    @pytest.mark.parametrize("same_fingerprint", [True, False])
+    def test_compile_note_skips_unchanged_note(
+        self,
+        same_fingerprint: bool,
+        compiler: Compiler,
+        mocker: MockerFixture,
+        faker: Faker,
+        note_type_and_id: tuple[str, int],
+    ) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_note` skips note, if its fingerprint \
+        is the same as on the last compilation."""
+        note_type, note_id = note_type_and_id
+        source_fields = get_processor(note_type).source_fields  # type: ignore[union-attr]
+        content = {field_name: faker.word() for field_name in source_fields}
+        mocked_note = mocker.patch("anki.notes.Note")
+        mocked_note.return_value.items.return_value = content.items()
+        mocker.patch("czech_plus.logic.processor.process_card", return_value=faker.word())
+        new_fingerprint = compiler._get_fingerprint(content, note_type)
+
+        fingerprints = mocker.MagicMock(spec=FingerprintStore)
+        fingerprints.get.return_value = new_fingerprint if same_fingerprint else faker.pystr()
+
+        compiler.compile_note(note_id, note_type, fingerprints=fingerprints)
+
+        if same_fingerprint:
+            mocked_note.return_value.flush.assert_not_called()
+            fingerprints.set.assert_not_called()
+        else:
+            mocked_note.return_value.flush.assert_called_once_with()
+            fingerprints.set.assert_called_once_with(note_id, new_fingerprint)
+
+    def test_compile_note_calls_what_and_how_expected(  # type: ignore[misc] # explicit any
+        self,
+        make_compiler: t.Callable[[], Compiler],
+        mocker: MockerFixture,
         faker: Faker,
         note_type_and_id: tuple[str, int],
         anki_collection: AnkiCollection,
@@ -109,12 +725,14 @@ class TestCompiler:
         """Test that :meth:`czech_plus.logic.compiler.Compiler.compile_note` calls what and how expected."""
         note_type, note_id = note_type_and_id
         processed_field_name = faker.word()
+        config = Config()
         original_note_type_name = {
             config.cards.nouns.note_type_name: "nouns",
             config.cards.verbs.note_type_name: "verbs",
             config.cards.adjectives.note_type_name: "adjectives",
         }[note_type]
         mock_config(f"cards.{original_note_type_name}.fields.processed", processed_field_name)
+        compiler = make_compiler()
 
         mocked_note = mocker.patch("anki.notes.Note")
         mocked_process_card = mocker.patch(
@@ -128,27 +746,63 @@ class TestCompiler:
         mocked_note.return_value.__setitem__.assert_called_once_with(processed_field_name, processed)
         mocked_note.return_value.flush.assert_called_once_with()
 
-    def test_get_notes_ids(
-        self, compiler: Compiler, anki_collection: MagicMock, mock_config: t.Callable[[str, _T], _T], faker: Faker
+    def test_get_note_types(
+        self,
+        make_compiler: t.Callable[[], Compiler],
+        anki_collection: MagicMock,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
     ) -> None:
-        """Test that :meth:`czech_plus.logic.compiler.Compiler._get_notes_ids` returns what expected."""
-        nouns_note_type_name, noun_id = mock_config("cards.nouns.note_type_name", faker.word()), faker.pyint()
-        verbs_note_type_name, verb_id = mock_config("cards.verbs.note_type_name", faker.word()), faker.pyint()
-        adjectives_note_type_name, adjective_id = (
-            mock_config("cards.adjectives.note_type_name", faker.word()),
-            faker.pyint(),
-        )
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._get_note_types` returns IDs of configured \
+        note types."""
+        nouns_note_type_name = mock_config("cards.nouns.note_type_name", faker.unique.word())
+        verbs_note_type_name = mock_config("cards.verbs.note_type_name", faker.unique.word())
+        adjectives_note_type_name = mock_config("cards.adjectives.note_type_name", faker.unique.word())
+        compiler = make_compiler()
+        anki_collection.models.id_for_name.side_effect = {
+            nouns_note_type_name: 1,
+            verbs_note_type_name: 2,
+            adjectives_note_type_name: 3,
+        }.get
 
-        anki_collection.models.nids.return_value = [faker.pyint() for _ in range(3)]
-        anki_collection.models.id_for_name.side_effect = lambda name: name
-        anki_collection.models.nids.side_effect = lambda name: {
-            nouns_note_type_name: [noun_id],
-            verbs_note_type_name: [verb_id],
-            adjectives_note_type_name: [adjective_id],
-        }[name]
-
-        assert compiler._get_notes_ids() == [
-            (noun_id, nouns_note_type_name),
-            (verb_id, verbs_note_type_name),
-            (adjective_id, adjectives_note_type_name),
-        ]
+        assert compiler._get_note_types() == {
+            1: nouns_note_type_name,
+            2: verbs_note_type_name,
+            3: adjectives_note_type_name,
+        }
+
+    def test_get_note_types_skips_missing_note_type(
+        self,
+        make_compiler: t.Callable[[], Compiler],
+        anki_collection: MagicMock,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+    ) -> None:
+        """Test that missing note type is skipped instead of failing the whole compilation."""
+        verbs_note_type_name = mock_config("cards.verbs.note_type_name", faker.unique.word())
+        compiler = make_compiler()
+        anki_collection.models.id_for_name.side_effect = {verbs_note_type_name: 2}.get
+
+        assert compiler._get_note_types() == {2: verbs_note_type_name}
+
+    def test_get_note_types_only(
+        self,
+        make_compiler: t.Callable[[], Compiler],
+        anki_collection: MagicMock,
+        mock_config: t.Callable[[str, _T], _T],
+        faker: Faker,
+    ) -> None:
+        """Test that only requested note types are returned."""
+        nouns_note_type_name = mock_config("cards.nouns.note_type_name", faker.unique.word())
+        verbs_note_type_name = mock_config("cards.verbs.note_type_name", faker.unique.word())
+        compiler = make_compiler()
+        anki_collection.models.id_for_name.side_effect = {nouns_note_type_name: 1, verbs_note_type_name: 2}.get
+
+        assert compiler._get_note_types(only=[verbs_note_type_name]) == {2: verbs_note_type_name}
+
+    def test_count_notes(self, compiler: Compiler, anki_collection: MagicMock, faker: Faker) -> None:
+        """Test that :meth:`czech_plus.logic.compiler.Compiler._count_notes` counts notes with one query."""
+        anki_collection.db.scalar.return_value = count = faker.pyint()
+
+        assert compiler._count_notes({1: faker.word(), 2: faker.word()}) == count
+        assert "(1,2)" in anki_collection.db.scalar.call_args.args[0]
@@ -0,0 +1,119 @@
+"""Tests for :mod:`czech_plus.logic.diagnostics` module."""
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus.logic import diagnostics
+from czech_plus.logic.diagnostics import Diagnostics
+
+
+class TestDiagnostics:
+    """Tests for :class:`czech_plus.logic.diagnostics.Diagnostics` class."""
+
+    def test_add_counts_by_category(self, faker: Faker) -> None:
+        """Test that problems are counted by category, and only the first details are kept."""
+        result = Diagnostics()
+        category = faker.word()
+        first_id, second_id = faker.unique.pyint(), faker.unique.pyint()
+
+        result.add(category, first_id, "first")
+        result.add(category, second_id, "second")
+
+        assert result.counts == {category: 2}
+        assert result.samples == {category: [first_id, second_id]}
+        assert result.details == {category: "first"}
+
+    def test_samples_are_bounded(self, faker: Faker) -> None:
+        """Test that only :data:`czech_plus.logic.diagnostics.SAMPLE_SIZE` note IDs are kept."""
+        result = Diagnostics()
+        category = faker.word()
+
+        for note_id in range(diagnostics.SAMPLE_SIZE * 2):
+            result.add(category, note_id)
+
+        assert result.counts[category] == diagnostics.SAMPLE_SIZE * 2
+        assert result.samples[category] == list(range(diagnostics.SAMPLE_SIZE))
+
+    def test_addition(self, faker: Faker) -> None:
+        """Test that two objects can be summed, without changing them."""
+        category = faker.word()
+        first, second = Diagnostics(), Diagnostics()
+        first.add(category, 1)
+        second.add(category, 2, "error")
+        second.add(other_category := faker.unique.word(), 3)
+
+        result = first + second
+
+        assert result.counts == {category: 2, other_category: 1}
+        assert result.samples == {category: [1, 2], other_category: [3]}
+        assert result.details == {category: "error"}
+        assert first.counts == {category: 1}
+
+    def test_addition_keeps_samples_bounded(self, faker: Faker) -> None:
+        """Test that summing doesn't keep more than :data:`czech_plus.logic.diagnostics.SAMPLE_SIZE` note IDs."""
+        category = faker.word()
+        first, second = Diagnostics(), Diagnostics()
+        for note_id in range(diagnostics.SAMPLE_SIZE):
+            first.add(category, note_id)
+            second.add(category, note_id + diagnostics.SAMPLE_SIZE)
+
+        assert (first + second).samples[category] == list(range(diagnostics.SAMPLE_SIZE))
+
+    def test_summary(self) -> None:
+        """Test that summary contains every category, its count, examples and the first error."""
+        result = Diagnostics()
+        result.add("failed", 1, "ValueError: oops")
+        for note_id in range(diagnostics.SAMPLE_SIZE + 1):
+            result.add("empty field", note_id)
+
+        assert result.summary() == "\n".join(
+            [
+                f"Found problems in {diagnostics.SAMPLE_SIZE + 2} notes:",
+                f"- empty field: {diagnostics.SAMPLE_SIZE + 1} notes (e.g. 0, 1, 2, 3, 4, ...)",
+                "- failed: 1 notes (e.g. 1)",
+                "  first error: ValueError: oops",
+            ]
+        )
+
+    def test_log_summary_only_with_problems(self, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that nothing is logged, if there are no problems."""
+        mocked_warning = mocker.patch("czech_plus.logic.diagnostics.logger.warning")
+        result = Diagnostics()
+
+        result.log_summary()
+        mocked_warning.assert_not_called()
+
+        result.add(faker.word(), faker.pyint())
+        result.log_summary()
+        mocked_warning.assert_called_once_with(result.summary())
+
+
+class TestReport:
+    """Tests for :func:`czech_plus.logic.diagnostics.report` and :func:`czech_plus.logic.diagnostics.capture`."""
+
+    def test_captured(self, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that reported problems are captured instead of being logged."""
+        mocked_warning = mocker.patch("czech_plus.logic.diagnostics.logger.warning")
+
+        with diagnostics.capture() as issues:
+            diagnostics.report(category := faker.word(), "details")
+
+        assert issues == [(category, "details")]
+        mocked_warning.assert_not_called()
+
+    def test_logged_without_capture(self, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that problem is logged right away, if it isn't captured."""
+        mocked_warning = mocker.patch("czech_plus.logic.diagnostics.logger.warning")
+
+        diagnostics.report(faker.word())
+
+        mocked_warning.assert_called_once()
+
+    def test_nested_capture(self, faker: Faker) -> None:
+        """Test that outer capture is restored after the inner one."""
+        with diagnostics.capture() as outer:
+            with diagnostics.capture() as inner:
+                diagnostics.report(inner_category := faker.word())
+            diagnostics.report(outer_category := faker.word())
+
+        assert inner == [(inner_category, None)]
+        assert outer == [(outer_category, None)]
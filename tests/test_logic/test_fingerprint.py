@@ -0,0 +1,86 @@
+"""Tests :mod:`czech_plus.logic.fingerprint`."""
+import pathlib
+
+import pytest
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus.config import NounCardsSettings, VerbCardsSettings
+from czech_plus.logic.fingerprint import FingerprintStore, fingerprint
+
+
+class TestFingerprint:
+    """Tests :func:`czech_plus.logic.fingerprint.fingerprint`."""
+
+    def test_same_input_gives_same_fingerprint(self, faker: Faker) -> None:
+        """Test that fingerprint is deterministic."""
+        fields = [faker.word(), faker.word()]
+        assert fingerprint(NounCardsSettings(), fields) == fingerprint(NounCardsSettings(), list(fields))
+
+    def test_changed_field_changes_fingerprint(self, faker: Faker) -> None:
+        """Test that fingerprint changes, if any field was changed."""
+        word = faker.word()
+        assert fingerprint(NounCardsSettings(), [word, "M"]) != fingerprint(NounCardsSettings(), [word, "F"])
+
+    def test_fields_boundaries_are_included(self) -> None:
+        """Test that moving text between fields changes the fingerprint."""
+        assert fingerprint(NounCardsSettings(), ["ab", "c"]) != fingerprint(NounCardsSettings(), ["a", "bc"])
+
+    def test_settings_change_fingerprint(self, faker: Faker) -> None:
+        """Test that fingerprint changes, if note type settings were changed."""
+        fields = [faker.word(), faker.word()]
+        assert fingerprint(NounCardsSettings(), fields) != fingerprint(VerbCardsSettings(), fields)
+
+    def test_processor_version_changes_fingerprint(self, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that fingerprint changes, if processor version was bumped."""
+        fields = [faker.word(), faker.word()]
+        old = fingerprint(NounCardsSettings(), fields)
+
+        mocker.patch("czech_plus.logic.fingerprint.PROCESSOR_VERSION", -1)
+        assert fingerprint(NounCardsSettings(), fields) != old
+
+
+class TestFingerprintStore:
+    """Tests :class:`czech_plus.logic.fingerprint.FingerprintStore`."""
+
+    def test_get_returns_none_for_unknown_note(self, faker: Faker) -> None:
+        """Test that :meth:`~czech_plus.logic.fingerprint.FingerprintStore.get` returns :obj:`None`."""
+        with FingerprintStore(faker.file_path()) as store:
+            assert store.get(faker.pyint()) is None
+
+    def test_fingerprints_are_persistent(self, faker: Faker) -> None:
+        """Test that fingerprints are saved to the disk."""
+        collection, note_id, value = faker.file_path(), faker.pyint(), faker.pystr()
+        with FingerprintStore(collection) as store:
+            store.set(note_id, value)
+
+        with FingerprintStore(collection) as store:
+            assert store.get(note_id) == value
+
+    def test_fingerprints_are_separated_by_collection(self, faker: Faker) -> None:
+        """Test that fingerprints from one collection aren't visible in another."""
+        note_id = faker.pyint()
+        with FingerprintStore("first") as store:
+            store.set(note_id, faker.pystr())
+
+        with FingerprintStore("second") as store:
+            assert store.get(note_id) is None
+
+    def test_default_path_is_in_user_files(self, user_files_dir: pathlib.Path, faker: Faker) -> None:
+        """Test that database is created inside ``user_files`` folder."""
+        with FingerprintStore(faker.file_path()):
+            pass
+        assert (user_files_dir / "fingerprints.sqlite3").exists()
+
+    @pytest.mark.parametrize("times", [1, 2])
+    def test_save_is_idempotent(self, times: int, faker: Faker) -> None:
+        """Test that saving few times doesn't break anything."""
+        collection, note_id, value = faker.file_path(), faker.pyint(), faker.pystr()
+        store = FingerprintStore(collection)
+        store.set(note_id, value)
+        for _ in range(times):
+            store.save()
+        store.close()
+
+        with FingerprintStore(collection) as store:
+            assert store.get(note_id) == value
@@ -1,4 +1,6 @@
 """Tests for lexer (:mod:`czech_plus.logic.lexer` package)."""
+import dataclasses
+import pickle
 import typing as t
 
 import pytest
@@ -171,6 +173,7 @@ def test_with_examples(
             parsed_output = output
 
         assert parsed_output == list(class_to_test().lex(input))
+        assert parsed_output == list(class_to_test().lex_fast(input))
 
 
 @pytest.mark.parametrize(
@@ -208,3 +211,174 @@ def test_with_unsupported_examples(
     """
     for class_to_test in classes_to_test:
         assert list(class_to_test().lex(input)) != output
+
+
+@pytest.mark.parametrize("class_to_test", _ANY_LEXER)
+def test_lex_fast_is_the_same_as_lex(class_to_test: type[lexer.BaseLexer], faker: Faker) -> None:
+    """:meth:`~czech_plus.logic.lexer.BaseLexer.lex_fast` must give exactly the same result, even on garbage."""
+    symbols = "ab ,.\\!_[]"
+    for _ in range(2000):
+        input = "".join(faker.random_choices(symbols, length=faker.pyint(0, 20)))
+        assert list(class_to_test().lex_fast(input)) == list(class_to_test().lex(input)), input
+
+
+@pytest.mark.parametrize("class_to_test", _ANY_LEXER)
+def test_lex_fast_caches_table(class_to_test: type[lexer.BaseLexer]) -> None:
+    """Table for :meth:`~czech_plus.logic.lexer.BaseLexer.lex_fast` is compiled only once per class."""
+    assert class_to_test._get_fast_table() is class_to_test._get_fast_table()
+
+
+class TestHooks:
+    """Tests for hook tables and :meth:`~czech_plus.logic.lexer.BaseLexer.register_hook`."""
+
+    @pytest.fixture()
+    def lexer_class(self) -> type[lexer.BaseLexer]:
+        """Fresh lexer class, so registered hooks don't leak into other tests."""
+
+        class _Lexer(lexer.NounLexer):
+            pass
+
+        return _Lexer
+
+    @staticmethod
+    def _comment(_: lexer.BaseLexer) -> t.Generator[t.Any, t.Any, None]:  # type: ignore[misc] # Explicit "Any"
+        """Hook, that skips everything until the end of input."""
+        while (yield) is not None:
+            pass
+        yield tokens.SkipToken(), False, False
+
+    @pytest.mark.parametrize("class_to_test", _ANY_LEXER)
+    def test_table_is_cached(self, class_to_test: type[lexer.BaseLexer]) -> None:
+        """Hook table is built only once per class."""
+        table = class_to_test._get_hook_table()
+
+        assert class_to_test._get_hook_table() is table
+        assert table.symbols == frozenset(table.hooks)
+
+    def test_register_hook(self, lexer_class: type[lexer.BaseLexer], faker: Faker) -> None:
+        """Registered hook is used by both engines."""
+        word = faker.word()
+        lexer_class.register_hook("#", self._comment)
+
+        assert list(lexer_class().lex(f"{word}#, ignored")) == [word, tokens.SkipToken()]
+        assert list(lexer_class().lex_fast(f"{word}#, ignored")) == [word, tokens.SkipToken()]
+        assert list(lexer.NounLexer().lex(f"{word}#")) == [f"{word}#"]
+
+    def test_register_hook_is_inherited(self, lexer_class: type[lexer.BaseLexer]) -> None:
+        """Subclasses see hooks of their parents, even if registered after the table was built."""
+
+        class _Child(lexer_class):  # type: ignore[valid-type,misc]
+            pass
+
+        assert "#" not in _Child._get_hook_table().symbols
+        lexer_class.register_hook("#", self._comment)
+
+        assert _Child._get_hook_table().hooks["#"] is self._comment
+
+    def test_register_hook_overrides_default(self, lexer_class: type[lexer.BaseLexer], faker: Faker) -> None:
+        """Registered hook wins over the default one for the same symbol."""
+        word = faker.word()
+        lexer_class.register_hook(",", self._comment)
+
+        assert list(lexer_class().lex_fast(f"{word}, {word}")) == [word, tokens.SkipToken()]
+
+    @pytest.mark.parametrize("symbol", ["", "##", "ab"])
+    def test_register_hook_rejects_invalid_symbol(self, symbol: str, lexer_class: type[lexer.BaseLexer]) -> None:
+        """Hook symbol must be exactly one symbol, otherwise nothing is registered."""
+        with pytest.raises(ValueError, match="exactly one symbol"):
+            lexer_class.register_hook(symbol, self._comment)
+
+        assert symbol not in lexer_class._get_hook_table().hooks
+
+
+class TestSpans:
+    """Tests for :meth:`~czech_plus.logic.lexer.BaseLexer.lex_spans`."""
+
+    @pytest.mark.parametrize("class_to_test", _ANY_LEXER)
+    def test_spans_are_the_same_as_tokens(self, class_to_test: type[lexer.BaseLexer], faker: Faker) -> None:
+        """Spans, converted to tokens, are exactly the same as tokens from the old engine."""
+        symbols = "ab ,.\\!_[]"
+        for _ in range(500):
+            input = "".join(faker.random_choices(symbols, length=faker.pyint(0, 20)))
+            spans = list(class_to_test().lex_spans(input))
+
+            assert [span.to_token(input) for span in spans] == list(class_to_test().lex(input)), input
+            assert all(0 <= span.start <= span.end <= len(input) for span in spans), input
+
+    def test_offsets(self) -> None:
+        """Spans point to the right places in the source string."""
+        input = "dělat [udělat], !kam?. _"
+
+        assert list(lexer.VerbLexer().lex_spans(input)) == [
+            tokens.Span(tokens.TokenKind.TEXT, 0, 5),
+            tokens.Span(tokens.TokenKind.FUTURE_FORM_START, 6, 7),
+            tokens.Span(tokens.TokenKind.TEXT, 7, 13),
+            tokens.Span(tokens.TokenKind.FUTURE_FORM_END, 13, 14),
+            tokens.Span(tokens.TokenKind.ADDITIONAL_SEPARATOR, 14, 15),
+            tokens.Span(tokens.TokenKind.ESCAPED, 17, 21),
+            tokens.Span(tokens.TokenKind.SEPARATOR, 21, 22),
+            tokens.Span(tokens.TokenKind.SKIP, 23, 24),
+        ]
+
+    def test_text(self, faker: Faker) -> None:
+        """:meth:`~czech_plus.logic.lexer.tokens.Span.text` returns the referred part of the source."""
+        word = faker.word()
+        input = f"!{word}, x"
+
+        assert [span.text(input) for span in lexer.NounLexer().lex_spans(input)] == [word, ",", "x"]
+
+    def test_custom_hooks(self) -> None:
+        """Span-based lexing doesn't support custom hooks."""
+
+        class _Lexer(lexer.NounLexer):
+            pass
+
+        _Lexer.register_hook("#", TestHooks._comment)
+
+        with pytest.raises(TypeError):
+            list(_Lexer().lex_spans("#"))
+
+
+class TestTokens:
+    """Tests for :mod:`czech_plus.logic.lexer.tokens`."""
+
+    @pytest.mark.parametrize(
+        "token_class",
+        [
+            tokens.SeparatorToken,
+            tokens.AdditionalSeparatorToken,
+            tokens.SkipToken,
+            tokens.FutureFormTokenStart,
+            tokens.FutureFormTokenEnd,
+        ],
+    )
+    def test_singleton(self, token_class: type[tokens.BaseToken]) -> None:
+        """Tokens without data are singletons, even after pickling."""
+        token = token_class()
+
+        assert token is token_class()
+        assert pickle.loads(pickle.dumps(token)) is token
+        assert tokens.kind_of(token) is token_class.kind
+        assert not hasattr(token, "__dict__")
+
+    def test_different_singletons(self) -> None:
+        """Every token class has its own instance."""
+        start: tokens.BaseToken = tokens.FutureFormTokenStart()
+
+        assert start is not tokens.FutureFormTokenEnd()
+        assert start != tokens.FutureFormTokenEnd()
+
+    def test_escaped_token(self, faker: Faker) -> None:
+        """Escaped token is frozen, compared by value and can be pickled."""
+        token = tokens.EscapedToken(word := faker.word())
+
+        assert token == tokens.EscapedToken(word)
+        assert hash(token) == hash(tokens.EscapedToken(word))
+        assert pickle.loads(pickle.dumps(token)) == token
+        assert tokens.kind_of(token) is tokens.TokenKind.ESCAPED
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            token.content = faker.word()  # type: ignore[misc] # frozen
+
+    def test_kind_of_string(self, faker: Faker) -> None:
+        """Strings are :attr:`~czech_plus.logic.lexer.tokens.TokenKind.TEXT`."""
+        assert tokens.kind_of(faker.word()) is tokens.TokenKind.TEXT
@@ -0,0 +1,106 @@
+"""Tests for :mod:`czech_plus.logic.metrics` module."""
+import json
+import pathlib
+import typing as t
+
+import pytest
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus.logic import metrics
+from czech_plus.logic.processor import PROCESSOR_VERSION
+
+_T = t.TypeVar("_T")
+
+
+class TestMetricsRecorder:
+    """Tests for :class:`czech_plus.logic.metrics.MetricsRecorder` class."""
+
+    def test_phase_adds_time(self, mocker: MockerFixture) -> None:
+        """Test that time of ``with`` block is added to the phase."""
+        mocker.patch("time.perf_counter", side_effect=[0.0, 1.0, 3.0, 10.0])
+        recorder = metrics.MetricsRecorder()
+
+        with recorder.phase("load"):
+            pass
+        recorder.add_time("load", 0.5)
+
+        result = recorder.finish()
+        assert result.phases["load"] == 2.5
+        assert result.elapsed == 10.0
+
+    def test_keeps_only_slowest_notes(self, faker: Faker) -> None:
+        """Test that only the slowest notes are kept, the slowest first."""
+        recorder = metrics.MetricsRecorder()
+        note_type = faker.word()
+        for note_id in range(metrics.SLOWEST_NOTES_COUNT * 2):
+            recorder.add_note(note_id, note_type, note_id / 100)
+
+        result = recorder.finish()
+
+        assert [note.note_id for note in result.slowest_notes] == list(
+            reversed(range(metrics.SLOWEST_NOTES_COUNT, metrics.SLOWEST_NOTES_COUNT * 2))
+        )
+        assert result.note_types == {note_type: metrics.SLOWEST_NOTES_COUNT * 2}
+
+    def test_counts_notes(self) -> None:
+        """Test that notes count is summed."""
+        recorder = metrics.MetricsRecorder()
+        recorder.add_notes(2)
+        recorder.add_notes(3)
+
+        assert recorder.finish().notes_count == 5
+
+
+class TestCompileMetrics:
+    """Tests for :class:`czech_plus.logic.metrics.CompileMetrics` class."""
+
+    @pytest.mark.parametrize("elapsed,expected", [(2.0, 5.0), (0.0, 0.0)])
+    def test_notes_per_second(self, elapsed: float, expected: float) -> None:
+        """Test that notes per second don't fail on empty run."""
+        assert metrics.CompileMetrics(elapsed=elapsed, notes_count=10).notes_per_second == expected
+
+    def test_write(self, tmp_path: pathlib.Path, faker: Faker) -> None:
+        """Test that metrics are written as JSON."""
+        compile_metrics = metrics.CompileMetrics(
+            elapsed=1.0,
+            notes_count=3,
+            note_types={"noun": 3},
+            slowest_notes=[metrics.NoteTiming(1, "noun", 0.5)],
+        )
+
+        path = compile_metrics.write(tmp_path / "metrics.json")
+
+        written = json.loads(path.read_text(encoding="utf8"))
+        assert written["processor_version"] == PROCESSOR_VERSION
+        assert written["notes_per_second"] == 3.0
+        assert written["phases"] == dict.fromkeys(metrics.PHASES, 0.0)
+        assert written["slowest_notes"] == [{"note_id": 1, "note_type": "noun", "seconds": 0.5}]
+
+    def test_write_near_config_by_default(self, tmp_path: pathlib.Path, mocker: MockerFixture) -> None:
+        """Test that metrics are written near ``config.json`` by default."""
+        mocker.patch("czech_plus.config.BASE_DIR", tmp_path)
+
+        assert metrics.CompileMetrics().write() == tmp_path / "compile_metrics.json"
+
+
+def test_timed_measures_every_item(mocker: MockerFixture) -> None:
+    """Test that :func:`czech_plus.logic.metrics.timed` measures getting of every item."""
+    mocker.patch("time.perf_counter", side_effect=[0.0, 1.0, 1.0, 3.0, 3.0, 6.0])
+    on_time = mocker.stub()
+
+    assert list(metrics.timed(iter(["a", "b"]), on_time)) == ["a", "b"]
+    assert on_time.call_args_list == [mocker.call(1.0), mocker.call(2.0), mocker.call(3.0)]
+
+
+@pytest.mark.parametrize("write_metrics", [True, False])
+def test_processors_report_lexing_time(write_metrics: bool, mock_config: t.Callable[[str, _T], _T]) -> None:
+    """Test that time of lexers, consumed by processors, is counted only if metrics are written."""
+    from czech_plus.logic.processor.implementations.noun import NounProcessor
+
+    mock_config("compiler.write_metrics", write_metrics)
+    processor = NounProcessor()
+    before = metrics.lexing_clock.total
+    list(processor._navigate_over(iter(["a", "b"])))
+
+    assert (metrics.lexing_clock.total > before) is write_metrics
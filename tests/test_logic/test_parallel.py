@@ -0,0 +1,235 @@
+"""Tests for :mod:`czech_plus.logic.parallel` module."""
+import concurrent.futures
+import subprocess
+import sys
+import typing as t
+from unittest.mock import MagicMock
+
+import pytest
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus import config as config_module
+from czech_plus.logic import diagnostics, metrics, parallel
+from tests import factories
+
+_T = t.TypeVar("_T")
+
+
+class TestProcessRows:
+    """Tests for :func:`czech_plus.logic.parallel.process_rows` function."""
+
+    @pytest.fixture
+    def field(self, mocker: MockerFixture, faker: Faker) -> str:
+        """Fixture for the only source field of the mocked processor."""
+        dispatch = mocker.patch("czech_plus.logic.processor.get_dispatch").return_value
+        field: str = faker.word()
+        dispatch.processor.source_fields = (field,)
+        return field
+
+    @staticmethod
+    def _mock_process_many(mocker: MockerFixture, results: t.Iterable[t.Union[str, Exception]]) -> MagicMock:
+        """Mock :func:`czech_plus.logic.processor.process_many`, so it produces ``results``."""
+        return mocker.patch(
+            "czech_plus.logic.processor.process_many", side_effect=lambda *_: (result for result in results)
+        )
+
+    def test_returns_processed_rows(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that all rows are processed in one batch and returned in the same order."""
+        process_many = self._mock_process_many(mocker, processed := [faker.word(), faker.word()])
+        rows = [(1, {field: faker.word()}), (2, {field: faker.word()})]
+        note_type = faker.word()
+
+        result = parallel.process_rows(note_type, rows)
+
+        assert [row[:3] for row in result] == [(1, processed[0], None), (2, processed[1], None)]
+        assert all(row.elapsed >= row.lexing >= 0 for row in result)
+        process_many.assert_called_once_with(note_type, mocker.ANY)
+        assert list(process_many.call_args.args[1]) == [[rows[0][1][field]], [rows[1][1][field]]]
+
+    def test_closes_batch(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that the batch is closed, so new results are written to the processed cache."""
+        closed = []
+
+        def process_many(*_: object) -> t.Iterator[str]:
+            try:
+                yield faker.word()
+            finally:
+                closed.append(True)
+
+        mocker.patch("czech_plus.logic.processor.process_many", side_effect=process_many)
+
+        parallel.process_rows(faker.word(), [(1, {field: faker.word()})])
+
+        assert closed == [True]
+
+    def test_missing_field(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that row without a source field fails and isn't processed."""
+        process_many = self._mock_process_many(mocker, [processed := faker.word()])
+        mocker.patch("czech_plus.logic.diagnostics.tracebacks_enabled", return_value=False)
+
+        failed, succeeded = parallel.process_rows(faker.word(), [(1, {}), (2, {field: faker.word()})])
+
+        assert failed.error == f"KeyError: {field!r}"
+        assert succeeded[:3] == (2, processed, None)
+        assert len(list(process_many.call_args.args[1])) == 1
+
+    def test_failure_does_not_stop_processing(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that failed row is returned as error and doesn't affect other rows."""
+        self._mock_process_many(mocker, [Exception("some error"), processed := faker.word()])
+        mocker.patch("czech_plus.logic.diagnostics.tracebacks_enabled", return_value=True)
+
+        failed, succeeded = parallel.process_rows(faker.word(), [(1, {field: ""}), (2, {field: ""})])
+
+        assert failed.note_id == 1
+        assert failed.processed is None
+        assert failed.error is not None and "Traceback" in failed.error
+        assert succeeded[:3] == (2, processed, None)
+
+    def test_invalid_note_type(self, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that every row fails, if processor for the note type wasn't found."""
+        mocker.patch("czech_plus.logic.processor.get_dispatch", return_value=None)
+        mocker.patch("czech_plus.logic.processor.process_many", return_value=None)
+        mocker.patch("czech_plus.logic.diagnostics.tracebacks_enabled", return_value=False)
+
+        rows = parallel.process_rows(note_type := faker.word(), [(1, {}), (2, {})])
+
+        assert [row.error for row in rows] == [
+            f"ValueError: You specified invalid note type name in config - {note_type!r}"
+        ] * 2
+
+    def test_short_error_without_tracebacks(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that only type and message of the exception are kept, if tracebacks are disabled."""
+        self._mock_process_many(mocker, [ValueError("some error")])
+        mocker.patch("czech_plus.logic.diagnostics.tracebacks_enabled", return_value=False)
+
+        (failed,) = parallel.process_rows(faker.word(), [(1, {field: ""})])
+
+        assert failed.error == "ValueError: some error"
+
+    def test_captures_issues(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that problems, reported while processing the note, are returned with the row."""
+
+        def process_many(*_: object) -> t.Iterator[str]:
+            diagnostics.report("first")
+            diagnostics.report("second")
+            yield faker.word()
+            yield faker.word()
+
+        mocker.patch("czech_plus.logic.processor.process_many", side_effect=process_many)
+
+        first, second = parallel.process_rows(faker.word(), [(1, {field: ""}), (2, {field: ""})])
+
+        assert first.issues == (("first", None), ("second", None))
+        assert second.issues == ()
+
+    def test_measures_lexing(self, field: str, mocker: MockerFixture, faker: Faker) -> None:
+        """Test that time, spent in lexers while processing the note, is returned separately."""
+
+        def process_many(*_: object) -> t.Iterator[str]:
+            metrics.lexing_clock.add(1.0)
+            yield faker.word()
+
+        mocker.patch("czech_plus.logic.processor.process_many", side_effect=process_many)
+
+        (row,) = parallel.process_rows(faker.word(), [(1, {field: ""})])
+
+        assert row.lexing == 1.0
+
+
+class TestSerialExecutor:
+    """Tests for :class:`czech_plus.logic.parallel.SerialExecutor` class."""
+
+    def test_returns_finished_future(self, mocker: MockerFixture) -> None:
+        """Test that function is called right away."""
+        function = mocker.Mock(return_value=(result := mocker.Mock()))
+
+        future = parallel.SerialExecutor().submit(function, 1, key=2)
+
+        function.assert_called_once_with(1, key=2)
+        assert future.done()
+        assert future.result() is result
+
+    def test_stores_exception_in_future(self) -> None:
+        """Test that exception is raised only when getting result."""
+
+        def fail() -> None:
+            raise ValueError
+
+        future = parallel.SerialExecutor().submit(fail)
+
+        with pytest.raises(ValueError):
+            future.result()
+
+
+class TestWorkers:
+    """Tests for choosing how notes are processed."""
+
+    @pytest.mark.parametrize(
+        "processes,threshold,notes_count,expected",
+        [(4, 10, 9, 1), (4, 10, 10, 4), (1, 0, 100, 1), (4, 0, 0, 4)],
+    )
+    def test_get_workers_count(
+        self,
+        processes: int,
+        threshold: int,
+        notes_count: int,
+        expected: int,
+        mock_config: t.Callable[[str, _T], _T],
+    ) -> None:
+        """Test that parallel processing is used only if there are enough notes."""
+        mock_config("compiler.processes", processes)
+        mock_config("compiler.parallel_threshold", threshold)
+
+        assert parallel.get_workers_count(notes_count) == expected
+
+    def test_get_workers_count_uses_cpu_count(
+        self, mocker: MockerFixture, mock_config: t.Callable[[str, _T], _T]
+    ) -> None:
+        """Test that ``0`` processes means CPU count."""
+        mock_config("compiler.processes", 0)
+        mock_config("compiler.parallel_threshold", 0)
+        mocker.patch("os.cpu_count", return_value=16)
+
+        assert parallel.get_workers_count(1) == 16
+
+    def test_get_executor_is_serial_for_one_worker(self) -> None:
+        """Test that no processes are started, if parallel processing is disabled."""
+        assert isinstance(parallel.get_executor(1), parallel.SerialExecutor)
+
+    def test_get_executor_is_process_pool_for_many_workers(self) -> None:
+        """Test that process pool is created for many workers."""
+        executor = parallel.get_executor(2)
+        try:
+            assert isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+        finally:
+            executor.shutdown()
+
+    def test_init_worker_installs_config(self, mocker: MockerFixture) -> None:
+        """Test that worker uses config, passed from the main process."""
+        original = config_module.Config._instances.pop(config_module.Config, None)
+        mocker.patch("czech_plus.utils.setup_logging")
+        custom_cfg = factories.ConfigFactory()
+        config_module.Config._instances.pop(config_module.Config)
+        try:
+            parallel._init_worker(custom_cfg.as_dict())
+
+            assert config_module.Config() == custom_cfg
+        finally:
+            config_module.Config._instances.pop(config_module.Config, None)
+            if original is not None:
+                config_module.Config._instances[config_module.Config] = original
+
+    def test_worker_does_not_import_anki_gui(self) -> None:
+        """Test that worker process doesn't import ``aqt`` (and Qt with it) or processors before they are needed."""
+        code = (
+            "import sys; from czech_plus.logic import parallel; "
+            "modules = {'aqt', 'czech_plus.hooks', 'czech_plus.logic.processor.implementations'}; "
+            "print(sorted(modules & set(sys.modules)))"
+        )
+
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=config_module.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip() == "[]"
@@ -8,8 +8,15 @@ from faker import Faker
 from pytest_mock import MockerFixture
 
 from czech_plus import models
-from czech_plus.logic.lexer import tokens
-from czech_plus.logic.processor import get_processor, process_card
+from czech_plus.config import _CONFIG_AS_DICT, Config
+from czech_plus.logic import diagnostics
+from czech_plus.logic.lexer import VerbLexer, tokens
+from czech_plus.logic.processor import (
+    get_dispatch,
+    get_processor,
+    process_card,
+    process_many,
+)
 from czech_plus.logic.processor.implementations.adjective import (
     AdjectiveProcessor,
 )
@@ -17,6 +24,7 @@ from czech_plus.logic.processor.implementations.base import BaseProcessor
 from czech_plus.logic.processor.implementations.noun import NounProcessor
 from czech_plus.logic.processor.implementations.verb import VerbProcessor
 
+_T = t.TypeVar("_T")
 _GENERATOR: te.TypeAlias = t.Iterator[t.Union[str, tokens.BaseToken]]
 
 
@@ -43,18 +51,82 @@ def test_get_processor_not_found(faker: Faker) -> None:
 
 def test_process_card(mocker: MockerFixture, faker: Faker) -> None:
     """Tests :func:`czech_plus.logic.processor.process_card`."""
-    mock_processor = mocker.patch("czech_plus.logic.processor.get_processor")
-    mock_processor.return_value.process.return_value = (value := faker.word())
+    mock_dispatch = mocker.patch("czech_plus.logic.processor.get_dispatch")
+    mock_dispatch.return_value.processor.source_fields = ()
+    mock_dispatch.return_value.processor.process.return_value = (value := faker.word())
     assert process_card({faker.word(): faker.word()}, faker.word()) == value
 
 
 def test_process_card_but_processor_not_found(mocker: MockerFixture, faker: Faker) -> None:
     """Tests :func:`czech_plus.logic.processor.process_card` when processor wasn't found."""
-    mock_processor = mocker.patch("czech_plus.logic.processor.get_processor")
-    mock_processor.return_value.process.return_value = None
+    mocker.patch("czech_plus.logic.processor.get_dispatch", return_value=None)
     assert process_card({faker.word(): faker.word()}, faker.word()) is None
 
 
+@pytest.mark.parametrize("note_type_name", ["nouns", "verbs", "adjectives"])
+def test_get_dispatch(note_type_name: str, mock_config: t.Callable[[str, _T], _T], faker: Faker) -> None:
+    """Test that :func:`czech_plus.logic.processor.get_dispatch` returns the same processor for every note."""
+    mock_config(f"cards.{note_type_name}.note_type_name", (value := faker.word()))
+    settings = getattr(Config().cards, note_type_name)
+
+    dispatch = get_dispatch(value)
+
+    assert dispatch is not None
+    assert dispatch.processed_field == settings.fields.processed
+    assert dispatch.settings is settings
+    assert get_processor(value) is dispatch.processor
+
+
+def test_get_dispatch_is_rebuilt_on_config_reload(
+    mock_config: t.Callable[[str, _T], _T], faker: Faker, mocker: MockerFixture
+) -> None:
+    """Test that the dispatch table is rebuilt, only when cards settings are changed."""
+    mocker.patch.dict(Config._instances)
+    mock_config("cards.nouns.note_type_name", (old_name := faker.unique.word()))
+    dispatch = get_dispatch(old_name)
+
+    Config()._reload(t.cast(_CONFIG_AS_DICT, {"compiler": {"chunk_size": Config().compiler.chunk_size + 1}}))
+    assert get_dispatch(old_name) is dispatch
+
+    Config()._reload({"cards": {"nouns": {"note_type_name": (new_name := faker.unique.word())}}})
+    assert get_dispatch(new_name) is not None
+    assert get_dispatch(old_name) is None
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_process_card_uses_cache(  # type: ignore[misc]
+    cache_enabled: bool, mocker: MockerFixture, mock_config: t.Callable[[str, t.Any], None], faker: Faker
+) -> None:
+    """Test that :func:`czech_plus.logic.processor.process_card` processes the same fields only once, \
+    if cache is enabled."""
+    mock_config("compiler.cache", cache_enabled)
+    mock_config("cards.nouns.note_type_name", (note_type := faker.word()))
+    process = mocker.spy(NounProcessor, "process")
+    fields = Config().cards.nouns.fields
+    content = {fields.czech: "kočka", fields.gender: "F"}
+
+    first = process_card(content, note_type)
+    assert process_card(dict(content), note_type) == first
+
+    assert process.call_count == (1 if cache_enabled else 2)
+
+
+def test_process_card_reports_problems_with_cache(  # type: ignore[misc]
+    mock_config: t.Callable[[str, t.Any], None], faker: Faker
+) -> None:
+    """Test that results with reported problems aren't cached, so problems are reported every time."""
+    mock_config("compiler.cache", True)
+    mock_config("cards.nouns.note_type_name", (note_type := faker.word()))
+    fields = Config().cards.nouns.fields
+    content = {fields.czech: faker.word(), fields.gender: ""}
+
+    for _ in range(2):
+        with diagnostics.capture() as issues:
+            process_card(dict(content), note_type)
+
+        assert issues == [(f"empty {fields.gender} field", None)]
+
+
 class BaseTestProcessor(abc.ABC):
     """Base class for tests of processors."""
 
@@ -882,3 +954,159 @@ class TestAdjectiveProcessor(BaseTestProcessor):
             )
             == result
         )
+
+
+class TestProcessMany:
+    """Tests for :func:`czech_plus.logic.processor.process_many`."""
+
+    @pytest.fixture
+    def note_type(self, mock_config: t.Callable[[str, _T], _T], faker: Faker) -> str:
+        """Fixture for name of the noun note type."""
+        mock_config("compiler.cache", False)
+        return mock_config("cards.nouns.note_type_name", faker.word())
+
+    def test_same_as_process_card(self, note_type: str) -> None:
+        """Test that results are the same, as from :func:`czech_plus.logic.processor.process_card`."""
+        fields = Config().cards.nouns.fields
+        rows = [("kočka", "F"), ("pes", "M"), ("kočka, pes", "F, M")]
+
+        assert list(process_many(note_type, rows) or []) == [
+            process_card({fields.czech: czech, fields.gender: gender}, note_type) for czech, gender in rows
+        ]
+
+    def test_deduplicates_rows(self, note_type: str, mocker: MockerFixture) -> None:
+        """Test that identical rows are processed only once."""
+        process = mocker.spy(NounProcessor, "process")
+
+        result = list(process_many(note_type, iter([("kočka", "F"), ("pes", "M"), ("kočka", "F")])) or [])
+
+        assert result[0] == result[2]
+        assert process.call_count == 2
+
+    def test_failures_dont_stop_processing(self, note_type: str, mocker: MockerFixture) -> None:
+        """Test that failed rows are returned as exceptions."""
+        mocker.patch.object(NounProcessor, "process", side_effect=[ValueError("some error"), "processed"])
+
+        failed, succeeded, invalid = process_many(note_type, [("a", "F"), ("b", "F"), ("c",)]) or []
+
+        assert isinstance(failed, ValueError)
+        assert succeeded == "processed"
+        assert isinstance(invalid, ValueError)
+
+    def test_reports_issues_for_every_row(self, note_type: str) -> None:
+        """Test that problems are reported while result of their row is produced, also for identical rows."""
+        gender = Config().cards.nouns.fields.gender
+        results = process_many(note_type, [("kočka", ""), ("pes", "M"), ("kočka", "")])
+        assert results is not None
+
+        issues = []
+        for _ in range(3):
+            with diagnostics.capture() as row_issues:
+                next(results)
+            issues.append(row_issues)
+
+        assert issues == [[(f"empty {gender} field", None)], [], [(f"empty {gender} field", None)]]
+
+    def test_processor_not_found(self, faker: Faker) -> None:
+        """Test that None is returned for unknown note type."""
+        assert process_many(faker.word(), [(faker.word(),)]) is None
+
+
+class TestVerbRenderer:
+    """Tests that :meth:`~czech_plus.logic.processor.implementations.verb.VerbProcessor.process` gives the same \
+    result as the old two-pass engine (see ``benchmarks/verb.py``), expected results are frozen from it."""
+
+    @pytest.fixture
+    def processor(self) -> VerbProcessor:
+        """Fixture for initialised verb processor."""
+        return VerbProcessor()
+
+    @staticmethod
+    def _content(czech: str, pac: str) -> dict[str, str]:
+        """Make content of the verb card."""
+        fields = Config().cards.verbs.fields
+        return {fields.czech: czech, fields.prepositions_and_cases: pac}
+
+    @pytest.mark.parametrize(
+        "czech,pac,expected",
+        [
+            (
+                "koukat (se), dívat se",
+                "na 4, !kam?, po 7. na 4, z 2",
+                "koukat (se) (na koho? co?, kam?, po kým? čím?), dívat se (na koho? co?, z koho? čeho?)",
+            ),
+            ("ušklíbat se [ušklíbnout se]", "na 4 [na 4]", "ušklíbat se (na koho? co?) [ušklíbnout se (na koho? co?)]"),
+            (
+                "dělat [udělat], hrát si [zahrát si]",
+                "4 [4]. s 7 [s 7]",
+                "dělat (koho? co?) [udělat (koho? co?)], hrát si (s kým? čím?) [zahrát si (s kým? čím?)]",
+            ),
+            ("mluvit", "o 6, s 7", "mluvit (o kom? čem?, s kým? čím?)"),
+            ("mluvit, říct", "_. 4", "mluvit, říct (koho? co?)"),
+            ("mluvit, říct", "o 6, _. 4, _", "mluvit (o kom? čem?), říct (koho? co?)"),
+            ("mluvit [říct], jít", "[4]. _", "mluvit [říct (koho? co?)], jít"),
+            ("a\\[, b", "4. 2", "a[ (koho? co?), b (koho? čeho?)"),
+        ],
+    )
+    def test_examples(self, processor: VerbProcessor, czech: str, pac: str, expected: str) -> None:
+        """Test on the examples."""
+        assert processor.process(self._content(czech, pac)) == expected
+
+    @pytest.mark.parametrize(
+        "czech,pac,expected",
+        [
+            ("!\\a", " ]a[3114_", "\\a ( ])"),
+            ("a,.", "!3]1 ", "a (3]1 )"),
+            (" b,a", ",2,a", " b (, , )"),
+            (" ,!! b,.", " 2]\\ ! ", "  ( koho? čeho?]  ),  b"),
+            ("! ,b", "2]\\[2_", "  (koho? čeho?][koho? čeho?)"),
+            ("\\b\\", "2,a_44! ", "b (koho? čeho?,  )"),
+            (",a,", "23!_ 1__3.[", ""),
+            ("\\], ", "_42_][__", "]"),
+            ("]!b \\[\\ \\", "[[2 ", "], b \\ [ "),
+            (" ,[ \\\\a", "!3a,\\ ", "  (3a,  ),  \\a"),
+            ("][b", "_\\\\4  [_", "] [b (\\4 )"),
+            ("]] a!!!]] ]", "1,2", "]],  a!! (kdo? co?, )]],  ]"),
+            ("[a  ]\\", "]\\]1.\\", "[a   (]kdo? co?)]"),
+        ],
+    )
+    def test_garbage(self, processor: VerbProcessor, czech: str, pac: str, expected: str) -> None:
+        """Test on random input, where the two-pass engine didn't fail."""
+        assert processor.process(self._content(czech, pac)) == expected
+
+    @pytest.mark.parametrize(
+        "czech,pac,exception",
+        [
+            ("],a[a", "a,a a1 _1", ValueError),
+            ("[b._]_.b!,[", "]]42222\\[_,", ValueError),
+            (".!a_", ".\\ ![4]4.,", NotImplementedError),
+            ("_b ", "[,2 31", NotImplementedError),
+            ("a[!b ,,b[", ",41!!,\\", RuntimeError),
+            ("a,_b[.a,\\", ",2]1]2_", RuntimeError),
+            ("[a,[[bb b,", ",3\\33 1\\!2,a", RuntimeError),
+            ("[b\\,", "33.,", AssertionError),
+            ("]bb.[ \\___ ", ".4!2", AssertionError),
+        ],
+    )
+    def test_garbage_fails(
+        self, processor: VerbProcessor, czech: str, pac: str, exception: type[BaseException]
+    ) -> None:
+        """Test on random input, where the two-pass engine failed."""
+        with pytest.raises(exception):
+            processor.process(self._content(czech, pac))
+
+    def test_future_form_without_pair(self, processor: VerbProcessor) -> None:
+        """Test that future form without pair in prepositions and cases is reported and fails."""
+        with diagnostics.capture() as issues, pytest.raises(RuntimeError):
+            processor.process(self._content("mluvit [říct]", "o 6"))
+
+        assert issues == [("future form without pair in prepositions and cases", "offset 7")]
+
+    def test_future_form_without_pair_and_custom_hooks(self, processor: VerbProcessor, mocker: MockerFixture) -> None:
+        """Test that problem is reported without offset, if the lexer can't track offsets."""
+        mocker.patch.object(VerbLexer, "lex_spans", side_effect=TypeError)
+
+        with diagnostics.capture() as issues, pytest.raises(RuntimeError):
+            processor.process(self._content("mluvit [říct]", "o 6"))
+
+        assert issues == [("future form without pair in prepositions and cases", None)]
@@ -0,0 +1,193 @@
+"""Tests for the :mod:`czech_plus.utils` module."""
+import sys
+import typing as t
+
+import pytest
+from faker import Faker
+from pytest_mock import MockerFixture
+
+from czech_plus import config, utils
+from czech_plus.logic import diagnostics
+from czech_plus.logic.compiler import CompileResult
+
+_T = t.TypeVar("_T")
+
+
+class TestCompileAllNotes:
+    """Tests for :func:`czech_plus.utils.compile_all_notes`."""
+
+    def test_does_nothing_without_main_window(self, mocker: MockerFixture) -> None:
+        """Test that nothing is scheduled, if Anki main window isn't initialized."""
+        mocker.patch("aqt.mw", None)
+        query_op = mocker.patch("aqt.operations.QueryOp")
+
+        utils.compile_all_notes()
+
+        query_op.assert_not_called()
+
+    def test_runs_in_background(self, mocker: MockerFixture) -> None:
+        """Test that compilation is scheduled as a background operation with progress."""
+        main_window = mocker.patch("aqt.mw")
+        query_op = mocker.patch("aqt.operations.QueryOp")
+
+        utils.compile_all_notes()
+
+        query_op.assert_called_once()
+        assert query_op.call_args.kwargs["parent"] is main_window
+        op = query_op.return_value.failure.return_value.with_progress
+        op.assert_called_once()
+        op.return_value.run_in_background.assert_called_once_with()
+
+    def test_op_compiles_notes_with_progress_and_cancellation(self, mocker: MockerFixture) -> None:
+        """Test that the background operation runs the compiler with progress and cancellation callbacks."""
+        main_window = mocker.patch("aqt.mw")
+        query_op = mocker.patch("aqt.operations.QueryOp")
+        compile_all_notes = mocker.patch(
+            "czech_plus.logic.compiler.Compiler.compile_all_notes", return_value=CompileResult()
+        )
+
+        utils.compile_all_notes()
+        query_op.call_args.kwargs["op"](mocker.MagicMock())
+
+        kwargs = compile_all_notes.call_args.kwargs
+        assert kwargs["should_cancel"] is main_window.progress.want_cancel
+        assert kwargs["note_types"] is None
+
+        kwargs["on_progress"](1, 2)
+        main_window.taskman.run_on_main.assert_called_once()
+        main_window.taskman.run_on_main.call_args.args[0]()
+        main_window.progress.update.assert_called_once_with(label=mocker.ANY, value=1, max=2)
+
+
+class TestLRUCache:
+    """Tests for :class:`czech_plus.utils.LRUCache`."""
+
+    def test_removes_least_recently_used_item(self) -> None:
+        """Test that the least recently used item is removed, when cache is full."""
+        cache: utils.LRUCache[str, int] = utils.LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        assert cache.get("a") == 1
+        cache["c"] = 3
+
+        assert dict(cache) == {"a": 1, "c": 3}
+
+    def test_get_returns_default(self) -> None:
+        """Test that :meth:`czech_plus.utils.LRUCache.get` returns default for missing keys."""
+        cache: utils.LRUCache[str, int] = utils.LRUCache(1)
+
+        assert cache.get("a") is None
+        assert cache.get("a", 1) == 1
+
+
+class TestHotLogger:
+    """Tests for :class:`czech_plus.utils.HotLogger`."""
+
+    def test_disabled_by_default(self, mocker: MockerFixture) -> None:
+        """Test that nothing is logged, until the level is set."""
+        logger = mocker.patch("czech_plus.utils.logger")
+        hot_logger = utils.HotLogger()
+
+        hot_logger.debug("{}", object())
+        hot_logger.trace("{}", object())
+
+        logger.opt.assert_not_called()
+
+    def test_set_level(self, mocker: MockerFixture) -> None:
+        """Test that only enabled levels are logged, with lazily formatted arguments."""
+        logger = mocker.patch("czech_plus.utils.logger")
+        hot_logger = utils.HotLogger()
+        hot_logger.set_level(config.LogLevel.DEBUG)
+
+        hot_logger.debug("Lexing {!r}", "a")
+        hot_logger.trace("Lexing {!r}", "b")
+
+        logger.opt.assert_called_once_with(depth=1)
+        logger.opt.return_value.debug.assert_called_once_with("Lexing {!r}", "a")
+        logger.opt.return_value.trace.assert_not_called()
+
+    def test_setup_logging_sets_level(self, mocker: MockerFixture) -> None:
+        """Test that :func:`czech_plus.utils.setup_logging` keeps :data:`czech_plus.utils.hot_logger` in sync."""
+        mocker.patch("czech_plus.utils.logger")
+        set_level = mocker.patch.object(utils.hot_logger, "set_level")
+
+        utils.setup_logging()
+
+        set_level.assert_called_once_with(config.Config().logging.level)
+
+
+class TestAssertThat:
+    """Tests for :func:`czech_plus.utils.assert_that`."""
+
+    def test_passed(self, mocker: MockerFixture) -> None:
+        """Test that nothing is reported, if the statement is true."""
+        report = mocker.patch("czech_plus.logic.diagnostics.report")
+
+        utils.assert_that(True)
+
+        report.assert_not_called()
+
+    def test_failed_is_reported(self, mock_config: t.Callable[[str, _T], _T]) -> None:
+        """Test that failed check is reported with the caller's location and offset, without a traceback."""
+        mock_config("logging.strict_checks", False)
+
+        with diagnostics.capture() as issues:
+            utils.assert_that(False, "message", offset=3)
+            line = sys._getframe().f_lineno - 1
+
+        assert issues == [(f"failed check at {__name__}:{line} (message)", "offset 3")]
+
+    def test_strict(self, mocker: MockerFixture, mock_config: t.Callable[[str, _T], _T]) -> None:
+        """Test that every failed check is logged with a traceback in strict mode."""
+        mock_config("logging.strict_checks", True)
+        logger = mocker.patch("czech_plus.utils.logger")
+
+        with diagnostics.capture() as issues:
+            utils.assert_that(False)
+
+        assert issues == []
+        logger.exception.assert_called_once()
+
+
+class TestRecompileChangedNoteTypes:
+    """Tests for :func:`czech_plus.utils.recompile_changed_note_types`."""
+
+    @pytest.fixture
+    def configs(self, faker: Faker) -> tuple[config.Config, config.Config]:
+        """Previous and current config, where name of the nouns note type was changed."""
+        previous = config.Config.from_dict({})
+        current = config.Config.from_dict({"cards": {"nouns": {"note_type_name": faker.word()}}})
+        return previous, current
+
+    def test_compiles_only_changed_note_types(
+        self, configs: tuple[config.Config, config.Config], mocker: MockerFixture
+    ) -> None:
+        """Test that compilation of changed note types is scheduled on the main thread."""
+        main_window = mocker.patch("aqt.mw")
+        compile_all_notes = mocker.patch("czech_plus.utils.compile_all_notes")
+        previous, current = configs
+
+        utils.recompile_changed_note_types(previous, current)
+        main_window.taskman.run_on_main.call_args.args[0]()
+
+        compile_all_notes.assert_called_once_with([current.cards.nouns.note_type_name])
+
+    def test_nothing_changed(self, configs: tuple[config.Config, config.Config], mocker: MockerFixture) -> None:
+        """Test that nothing is compiled, if cards settings weren't changed."""
+        main_window = mocker.patch("aqt.mw")
+        previous, _ = configs
+
+        utils.recompile_changed_note_types(previous, config.Config.from_dict(previous.as_dict()))
+
+        main_window.taskman.run_on_main.assert_not_called()
+
+    def test_lazy(self, configs: tuple[config.Config, config.Config], mocker: MockerFixture) -> None:
+        """Test that nothing is compiled in lazy mode."""
+        main_window = mocker.patch("aqt.mw")
+        previous, current = configs
+        object.__setattr__(current, "compiler", config.CompilerSettings(lazy=True))
+
+        utils.recompile_changed_note_types(previous, current)
+
+        main_window.taskman.run_on_main.assert_not_called()